@@ -30,11 +30,15 @@ http://github.com/pycontribs/pyrax
 
 from __future__ import absolute_import, unicode_literals
 from functools import wraps
+import importlib
 import inspect
 import logging
 import os
 import re
+import six
 import six.moves.configparser as ConfigParser
+import sys
+import threading
 import warnings
 
 # keyring is an optional import
@@ -51,27 +55,17 @@ try:
 
     from . import exceptions as exc
     from . import http
+    from . import jsoncodec
+    from . import jsonstream
+    from . import breaker
+    from . import cache
+    from . import ratelimit
+    from . import retry
+    from . import singleflight
+    from . import stats
+    from . import tokencache
     from . import version
     __version__ = version.version
-
-    from novaclient import exceptions as _cs_exceptions
-    from novaclient import auth_plugin as _cs_auth_plugin
-    from novaclient import client as nc
-    from novaclient import client as _cs_client
-    from novaclient import API_MAX_VERSION as _cs_max_version
-    from novaclient.v2.servers import Server as CloudServer
-
-    from .autoscale import AutoScaleClient
-    from .cloudcdn import CloudCDNClient
-    from .clouddatabases import CloudDatabaseClient
-    from .cloudloadbalancers import CloudLoadBalancerClient
-    from .cloudblockstorage import CloudBlockStorageClient
-    from .clouddns import CloudDNSClient
-    from .cloudnetworks import CloudNetworkClient
-    from .cloudmonitoring import CloudMonitorClient
-    from .image import ImageClient
-    from .object_storage import StorageClient
-    from .queueing import QueueClient
 except ImportError:
     # See if this is the result of the importing of version.py in setup.py
     callstack = inspect.stack()
@@ -82,6 +76,71 @@ except ImportError:
     if not in_setup:
         # This isn't a normal import problem during setup; re-raise
         raise
+else:
+    in_setup = False
+
+# novaclient and the service modules are slow to import, and most programs
+# only use a few of them, so these names are imported on first use instead of
+# with pyrax. Each maps to its module, and the name in that module, or None
+# for the module itself.
+_lazy_imports = {
+        "_cs_exceptions": ("novaclient.exceptions", None),
+        "_cs_auth_plugin": ("novaclient.auth_plugin", None),
+        "nc": ("novaclient.client", None),
+        "_cs_client": ("novaclient.client", None),
+        "_cs_max_version": ("novaclient", "API_MAX_VERSION"),
+        "CloudServer": ("novaclient.v2.servers", "Server"),
+        "AutoScaleClient": ("pyrax.autoscale", "AutoScaleClient"),
+        "CloudCDNClient": ("pyrax.cloudcdn", "CloudCDNClient"),
+        "CloudDatabaseClient": ("pyrax.clouddatabases", "CloudDatabaseClient"),
+        "CloudLoadBalancerClient": ("pyrax.cloudloadbalancers",
+                "CloudLoadBalancerClient"),
+        "CloudBlockStorageClient": ("pyrax.cloudblockstorage",
+                "CloudBlockStorageClient"),
+        "CloudDNSClient": ("pyrax.clouddns", "CloudDNSClient"),
+        "CloudNetworkClient": ("pyrax.cloudnetworks", "CloudNetworkClient"),
+        "CloudMonitorClient": ("pyrax.cloudmonitoring", "CloudMonitorClient"),
+        "ImageClient": ("pyrax.image", "ImageClient"),
+        "StorageClient": ("pyrax.object_storage", "StorageClient"),
+        "QueueClient": ("pyrax.queueing", "QueueClient"),
+        "fanout": ("pyrax.fanout", None),
+        "batch": ("pyrax.batching", "Batch"),
+        }
+
+
+def _load(name):
+    """
+    Returns the value of one of the names in _lazy_imports, importing it if
+    that hasn't been done yet. Once imported, it is an ordinary attribute of
+    this module, so it can be replaced like any other.
+    """
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    module_name, attr = _lazy_imports[name]
+    module = importlib.import_module(module_name)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        return _load(name)
+    raise AttributeError("module '%s' has no attribute '%s'"
+            % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
+
+
+if sys.version_info < (3, 7) and not in_setup:
+    # Module __getattr__() needs Python 3.7, so import everything now.
+    for _name in _lazy_imports:
+        _load(_name)
+
 
 # Initiate the services to None until we are authenticated.
 cloudservers = None
@@ -116,19 +175,21 @@ _http_debug = False
 regions = tuple()
 services = tuple()
 
+# The client class for each service. Names are looked up with _load(), so
+# that the class is only imported when a client is created.
 _client_classes = {
-        "compute": _cs_client.get_client_class(_cs_max_version),
-        "cdn": CloudCDNClient,
-        "object_store": StorageClient,
-        "database": CloudDatabaseClient,
-        "load_balancer": CloudLoadBalancerClient,
-        "volume": CloudBlockStorageClient,
-        "dns": CloudDNSClient,
-        "compute:network": CloudNetworkClient,
-        "monitor": CloudMonitorClient,
-        "autoscale": AutoScaleClient,
-        "image": ImageClient,
-        "queues": QueueClient,
+        "compute": None,
+        "cdn": "CloudCDNClient",
+        "object_store": "StorageClient",
+        "database": "CloudDatabaseClient",
+        "load_balancer": "CloudLoadBalancerClient",
+        "volume": "CloudBlockStorageClient",
+        "dns": "CloudDNSClient",
+        "compute:network": "CloudNetworkClient",
+        "monitor": "CloudMonitorClient",
+        "autoscale": "AutoScaleClient",
+        "image": "ImageClient",
+        "queues": "QueueClient",
         }
 
 
@@ -169,6 +230,12 @@ class Settings(object):
             "debug": "CLOUD_DEBUG",
             "verify_ssl": "CLOUD_VERIFY_SSL",
             "use_servicenet": "USE_SERVICENET",
+            "max_retries": "CLOUD_MAX_RETRIES",
+            "retry_backoff": "CLOUD_RETRY_BACKOFF",
+            "json_codec": "CLOUD_JSON_CODEC",
+            "token_renewal_margin": "CLOUD_TOKEN_RENEWAL_MARGIN",
+            "token_cache_dir": "CLOUD_TOKEN_CACHE_DIR",
+            "circuit_breaker": "CLOUD_CIRCUIT_BREAKER",
             }
     _settings = {"default": dict.fromkeys(list(env_dct.keys()))}
     _default_set = False
@@ -323,6 +390,13 @@ class Settings(object):
             dct["tenant_id"] = safe_get(section, "tenant_id")
             use_servicenet = safe_get(section, "use_servicenet", "False")
             dct["use_servicenet"] = use_servicenet == "True"
+            dct["max_retries"] = safe_get(section, "max_retries")
+            dct["retry_backoff"] = safe_get(section, "retry_backoff")
+            dct["json_codec"] = safe_get(section, "json_codec")
+            dct["token_renewal_margin"] = safe_get(section,
+                    "token_renewal_margin")
+            dct["token_cache_dir"] = safe_get(section, "token_cache_dir")
+            dct["circuit_breaker"] = safe_get(section, "circuit_breaker")
             app_agent = safe_get(section, "custom_user_agent")
             if app_agent:
                 # Customize the user-agent string with the app name.
@@ -589,6 +663,8 @@ def clear_credentials():
     global identity, regions, services, cloudservers, cloudfiles, cloud_cdn
     global cloud_loadbalancers, cloud_databases, cloud_blockstorage, cloud_dns
     global cloud_networks, cloud_monitoring, autoscale, images, queues
+    if identity is not None:
+        identity.stop_token_renewal()
     identity = None
     regions = tuple()
     services = tuple()
@@ -617,23 +693,138 @@ def _make_agent_name(base):
         return USER_AGENT
 
 
+class _ClientProxy(object):
+    """
+    Stands in for one of the module-level clients, such as 'cloudfiles'. The
+    client is only created, by calling the named connect_to_*() function,
+    when it is first used. It is kept for each identity, region and choice
+    of public or private endpoints, and is created again after the identity
+    re-authenticates if the service catalog has changed.
+
+    Proxies are only made for services in the catalog. If a service is
+    missing from the catalog after a re-authentication, its proxy is false,
+    and using it raises ServiceNotAvailable.
+    """
+    def __init__(self, connect_name, region=None, **kwargs):
+        object.__setattr__(self, "_connect_name", connect_name)
+        object.__setattr__(self, "_region", region)
+        object.__setattr__(self, "_kwargs", kwargs)
+        object.__setattr__(self, "_clients", {})
+        object.__setattr__(self, "_lock", threading.Lock())
+
+
+    def _get_client(self):
+        """Returns the client, creating it if necessary; None if unavailable."""
+        context = identity
+        region = _safe_region(self._region, context=context)
+        key = (context, region, self._kwargs.get("public"))
+        generation = getattr(context, "auth_generation", None)
+        catalog = getattr(context, "service_catalog", None)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                if entry[0] == generation:
+                    return entry[2]
+                if entry[1] == catalog:
+                    # Re-authenticated, but with the same endpoints.
+                    entry[0] = generation
+                    return entry[2]
+            connect = globals()[self._connect_name]
+            client = connect(region=self._region, **self._kwargs)
+            self._clients[key] = [generation, catalog, client]
+            return client
+
+
+    def _require_client(self):
+        client = self._get_client()
+        if client is None:
+            raise exc.ServiceNotAvailable("The service for '%s' is not "
+                    "available." % self._connect_name)
+        return client
+
+
+    def __getattr__(self, att):
+        return getattr(self._require_client(), att)
+
+
+    def __setattr__(self, att, val):
+        setattr(self._require_client(), att, val)
+
+
+    def __delattr__(self, att):
+        delattr(self._require_client(), att)
+
+
+    def __bool__(self):
+        return self._get_client() is not None
+    __nonzero__ = __bool__
+
+
+    def __repr__(self):
+        return "<Lazy client from %s(region=%r)>" % (self._connect_name,
+                self._region)
+
+
 def connect_to_services(region=None):
-    """Establishes authenticated connections to the various cloud APIs."""
+    """
+    Sets up the connections to the various cloud APIs. Each client is created
+    when it is first used, so services that are never used cost nothing.
+    """
     global cloudservers, cloudfiles, cloud_loadbalancers, cloud_databases
     global cloud_blockstorage, cloud_dns, cloud_networks, cloud_monitoring
     global autoscale, images, queues, cloud_cdn
-    cloudservers = connect_to_cloudservers(region=region)
-    cloudfiles = connect_to_cloudfiles(region=region)
-    cloud_cdn = connect_to_cloud_cdn(region=region)
-    cloud_loadbalancers = connect_to_cloud_loadbalancers(region=region)
-    cloud_databases = connect_to_cloud_databases(region=region)
-    cloud_blockstorage = connect_to_cloud_blockstorage(region=region)
-    cloud_dns = connect_to_cloud_dns(region=region)
-    cloud_networks = connect_to_cloud_networks(region=region)
-    cloud_monitoring = connect_to_cloud_monitoring(region=region)
-    autoscale = connect_to_autoscale(region=region)
-    images = connect_to_images(region=region)
-    queues = connect_to_queues(region=region)
+    cloudservers = _lazy_client("connect_to_cloudservers", "compute", region)
+    cloudfiles = _lazy_client("connect_to_cloudfiles", "object_store",
+            region, public=not get_setting("use_servicenet"))
+    cloud_cdn = _lazy_client("connect_to_cloud_cdn", "cdn", region,
+            ep_region=_cdn_region(region))
+    cloud_loadbalancers = _lazy_client("connect_to_cloud_loadbalancers",
+            "load_balancer", region)
+    cloud_databases = _lazy_client("connect_to_cloud_databases", "database",
+            region)
+    cloud_blockstorage = _lazy_client("connect_to_cloud_blockstorage",
+            "volume", region)
+    cloud_dns = _lazy_client("connect_to_cloud_dns", "dns", region)
+    cloud_networks = _lazy_client("connect_to_cloud_networks", "compute",
+            region)
+    cloud_monitoring = _lazy_client("connect_to_cloud_monitoring", "monitor",
+            region)
+    autoscale = _lazy_client("connect_to_autoscale", "autoscale", region)
+    images = _lazy_client("connect_to_images", "image", region)
+    queues = _lazy_client("connect_to_queues", "queues", region)
+    _start_token_renewal()
+
+
+def _lazy_client(connect_name, svc, region, ep_region=None, public=True):
+    """
+    Returns a _ClientProxy that creates the client with the named
+    connect_to_*() function, or None if the service catalog has no endpoint
+    for 'svc' in the region, just as that function would.
+    """
+    ep_region = _safe_region(ep_region or region)
+    if not _get_service_endpoint(None, svc, ep_region, public=public):
+        return None
+    return _ClientProxy(connect_name, region=region)
+
+
+def _start_token_renewal():
+    """
+    Renews the token in the background if the 'token_renewal_margin' setting
+    is the number of seconds before expiry to do so.
+    """
+    margin = get_setting("token_renewal_margin")
+    if not margin or identity is None:
+        return
+    try:
+        margin = float(margin)
+    except (TypeError, ValueError):
+        msg = ("The token_renewal_margin setting must be a number of seconds; "
+                "got '%s'. The token will not be renewed in the background."
+                % margin)
+        warnings.warn(msg)
+        _logger.warning(msg)
+        return
+    identity.start_token_renewal(margin=margin)
 
 
 def _get_service_endpoint(context, svc, region=None, public=True):
@@ -658,6 +849,9 @@ def _get_service_endpoint(context, svc, region=None, public=True):
 def connect_to_cloudservers(region=None, context=None, verify_ssl=None, **kwargs):
     """Creates a client for working with cloud servers."""
     context = context or identity
+    _cs_auth_plugin = _load("_cs_auth_plugin")
+    _cs_client = _load("_cs_client")
+    _cs_max_version = _load("_cs_max_version")
     _cs_auth_plugin.discover_auth_systems()
     id_type = get_setting("identity_type")
     if id_type != "keystone":
@@ -675,7 +869,7 @@ def connect_to_cloudservers(region=None, context=None, verify_ssl=None, **kwargs
     else:
         insecure = not verify_ssl
     try:
-        extensions = nc.discover_extensions(_cs_max_version)
+        extensions = _load("nc").discover_extensions(_cs_max_version)
     except AttributeError:
         extensions = None
     clt_class = _cs_client.get_client_class(_cs_max_version)
@@ -688,7 +882,7 @@ def connect_to_cloudservers(region=None, context=None, verify_ssl=None, **kwargs
     cloudservers.client.USER_AGENT = _make_agent_name(agt)
     cloudservers.client.management_url = mgt_url
     cloudservers.client.auth_token = context.token
-    cloudservers.exceptions = _cs_exceptions
+    cloudservers.exceptions = _load("_cs_exceptions")
     # Add some convenience methods
     cloudservers.list_images = cloudservers.images.list
     cloudservers.list_flavors = cloudservers.flavors.list
@@ -752,7 +946,7 @@ def _create_client(ep_name, region, public=True, verify_ssl=None):
         return
     if verify_ssl is None:
         verify_ssl = get_setting("verify_ssl")
-    cls = _client_classes[ep_name]
+    cls = client_class_for_service(ep_name)
     client = cls(identity, region_name=region, management_url=ep,
             verify_ssl=verify_ssl, http_log_debug=_http_debug)
     client.user_agent = _make_agent_name(client.user_agent)
@@ -766,23 +960,27 @@ def connect_to_cloud_databases(region=None):
 
 def connect_to_cloud_cdn(region=None):
     """Creates a client for working with cloud loadbalancers."""
-    global default_region
+    return _create_client(ep_name="cdn", region=_cdn_region(region))
+
+
+def _cdn_region(region):
+    """Returns the region whose Cloud CDN endpoint serves 'region'."""
     # (nicholaskuechler/keekz) 2017-11-30 - Not a very elegant solution...
     # Cloud CDN only exists in 2 regions: DFW and LON
     # But this isn't playing nicely with the identity service catalog results.
     # US auth based regions (DFW, ORD, IAD, SYD, HKG) need to use CDN in DFW
     # UK auth based regions (LON) need to use CDN in LON
     if region in ['DFW', 'IAD', 'ORD', 'SYD', 'HKG']:
-        return _create_client(ep_name="cdn", region="DFW")
+        return "DFW"
     elif region in ['LON']:
-        return _create_client(ep_name="cdn", region="LON")
+        return "LON"
     else:
         if default_region in ['DFW', 'IAD', 'ORD', 'SYD', 'HKG']:
-            return _create_client(ep_name="cdn", region="DFW")
+            return "DFW"
         elif default_region in ['LON']:
-            return _create_client(ep_name="cdn", region="LON")
+            return "LON"
         else:
-            return _create_client(ep_name="cdn", region=region)
+            return region
 
 
 def connect_to_cloud_loadbalancers(region=None):
@@ -830,7 +1028,12 @@ def client_class_for_service(service):
     Returns the client class registered for the given service, or None if there
     is no such service, or if no class has been registered.
     """
-    return _client_classes.get(service)
+    if service == "compute" and _client_classes.get(service) is None:
+        return _load("_cs_client").get_client_class(_load("_cs_max_version"))
+    cls = _client_classes.get(service)
+    if isinstance(cls, six.string_types):
+        cls = _load(cls)
+    return cls
 
 
 def get_http_debug():
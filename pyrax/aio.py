@@ -0,0 +1,598 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Asynchronous versions of the base client and manager, for use with asyncio.
+
+This module requires Python 3.6 or later and the 'aiohttp' package, and so is
+not imported by pyrax itself. Async clients are normally created from an
+existing client, with which they share the identity, endpoint and settings:
+
+    aclt = AsyncBaseClient.from_client(pyrax.cloud_dns)
+    domains = await aclt.list()
+    await aclt.close()
+
+Resource objects returned by the async managers are the same classes returned
+by the regular managers, and are bound to the regular manager, so any calls
+made through their own methods are synchronous.
+"""
+
+import asyncio
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import pyrax
+import pyrax.exceptions as exc
+import pyrax.jsoncodec
+import pyrax.retry
+import pyrax.utils as utils
+from pyrax.client import _safe_uri
+
+
+DEFAULT_CHUNKSIZE = 65536
+
+# Python 3.6 has no get_running_loop().
+_get_running_loop = getattr(asyncio, "get_running_loop",
+        asyncio.get_event_loop)
+
+
+def _rebase_uri(uri, old_url, new_url):
+    """
+    Returns the URI moved from the 'old_url' endpoint to 'new_url', if it is
+    below the old one and the endpoint has changed.
+    """
+    if old_url and new_url and old_url != new_url and uri.startswith(old_url):
+        return new_url + uri[len(old_url):]
+    return uri
+
+
+class AsyncResponse(object):
+    """
+    Holds the parts of an aiohttp response that pyrax uses, under the same
+    names as on a requests Response, so that the rest of the library can
+    handle either one.
+    """
+    def __init__(self, status_code, headers, content, reason=None, raw=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.reason = reason
+        # The underlying aiohttp response, when the body is streamed.
+        self.raw = raw
+
+
+    def __repr__(self):
+        return "<AsyncResponse [%s]>" % self.status_code
+
+
+
+class AsyncBaseManager(object):
+    """
+    Async counterpart of BaseManager. It wraps a regular manager, and uses
+    its resource class, response keys, URI base and request body creation.
+    """
+    def __init__(self, api, manager):
+        self.api = api
+        self.manager = manager
+        self.resource_class = manager.resource_class
+        self.response_key = manager.response_key
+        self.plural_response_key = manager.plural_response_key
+        self.uri_base = manager.uri_base
+
+
+    async def list(self, limit=None, marker=None, return_raw=False,
+            other_keys=None, fields=None, as_dicts=False, as_columns=False):
+        """
+        Returns a list of resource objects. Pagination is supported through the
+        optional 'marker' and 'limit' parameters. Pass the names of the values
+        you need as 'fields' to get rows of those values instead of objects,
+        as described in BaseManager.list().
+        """
+        uri = "/%s" % self.uri_base
+        pagination_items = []
+        if limit is not None:
+            pagination_items.append("limit=%s" % limit)
+        if marker is not None:
+            pagination_items.append("marker=%s" % marker)
+        pagination = "&".join(pagination_items)
+        if pagination:
+            uri = "%s?%s" % (uri, pagination)
+        return await self._list(uri, return_raw=return_raw,
+                other_keys=other_keys, fields=fields, as_dicts=as_dicts,
+                as_columns=as_columns)
+
+
+    async def head(self, item):
+        """Makes a HEAD request on a specific item."""
+        uri = "/%s/%s" % (self.uri_base, utils.get_id(item))
+        return await self._head(uri)
+
+
+    async def get(self, item):
+        """Gets a specific item."""
+        uri = "/%s/%s" % (self.uri_base, utils.get_id(item))
+        return await self._get(uri)
+
+
+    async def create(self, name, *args, **kwargs):
+        """
+        Creates a new resource, using the wrapped manager's _create_body()
+        method to build the request body.
+        """
+        return_none = kwargs.pop("return_none", False)
+        return_raw = kwargs.pop("return_raw", False)
+        return_response = kwargs.pop("return_response", False)
+        body = self.manager._create_body(name, *args, **kwargs)
+        return await self._create("/%s" % self.uri_base, body,
+                return_none=return_none, return_raw=return_raw,
+                return_response=return_response)
+
+
+    async def delete(self, item):
+        """Deletes the specified item."""
+        uri = "/%s/%s" % (self.uri_base, utils.get_id(item))
+        return await self._delete(uri)
+
+
+    async def _list(self, uri, obj_class=None, body=None, return_raw=False,
+            other_keys=None, fields=None, as_dicts=False, as_columns=False):
+        if body:
+            resp, resp_body = await self.api.method_post(uri, body=body)
+        else:
+            resp, resp_body = await self.api.method_get(uri)
+        if return_raw:
+            return (resp, resp_body)
+        if obj_class is None:
+            obj_class = self.resource_class
+        data = self.manager._data_from_response(resp_body)
+        if fields:
+            ret = utils.project(data, fields, as_dicts=as_dicts,
+                    as_columns=as_columns)
+        else:
+            ret = [obj_class(self.manager, res, loaded=False) for res in data
+                    if res]
+        if other_keys:
+            keys = utils.coerce_to_list(other_keys)
+            other = [self.manager._data_from_response(resp_body, key)
+                    for key in keys]
+            return (ret, other)
+        return ret
+
+
+    async def _head(self, uri):
+        resp, resp_body = await self.api.method_head(uri)
+        return resp
+
+
+    async def _get(self, uri):
+        resp, resp_body = await self.api.method_get(uri)
+        return self.resource_class(self.manager, resp_body, self.response_key,
+                loaded=True)
+
+
+    async def _create(self, uri, body, return_none=False, return_raw=False,
+            return_response=None, **kwargs):
+        self.manager.run_hooks("modify_body_for_create", body, **kwargs)
+        resp, resp_body = await self.api.method_post(uri, body=body)
+        if return_none:
+            return
+        elif return_response:
+            return resp
+        elif return_raw:
+            if self.response_key:
+                return resp_body[self.response_key]
+            return resp_body
+        return self.resource_class(self.manager, resp_body, self.response_key)
+
+
+    async def _delete(self, uri):
+        _resp, _body = await self.api.method_delete(uri)
+
+
+    async def _update(self, uri, body, **kwargs):
+        self.manager.run_hooks("modify_body_for_update", body, **kwargs)
+        resp, resp_body = await self.api.method_put(uri, body=body)
+        return resp_body
+
+
+    async def action(self, item, action_type, body={}):
+        """Async version of BaseManager.action()."""
+        uri = "/%s/%s/action" % (self.uri_base, utils.get_id(item))
+        action_body = {action_type: body}
+        return await self.api.method_post(uri, body=action_body)
+
+
+
+class AsyncBaseClient(object):
+    """
+    The base class for the asyncio clients. It mirrors the request handling of
+    BaseClient, sharing its URI quoting, exception mapping and retry policies.
+    """
+    user_agent = None
+    name = "base"
+
+    def __init__(self, identity, region_name=None, management_url=None,
+            verify_ssl=True, timeout=None, pool_maxsize=None,
+            retry_policy=None, manager=None):
+        if aiohttp is None:
+            raise exc.AiohttpModuleNotInstalled("The 'aiohttp' Python module "
+                    "is not installed on this system.")
+        self.identity = identity
+        self.region_name = region_name
+        self.management_url = management_url
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.retry_policy = retry_policy
+        self.retries = 0
+        self._session = None
+        self._auth_lock = None
+        # The regular client this one was made from, if any, whose endpoint
+        # is read again after each authentication.
+        self._endpoint_client = None
+        self._manager = None
+        if manager is not None:
+            self._manager = AsyncBaseManager(self, manager)
+
+
+    @classmethod
+    def from_client(cls, client, **kwargs):
+        """
+        Returns an async client for the same service endpoint as the given
+        regular client. The two share the identity, so re-authenticating
+        through either one updates both, and the async client picks up any
+        new endpoint of the regular one after it authenticates.
+        """
+        follow_endpoint = "management_url" not in kwargs
+        kwargs.setdefault("region_name", client.region_name)
+        kwargs.setdefault("management_url", client.management_url)
+        kwargs.setdefault("verify_ssl", client.verify_ssl)
+        kwargs.setdefault("timeout", client.timeout)
+        kwargs.setdefault("pool_maxsize", client.pool_maxsize)
+        kwargs.setdefault("retry_policy", client.retry_policy)
+        kwargs.setdefault("manager", client._manager)
+        aclt = cls(client.identity, **kwargs)
+        aclt.user_agent = client.user_agent
+        aclt._add_custom_headers = client._add_custom_headers
+        if follow_endpoint:
+            aclt._endpoint_client = client
+        return aclt
+
+
+    # The next 4 methods are simple pass-through to the manager.
+    async def list(self, limit=None, marker=None, fields=None,
+            as_dicts=False, as_columns=False):
+        """Returns a list of resource objects, or rows of their 'fields'."""
+        return await self._manager.list(limit=limit, marker=marker,
+                fields=fields, as_dicts=as_dicts, as_columns=as_columns)
+
+
+    async def get(self, item):
+        """Gets a specific resource."""
+        return await self._manager.get(item)
+
+
+    async def create(self, *args, **kwargs):
+        """Creates a new resource."""
+        return await self._manager.create(*args, **kwargs)
+
+
+    async def delete(self, item):
+        """Deletes a specific resource."""
+        return await self._manager.delete(item)
+
+
+    @property
+    def session(self):
+        """
+        The aiohttp session used for all of this client's requests. It must
+        first be accessed from within a running event loop.
+        """
+        if self._session is None or self._session.closed:
+            limit = self.pool_maxsize or pyrax.http.DEFAULT_POOL_MAXSIZE
+            connector = aiohttp.TCPConnector(limit_per_host=limit)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+
+    async def close(self):
+        """Releases any pooled connections held by this client."""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+
+    def _add_custom_headers(self, dct):
+        """
+        Hook for adding service-specific headers; see
+        BaseClient._add_custom_headers().
+        """
+        pass
+
+
+    async def request(self, uri, method, raw_content=False, stream=False,
+            **kwargs):
+        """
+        Makes the HTTP call, and returns the response and the decoded body.
+
+        When 'stream' is True, the body is not read; the aiohttp response is
+        available as the 'raw' attribute of the returned response, and the
+        caller is responsible for releasing it.
+        """
+        headers = kwargs.pop("headers", None) or {}
+        headers["User-Agent"] = self.user_agent
+        headers["Accept"] = "application/json"
+        data = kwargs.pop("data", None)
+        if "body" in kwargs:
+            data = pyrax.jsoncodec.dumps(kwargs.pop("body"))
+        if data is not None:
+            if "Content-Type" not in headers:
+                headers["Content-Type"] = "application/json"
+        # Allow subclasses to add their own headers
+        self._add_custom_headers(headers)
+        # Headers set to None are not sent.
+        headers = dict((key, "%s" % val) for key, val in headers.items()
+                if val is not None)
+        if self.timeout:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=self.timeout)
+        if not self.verify_ssl:
+            kwargs["ssl"] = False
+        pyrax.http.http_log_req(method, uri, (), {"headers": headers})
+        raw = await self.session.request(method, uri, data=data,
+                headers=headers, **kwargs)
+        if stream and raw.status < 400:
+            resp = AsyncResponse(raw.status, raw.headers, None, raw.reason,
+                    raw=raw)
+            return resp, None
+        try:
+            content = await raw.read()
+        finally:
+            raw.release()
+        body = content
+        if not raw_content:
+            try:
+                body = pyrax.jsoncodec.loads(content)
+            except ValueError:
+                # No JSON in response
+                pass
+        resp = AsyncResponse(raw.status, raw.headers, content, raw.reason)
+        pyrax.http.http_log_resp(resp, body)
+        if resp.status_code >= 400:
+            raise exc.from_response(resp, body)
+        return resp, body
+
+
+    async def _authenticate(self, generation):
+        """
+        Authentication is done by the shared, synchronous identity object, so
+        its reauthenticate() is run in the default executor to avoid blocking
+        the event loop. That only authenticates if no other thread or client
+        has done so since 'generation' was read from the identity's
+        'auth_generation'.
+
+        Only one call of this client at a time waits for it, so that the
+        others don't each tie up an executor thread; once it is done, they
+        find that the generation has changed and return at once. The
+        endpoint is read again afterwards, in case it was replaced.
+        """
+        if self._auth_lock is None:
+            # Created here so that it belongs to the running loop.
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            id_svc = self.identity
+            if generation == id_svc.auth_generation:
+                loop = _get_running_loop()
+                await loop.run_in_executor(None, id_svc.reauthenticate,
+                        generation)
+            self._refresh_endpoint()
+
+
+    def _refresh_endpoint(self):
+        """
+        Copies the endpoint of the regular client this one was made from, if
+        any, since it may have been replaced.
+        """
+        client = self._endpoint_client
+        if client is not None and client.management_url:
+            self.management_url = client.management_url
+
+
+    async def _api_request(self, uri, method, **kwargs):
+        """
+        Async version of BaseClient._api_request(): adds the auth information,
+        re-authenticates once on a 401, and retries according to the client's
+        retry policy.
+        """
+        id_svc = self.identity
+        if not all((self.management_url, id_svc.token, id_svc.tenant_id)):
+            await self._authenticate(id_svc.auth_generation)
+        # Read once, so that the whole call uses the same endpoint even if it
+        # is replaced meanwhile.
+        management_url = self.management_url
+        if not management_url:
+            raise exc.ServiceNotAvailable("The '%s' service is not available."
+                    % self)
+        safe_uri = _safe_uri(management_url, uri)
+        kwargs.setdefault("headers", {})["X-Auth-Token"] = id_svc.token
+        if id_svc.tenant_id:
+            kwargs["headers"]["X-Auth-Project-Id"] = id_svc.tenant_id
+        policy = self.retry_policy
+        if policy is None:
+            policy = pyrax.retry.get_default_policy()
+        # Async iterables and other streams can't be sent twice, so never
+        # retry them.
+        rewind = pyrax.retry.body_rewinder(kwargs.get("data"))
+        attempt = 0
+        while True:
+            try:
+                return await self._auth_request(safe_uri, method, **kwargs)
+            except Exception as e:
+                if (policy is None or rewind is None or
+                        not policy.should_retry(method, attempt, e)):
+                    raise
+                delay = policy.get_delay(attempt, e)
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+                rewind()
+
+
+    async def _auth_request(self, uri, method, **kwargs):
+        """
+        Async version of BaseClient._auth_request(): on a 401, only the first
+        of the calls sharing the identity re-authenticates, and the call is
+        made again with the new token, at the new endpoint if it changed.
+        """
+        id_svc = self.identity
+        generation = id_svc.auth_generation
+        management_url = self.management_url
+        headers = kwargs.get("headers")
+        if headers and "X-Auth-Token" in headers:
+            # The token may have been replaced since the headers were set; it
+            # must be at least as recent as the generation just read.
+            headers["X-Auth-Token"] = id_svc.token
+        try:
+            return await self.request(uri, method, **kwargs)
+        except exc.Unauthorized as ex:
+            try:
+                await self._authenticate(generation)
+                kwargs["headers"]["X-Auth-Token"] = id_svc.token
+                uri = _rebase_uri(uri, management_url, self.management_url)
+                return await self.request(uri, method, **kwargs)
+            except exc.Unauthorized:
+                raise ex
+
+
+    async def method_head(self, uri, **kwargs):
+        """Method used to make HEAD requests."""
+        return await self._api_request(uri, "HEAD", **kwargs)
+
+
+    async def method_get(self, uri, **kwargs):
+        """Method used to make GET requests."""
+        return await self._api_request(uri, "GET", **kwargs)
+
+
+    async def method_post(self, uri, **kwargs):
+        """Method used to make POST requests."""
+        return await self._api_request(uri, "POST", **kwargs)
+
+
+    async def method_put(self, uri, **kwargs):
+        """Method used to make PUT requests."""
+        return await self._api_request(uri, "PUT", **kwargs)
+
+
+    async def method_delete(self, uri, **kwargs):
+        """Method used to make DELETE requests."""
+        return await self._api_request(uri, "DELETE", **kwargs)
+
+
+    async def method_patch(self, uri, **kwargs):
+        """Method used to make PATCH requests."""
+        return await self._api_request(uri, "PATCH", **kwargs)
+
+
+
+class AsyncStorageObjectManager(object):
+    """
+    Async counterpart of StorageObjectManager, supporting streamed downloads
+    and uploads of object content.
+    """
+    def __init__(self, api, container):
+        self.api = api
+        self.uri_base = utils.get_name(container)
+
+
+    async def fetch(self, obj, chunk_size=None):
+        """
+        Fetches the content of the object. If 'chunk_size' is specified, an
+        async generator is returned that yields the content in chunks of up
+        to that many bytes as they arrive, so that the whole object is never
+        held in memory; otherwise the entire content is returned.
+        """
+        uri = "/%s/%s" % (self.uri_base, utils.get_name(obj))
+        if chunk_size:
+            return self._fetch_chunker(uri, chunk_size)
+        resp, resp_body = await self.api.method_get(uri, raw_content=True)
+        return resp_body
+
+
+    async def _fetch_chunker(self, uri, chunk_size):
+        resp, resp_body = await self.api.method_get(uri, raw_content=True,
+                stream=True)
+        raw = resp.raw
+        try:
+            async for chunk in raw.content.iter_chunked(chunk_size):
+                yield chunk
+        finally:
+            raw.release()
+
+
+    async def create(self, obj_name, data, content_type=None, etag=None,
+            headers=None):
+        """
+        Creates or replaces a storage object in this container. The 'data' can
+        be bytes, an open file, or an async iterable of bytes; the last is
+        sent with chunked transfer encoding as it is produced, and so the
+        upload is not retried if it fails.
+
+        Unlike StorageObjectManager.create(), content larger than the 5GB
+        Swift limit is not segmented.
+        """
+        headers = headers or {}
+        if content_type is not None:
+            headers["Content-Type"] = content_type
+        if not headers.get("Content-Type"):
+            headers["Content-Type"] = None
+        if etag is None and isinstance(data, bytes):
+            etag = utils.get_checksum(data)
+        if etag:
+            headers["ETag"] = etag
+        uri = "/%s/%s" % (self.uri_base, obj_name)
+        resp, resp_body = await self.api.method_put(uri, data=data,
+                headers=headers)
+        return resp
+
+
+
+class AsyncStorageClient(AsyncBaseClient):
+    """
+    Async client for the object storage service. Only the object content
+    calls are provided.
+    """
+    name = "Object Storage"
+
+    def get_object_manager(self, container):
+        """Returns an AsyncStorageObjectManager for the given container."""
+        return AsyncStorageObjectManager(self, container)
+
+
+    async def fetch_object(self, container, obj, chunk_size=None):
+        """Fetches the object's content; see AsyncStorageObjectManager."""
+        mgr = self.get_object_manager(container)
+        return await mgr.fetch(obj, chunk_size=chunk_size)
+
+
+    async def create_object(self, container, obj_name, data,
+            content_type=None, etag=None, headers=None):
+        """Creates or replaces a storage object; see AsyncStorageObjectManager."""
+        mgr = self.get_object_manager(container)
+        return await mgr.create(obj_name, data, content_type=content_type,
+                etag=etag, headers=headers)
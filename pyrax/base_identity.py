@@ -6,8 +6,10 @@ from __future__ import absolute_import, unicode_literals
 import six.moves.configparser as ConfigParser
 import datetime
 import json
+import random
 import re
 import requests
+import threading
 import warnings
 
 try:
@@ -42,6 +44,17 @@ DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 # Default region for all services. Can be individually overridden if needed
 default_region = None
 
+# Background token renewal: how many seconds before the token expires it is
+# renewed, the largest random amount by which that is brought forward so
+# that processes sharing credentials don't all renew at once, and how long
+# to wait before trying again after a renewal fails.
+DEFAULT_RENEWAL_MARGIN = 300
+DEFAULT_RENEWAL_JITTER = 60
+RENEWAL_RETRY_DELAY = 30
+MIN_RENEWAL_DELAY = 5
+# Cached tokens are not re-used if they expire within this many seconds.
+TOKEN_CACHE_MARGIN = 60
+
 
 class Tenant(BaseResource):
     pass
@@ -285,6 +298,7 @@ class BaseIdentity(object):
         self.verify_ssl = verify_ssl
         self._auth_endpoint = auth_endpoint
         self.api_key = api_key
+        self.service_catalog = None
         self.services = utils.DotDict()
         self.regions = utils.DotDict()
         self._default_creds_style = "password"
@@ -292,6 +306,18 @@ class BaseIdentity(object):
         self.user_agent = "pyrax"
         self.http_log_debug = False
         self._default_region = None
+        self._session = None
+        self._session_lock = threading.Lock()
+        # Serializes re-authentication, and the swapping in of its results.
+        # The generation is incremented each time a new token is stored.
+        self._auth_lock = threading.RLock()
+        self.auth_generation = 0
+        self._renewal_thread = None
+        self._renewal_stop = None
+        # A pyrax.tokencache.TokenCache; if None, the one in the directory
+        # named by the 'token_cache_dir' setting is used, if that is set.
+        self.token_cache = None
+        self._token_cache_key = None
         self.service_mapping = {
                 "cloudservers": "compute",
                 "nova": "compute",
@@ -341,6 +367,29 @@ class BaseIdentity(object):
         return self._auth_endpoint or pyrax.get_setting("auth_endpoint")
 
 
+    @property
+    def session(self):
+        """
+        The pooled HTTP session used for calls to the identity service. It is
+        created on first use, and keeps its connections alive between calls.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = pyrax.http.create_session()
+        return self._session
+
+
+    def close(self):
+        """
+        Releases any pooled connections held for the identity service.
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+
     def get_default_region(self):
         """
         In cases where the region has not been specified, return the value to
@@ -567,7 +616,8 @@ class BaseIdentity(object):
         if "tokens" in uri:
             # We'll handle the exception here
             kwargs["raise_exception"] = False
-        return pyrax.http.request(mthd, uri, verify=self.verify_ssl, **kwargs)
+        return pyrax.http.request(mthd, uri, verify=self.verify_ssl,
+                session=self.session, **kwargs)
 
 
     def authenticate(self, username=None, password=None, api_key=None,
@@ -592,6 +642,11 @@ class BaseIdentity(object):
         self.tenant_id = tenant_id or self.tenant_id or pyrax.get_setting(
                 "tenant_id")
         creds = self._format_credentials()
+        cache = self._get_token_cache()
+        if cache is not None:
+            cache_key = pyrax.tokencache.cache_key(self.auth_endpoint, creds)
+            if self._use_cached_token(cache, cache_key):
+                return
         headers = {"Content-Type": "application/json",
                 "Accept": "application/json",
                 }
@@ -621,29 +676,194 @@ class BaseIdentity(object):
             raise exc.AuthenticationFailed(err)
         self._parse_response(resp_body)
         self.authenticated = True
+        if cache is not None:
+            cache.put(cache_key, resp_body)
+            self._token_cache_key = cache_key
+
+
+    def _get_token_cache(self):
+        """
+        Returns the TokenCache to use, or None if tokens are not cached.
+        """
+        if self.token_cache is not None:
+            return self.token_cache
+        directory = pyrax.get_setting("token_cache_dir")
+        if not directory:
+            return None
+        return pyrax.tokencache.get_cache(directory)
+
+
+    def _use_cached_token(self, cache, cache_key):
+        """
+        Authenticates using the response cached under 'cache_key', as long
+        as its token is not about to expire. Returns True if it was used.
+        """
+        resp_body = cache.get(cache_key)
+        if resp_body is None:
+            return False
+        try:
+            expires = self._parse_api_time(
+                    resp_body["access"]["token"]["expires"])
+            # Expiration times are parsed as UTC.
+            remaining = (expires - datetime.datetime.utcnow()
+                    ).total_seconds()
+            if remaining <= TOKEN_CACHE_MARGIN:
+                return False
+            self._parse_response(resp_body)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            pyrax._logger.debug("Ignoring an invalid cached token: %s" % e)
+            cache.delete(cache_key)
+            return False
+        self.authenticated = True
+        self._token_cache_key = cache_key
+        return True
+
+
+    def _discard_cached_token(self):
+        """
+        Removes the cached copy of the current token, once it has been
+        rejected, so that it isn't used to authenticate again.
+        """
+        cache_key, self._token_cache_key = self._token_cache_key, None
+        cache = self._get_token_cache()
+        if cache is None or cache_key is None:
+            return
+        resp_body = cache.get(cache_key)
+        try:
+            cached_token = resp_body["access"]["token"]["id"]
+        except (KeyError, TypeError):
+            cached_token = None
+        # Another process may already have replaced it with a new token.
+        if cached_token in (None, self.token):
+            cache.delete(cache_key)
 
 
     def _parse_response(self, resp):
-        """Gets the authentication information from the returned JSON."""
+        """
+        Gets the authentication information from the returned JSON. All of it
+        is parsed before any of it is stored, so that other threads never see
+        a new token with the old service catalog, or the reverse.
+        """
         access = resp["access"]
         token = access.get("token")
-        self.token = token["id"]
-        self.tenant_id = token["tenant"]["id"]
-        self.tenant_name = token["tenant"]["name"]
-        self.expires = self._parse_api_time(token["expires"])
-        self.service_catalog = access.get("serviceCatalog")
-        self._parse_service_catalog()
+        expires = self._parse_api_time(token["expires"])
+        catalog = access.get("serviceCatalog")
+        services, regions = self._build_service_catalog(catalog)
         user = access["user"]
-        self.user = {}
-        self.user["id"] = user["id"]
-        self.username = self.user["name"] = user["name"]
-        self.user["roles"] = user["roles"]
+        user_info = {"id": user["id"],
+                "name": user["name"],
+                "roles": user["roles"],
+                }
+        with self._auth_lock:
+            self.token = token["id"]
+            self.tenant_id = token["tenant"]["id"]
+            self.tenant_name = token["tenant"]["name"]
+            self.expires = expires
+            self.service_catalog = catalog
+            self.services = services
+            self.regions = regions
+            self.user = user_info
+            self.username = user_info["name"]
+            self.auth_generation += 1
+
+
+    def reauthenticate(self, generation=None):
+        """
+        Authenticates again, unless another thread has already done so since
+        'generation' was read from 'auth_generation'. Only one thread at a
+        time authenticates; the others wait for it, and then use the token it
+        got instead of asking for another one. Returns the new generation.
+        """
+        with self._auth_lock:
+            if generation is None or generation == self.auth_generation:
+                self._discard_cached_token()
+                self.authenticate()
+            return self.auth_generation
+
+
+    def start_token_renewal(self, margin=DEFAULT_RENEWAL_MARGIN,
+            jitter=DEFAULT_RENEWAL_JITTER):
+        """
+        Starts a background thread that re-authenticates 'margin' seconds
+        before the token expires, less a random amount of up to 'jitter'
+        seconds, so that calls never have to wait for a new token. The new
+        token is swapped in the same way as when a call gets a 401. Any
+        renewal thread already running is stopped first.
+        """
+        self.stop_token_renewal()
+        stop = threading.Event()
+        thread = threading.Thread(target=self._renew_tokens,
+                args=(stop, margin, jitter), name="pyrax-token-renewal")
+        thread.daemon = True
+        self._renewal_stop, self._renewal_thread = stop, thread
+        thread.start()
+
+
+    def stop_token_renewal(self, timeout=None):
+        """
+        Stops the background renewal thread, if there is one, and waits up to
+        'timeout' seconds for it to finish any renewal in progress.
+        """
+        stop, thread = self._renewal_stop, self._renewal_thread
+        self._renewal_stop = self._renewal_thread = None
+        if stop is not None:
+            stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+    @property
+    def renewing_token(self):
+        """True if the token is being renewed in the background."""
+        thread = self._renewal_thread
+        return thread is not None and thread.is_alive()
+
+
+    def _renewal_delay(self, margin, jitter):
+        """
+        Returns the number of seconds to wait before renewing the token, or
+        None if there is no token to renew yet.
+        """
+        expires = self.expires
+        if not self.token or expires is None:
+            return None
+        # Expiration times are parsed as UTC.
+        remaining = (expires - datetime.datetime.utcnow()).total_seconds()
+        delay = remaining - margin - random.uniform(0, jitter)
+        return max(delay, MIN_RENEWAL_DELAY)
+
+
+    def _renew_tokens(self, stop, margin, jitter):
+        """The body of the renewal thread; runs until 'stop' is set."""
+        while not stop.is_set():
+            generation = self.auth_generation
+            delay = self._renewal_delay(margin, jitter)
+            if delay is None:
+                # Wait until there is a token.
+                stop.wait(RENEWAL_RETRY_DELAY)
+                continue
+            if stop.wait(delay) or stop.is_set():
+                return
+            try:
+                self.reauthenticate(generation)
+            except Exception as e:
+                pyrax._logger.warning("Token renewal failed: %s" % e)
+                stop.wait(RENEWAL_RETRY_DELAY)
 
 
     def _parse_service_catalog(self):
-        self.services = utils.DotDict()
-        self.regions = set()
-        for svc in self.service_catalog:
+        self.services, self.regions = self._build_service_catalog(
+                self.service_catalog)
+
+
+    def _build_service_catalog(self, catalog):
+        """
+        Returns the services in the catalog, keyed by type, and the set of
+        regions they are available in.
+        """
+        services = utils.DotDict()
+        regions = set()
+        for svc in catalog:
             service = Service(self, svc)
             if not hasattr(service, "endpoints"):
                 # Not an OpenStack service
@@ -652,16 +872,17 @@ class BaseIdentity(object):
                 # Skip service registration of Managed DNS
                 # so it doesn't conflict with Cloud DNS
                 continue
-            setattr(self.services, service.service_type, service)
-            self.regions.update(list(service.endpoints.keys()))
+            setattr(services, service.service_type, service)
+            regions.update(list(service.endpoints.keys()))
         # Update the 'ALL' services to include all available regions.
-        self.regions.discard("ALL")
-        for nm, svc in list(self.services.items()):
+        regions.discard("ALL")
+        for nm, svc in list(services.items()):
             eps = svc.endpoints
             ep = eps.pop("ALL", None)
             if ep:
-                for rgn in self.regions:
+                for rgn in regions:
                     eps[rgn] = ep
+        return services, regions
 
 
     def keyring_auth(self, username=None):
@@ -693,8 +914,10 @@ class BaseIdentity(object):
 
     def unauthenticate(self):
         """
-        Clears out any credentials, tokens, and service catalog info.
+        Clears out any credentials, tokens, and service catalog info, and
+        stops any background token renewal.
         """
+        self.stop_token_renewal()
         self.username = ""
         self.password = ""
         self.tenant_id = ""
@@ -707,6 +930,7 @@ class BaseIdentity(object):
         self.services = utils.DotDict()
         self.regions = utils.DotDict()
         self.authenticated = False
+        self._token_cache_key = None
 
 
     def _standard_headers(self):
@@ -746,7 +970,8 @@ class BaseIdentity(object):
         invalidated on the server, this method may indicate that the token is
         valid when it might actually not be.
         """
-        return bool(self.token and (self.expires > datetime.datetime.now()))
+        return bool(self.token and
+                (self.expires > datetime.datetime.utcnow()))
 
 
     def list_tokens(self):
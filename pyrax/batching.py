@@ -0,0 +1,222 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Running many independent client calls at once. Calls made through a Batch
+return futures instead of blocking, and run on a shared, bounded pool of
+threads, with an optional limit on how many run at once for each service.
+"""
+
+import collections
+from concurrent import futures
+import threading
+
+
+DEFAULT_MAX_WORKERS = 16
+
+
+def _service_of(obj):
+    """
+    Returns the name of the service that a client, manager or resource
+    belongs to, which is used to apply the per-service limits.
+    """
+    if obj is None:
+        return None
+    # A resource's manager, and a manager's client.
+    obj = getattr(obj, "manager", None) or obj
+    obj = getattr(obj, "api", None) or obj
+    return getattr(obj, "name", None) or type(obj).__name__
+
+
+
+class _BatchProxy(object):
+    """
+    Wraps a client, manager or resource so that calling any of its methods
+    submits the call to the batch and returns a future.
+    """
+    def __init__(self, batch, target):
+        self._batch = batch
+        self._target = target
+        self._service = _service_of(target)
+
+
+    def __repr__(self):
+        return "<Batched %r>" % (self._target,)
+
+
+    def __getattr__(self, att):
+        val = getattr(self._target, att)
+        if not callable(val):
+            return val
+
+        def submit(*args, **kwargs):
+            return self._batch._submit(self._service, val, args, kwargs)
+        return submit
+
+
+
+class Batch(object):
+    """
+    Runs calls on a pool of up to 'max_workers' threads, and returns a
+    future for each of them. At most 'per_service' calls to any one service
+    run at once, unless 'limits' sets a different limit for it, keyed by the
+    service's name, such as 'Cloud DNS'. Calls over the limit wait, without
+    holding up calls to other services.
+
+    Used as a context manager, it waits for all of its calls to finish on
+    exit. If the block raises an error, calls that have not started yet are
+    cancelled instead. Errors raised by the calls themselves are kept in
+    their futures.
+
+        with pyrax.batch(max_workers=32, per_service=8) as batch:
+            dns = batch.wrap(pyrax.cloud_dns)
+            futs = [dns.add_record(domain, rec) for rec in records]
+        results = batch.gather(futs)
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, per_service=None,
+            limits=None):
+        self.max_workers = max_workers
+        self.per_service = per_service
+        self.limits = dict(limits or {})
+        self._pool = None
+        self._lock = threading.Lock()
+        self._futures = []
+        self._running = {}
+        self._waiting = {}
+
+
+    def __repr__(self):
+        return "<Batch calls=%s max_workers=%s>" % (len(self._futures),
+                self.max_workers)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.cancel()
+        self.close()
+
+
+    def _limit(self, service):
+        if service is None:
+            # Plain functions aren't limited.
+            return None
+        return self.limits.get(service, self.per_service)
+
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers)
+            return self._pool
+
+
+    def wrap(self, target):
+        """
+        Returns a proxy for a client, manager or resource whose methods submit
+        their calls to this batch, and return futures.
+        """
+        return _BatchProxy(self, target)
+
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Submits 'func(*args, **kwargs)' and returns its future. If 'func' is a
+        method of a client, manager or resource, its service's limit applies.
+        """
+        service = _service_of(getattr(func, "__self__", None))
+        return self._submit(service, func, args, kwargs)
+
+
+    def _submit(self, service, func, args, kwargs):
+        future = futures.Future()
+        task = (future, func, args, kwargs)
+        limit = self._limit(service)
+        with self._lock:
+            self._futures.append(future)
+            running = self._running.get(service, 0)
+            start = limit is None or running < limit
+            if start:
+                self._running[service] = running + 1
+            else:
+                self._waiting.setdefault(service,
+                        collections.deque()).append(task)
+        if start:
+            self._get_pool().submit(self._run, service, task)
+        return future
+
+
+    def _run(self, service, task):
+        while task is not None:
+            future, func, args, kwargs = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            # Start the next call waiting for this service, if any, in this
+            # thread, since it takes this call's place under the limit.
+            with self._lock:
+                waiting = self._waiting.get(service)
+                if waiting:
+                    task = waiting.popleft()
+                else:
+                    task = None
+                    self._running[service] -= 1
+
+
+    def gather(self, fs=None, timeout=None):
+        """
+        Returns the results of the futures, by default all of this batch's,
+        in the order they were submitted. The first error is raised.
+        """
+        if fs is None:
+            fs = list(self._futures)
+        done, not_done = futures.wait(fs, timeout=timeout)
+        if not_done:
+            raise futures.TimeoutError("%s of the calls did not finish within "
+                    "%s seconds." % (len(not_done), timeout))
+        return [fut.result() for fut in fs]
+
+
+    def as_completed(self, fs=None, timeout=None):
+        """
+        Generates the futures, by default all of this batch's, as they finish.
+        """
+        if fs is None:
+            fs = list(self._futures)
+        return futures.as_completed(fs, timeout=timeout)
+
+
+    def cancel(self):
+        """Cancels the calls that have not started yet."""
+        for future in list(self._futures):
+            future.cancel()
+
+
+    def close(self):
+        """Waits for all the calls to finish, and stops the pool's threads."""
+        futures.wait(list(self._futures))
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
@@ -0,0 +1,277 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Circuit breakers that make calls to an endpoint fail at once while that
+endpoint is failing, instead of each call waiting for its own timeout.
+"""
+
+import collections
+import threading
+import time
+
+import six
+
+import pyrax
+import pyrax.exceptions as exc
+import pyrax.retry
+
+
+# Python 2 has no monotonic clock.
+_now = getattr(time, "monotonic", time.time)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Values of the 'circuit_breaker' setting that enable the default breakers.
+_TRUE_VALUES = ("true", "yes", "on", "1")
+
+
+def is_failure(error):
+    """
+    Returns True if 'error' means that the endpoint is unhealthy: the
+    connection failed or timed out, or the server returned a 5xx status. Any
+    other error, such as a 404 or a 429, shows that the server is responding.
+    """
+    if error is None:
+        return False
+    if isinstance(error, exc.ClientException):
+        try:
+            return int(error.code) >= 500
+        except (TypeError, ValueError):
+            return False
+    connect_errors, connection_errors = pyrax.retry._transport_errors()
+    return isinstance(error, connect_errors + connection_errors)
+
+
+
+class CircuitBreaker(object):
+    """
+    Tracks the outcome of the calls made to one endpoint over the last
+    'window' seconds. Once at least 'min_calls' have been made in that time,
+    and 'failure_rate' of them or more have failed, the circuit opens: calls
+    raise CircuitOpen immediately, without being sent.
+
+    After 'reset_timeout' seconds the circuit is half-open, and up to
+    'probes' calls are let through at a time to test the endpoint. Once that
+    many of them succeed the circuit closes again; if any of them fails, it
+    opens for another 'reset_timeout' seconds.
+    """
+    def __init__(self, host=None, failure_rate=0.5, min_calls=20, window=60,
+            reset_timeout=30, probes=1):
+        self.host = host
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.state = CLOSED
+        self.opened_at = None
+        self._lock = threading.Lock()
+        # The (time, failed) outcome of each call in the window.
+        self._outcomes = collections.deque()
+        self._failures = 0
+        self._probing = 0
+        self._probe_successes = 0
+
+
+    def __repr__(self):
+        return "<CircuitBreaker %s: %s>" % (self.host, self.state)
+
+
+    def _prune(self, now):
+        cutoff = now - self.window
+        outcomes = self._outcomes
+        while outcomes and outcomes[0][0] < cutoff:
+            if outcomes.popleft()[1]:
+                self._failures -= 1
+
+
+    def _set_state(self, state, now):
+        """Returns the (old, new) states when the state changes."""
+        old = self.state
+        self.state = state
+        self._probing = self._probe_successes = 0
+        if state == OPEN:
+            self.opened_at = now
+        elif state == CLOSED:
+            self.opened_at = None
+            self._outcomes.clear()
+            self._failures = 0
+        return (old, state) if old != state else None
+
+
+    def before_call(self):
+        """
+        Raises CircuitOpen if a call may not be made now. Otherwise returns
+        the (old, new) states if letting the call through half-opened the
+        circuit, or None. Every call let through must be followed by a call
+        to record() or release().
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return None
+            now = _now()
+            change = None
+            if self.state == OPEN:
+                wait = self.opened_at + self.reset_timeout - now
+                if wait > 0:
+                    raise self._open_error(wait)
+                change = self._set_state(HALF_OPEN, now)
+            if self._probing >= self.probes:
+                raise self._open_error(0)
+            self._probing += 1
+            return change
+
+
+    def _open_error(self, wait):
+        err = exc.CircuitOpen("Calls to '%s' are failing; the circuit breaker "
+                "will allow another call in %.1f seconds." % (self.host, wait))
+        err.host = self.host
+        err.retry_after = wait
+        return err
+
+
+    def record(self, error=None):
+        """
+        Records the outcome of a call that before_call() let through, given
+        the error it raised, if any. Returns the (old, new) states if this
+        changed the state of the circuit, or None.
+        """
+        failed = is_failure(error)
+        with self._lock:
+            now = _now()
+            if self.state == HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+                if failed:
+                    return self._set_state(OPEN, now)
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    return self._set_state(CLOSED, now)
+                return None
+            if self.state == OPEN:
+                # A call that was let through before the circuit opened.
+                return None
+            self._prune(now)
+            self._outcomes.append((now, failed))
+            if failed:
+                self._failures += 1
+                calls = len(self._outcomes)
+                if (calls >= self.min_calls and
+                        self._failures >= self.failure_rate * calls):
+                    return self._set_state(OPEN, now)
+            return None
+
+
+    def release(self):
+        """
+        Called instead of record() when a call that before_call() let through
+        was not made after all, so that it doesn't count either way.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+
+
+    def reset(self):
+        """Closes the circuit and forgets the recorded calls."""
+        with self._lock:
+            self._set_state(CLOSED, _now())
+
+
+    def snapshot(self):
+        """Returns a dict describing the state of the circuit."""
+        with self._lock:
+            now = _now()
+            self._prune(now)
+            calls = len(self._outcomes)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.opened_at + self.reset_timeout - now)
+            return {
+                    "host": self.host,
+                    "state": self.state,
+                    "calls": calls,
+                    "failures": self._failures,
+                    "failure_rate": (float(self._failures) / calls
+                            if calls else 0.0),
+                    "retry_in": retry_in,
+                    }
+
+
+
+class BreakerRegistry(object):
+    """
+    Holds a CircuitBreaker for each host, created on first use with the
+    keyword arguments given to the registry. Clients that share a registry
+    share the breaker for each endpoint host they call.
+    """
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+
+    def get(self, host):
+        """Returns the breaker for 'host', creating it if needed."""
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(host)
+                if breaker is None:
+                    breaker = CircuitBreaker(host, **self.breaker_kwargs)
+                    self._breakers[host] = breaker
+        return breaker
+
+
+    def states(self):
+        """Returns the snapshot of every breaker, keyed by host."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return dict((brk.host, brk.snapshot()) for brk in breakers)
+
+
+    def open_hosts(self):
+        """Returns the hosts whose circuits are not closed."""
+        return sorted(host for host, state in six.iteritems(self.states())
+                if state["state"] != CLOSED)
+
+
+    def reset(self):
+        """Forgets all the breakers."""
+        with self._lock:
+            self._breakers.clear()
+
+
+# The breakers used by all clients when the 'circuit_breaker' setting is on.
+default_registry = BreakerRegistry()
+
+
+def get_default_registry():
+    """
+    Returns the shared registry if the 'circuit_breaker' setting is on, or
+    None if it is off.
+    """
+    enabled = pyrax.get_setting("circuit_breaker")
+    if isinstance(enabled, six.string_types):
+        enabled = enabled.strip().lower() in _TRUE_VALUES
+    return default_registry if enabled else None
+
+
+def get_states():
+    """Returns the state of the shared breakers, keyed by host."""
+    return default_registry.states()
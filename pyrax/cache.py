@@ -0,0 +1,225 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+A response cache for GET and HEAD calls. Cached responses are re-used while
+they are fresh, and are then revalidated with the server using their ETag or
+Last-Modified values, so that unchanged data is not sent again.
+"""
+
+import collections
+import copy
+import threading
+import time
+
+from six.moves import urllib
+
+
+# Python 2 has no monotonic clock.
+_now = getattr(time, "monotonic", time.time)
+
+DEFAULT_MAX_ENTRIES = 256
+CACHEABLE_METHODS = ("GET", "HEAD")
+# Calls with any of these request headers ask for part of a resource, for
+# the latest copy of it, or make their own conditional request, so they are
+# never answered from the cache.
+BYPASS_HEADERS = ("range", "if-range", "if-match", "if-none-match",
+        "if-modified-since", "if-unmodified-since", "x-newest")
+# These request headers select the representation that is returned, so
+# their values are part of the cache key.
+VARY_HEADERS = ("accept", "accept-language")
+
+
+class CacheEntry(object):
+    """A cached response, its decoded body, and its validators."""
+    def __init__(self, resp, body, expires):
+        self.resp = resp
+        self.body = body
+        self.expires = expires
+        headers = resp.headers or {}
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+
+
+    def fresh(self):
+        """Returns True if the entry can be used without revalidating it."""
+        return self.expires is not None and _now() < self.expires
+
+
+    def validators(self):
+        """Returns the headers that make a request conditional on a change."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+    def copy_body(self):
+        """
+        Returns a copy of the body, so that callers that modify the decoded
+        JSON don't change the cached version.
+        """
+        return _copy(self.body)
+
+
+
+class ResponseCache(object):
+    """
+    Holds up to 'max_entries' responses, discarding the least recently used
+    ones first. A response is re-used without asking the server for 'ttl'
+    seconds after it was received; after that, or always when 'ttl' is None,
+    it is revalidated using its ETag or Last-Modified value. Responses with
+    neither are only cached when there is a 'ttl'.
+
+    Any other call through the same client removes the cached responses for
+    its URI, for the URIs above it, such as its container or collection, and
+    for those below it. A cache can be shared by any number of threads.
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def __repr__(self):
+        return "<ResponseCache entries=%s/%s ttl=%s>" % (len(self._entries),
+                self.max_entries, self.ttl)
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    @staticmethod
+    def is_cacheable(method, kwargs):
+        """
+        Returns True if a call with these request kwargs can be answered from
+        the cache: it must be a GET or HEAD without a body, must not be
+        streamed, and must not have any of the BYPASS_HEADERS.
+        """
+        if (method.upper() not in CACHEABLE_METHODS or kwargs.get("stream")
+                or kwargs.get("data") is not None
+                or kwargs.get("body") is not None):
+            return False
+        names = _header_names(kwargs)
+        if "no-cache" in (_header(kwargs, "cache-control") or "").lower():
+            return False
+        return not any(name in names for name in BYPASS_HEADERS)
+
+
+    @staticmethod
+    def key(method, uri, kwargs):
+        """
+        Returns the key for the call, which includes the value of each of the
+        VARY_HEADERS it was made with.
+        """
+        vary = tuple(_header(kwargs, name) for name in VARY_HEADERS)
+        return (method.upper(), uri, bool(kwargs.get("raw_content")), vary)
+
+
+    def get(self, key):
+        """Returns the entry for 'key', or None if there is none."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Mark it as the most recently used.
+                del self._entries[key]
+                self._entries[key] = entry
+            return entry
+
+
+    def put(self, key, resp, body):
+        """
+        Caches the response if it can be revalidated or there is a 'ttl', and
+        the server has not forbidden it. Returns the new entry, or None.
+        """
+        headers = resp.headers or {}
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return None
+        expires = None
+        if self.ttl:
+            expires = _now() + self.ttl
+        entry = CacheEntry(resp, _copy(body), expires)
+        if expires is None and not (entry.etag or entry.last_modified):
+            return None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+    def refresh(self, entry):
+        """Marks an entry that the server reported as unchanged as fresh."""
+        if self.ttl:
+            entry.expires = _now() + self.ttl
+
+
+    def invalidate(self, uri):
+        """
+        Removes the entries for the URI, and for any URI that contains it or
+        is contained in it.
+        """
+        path = _path(uri)
+        with self._lock:
+            stale = [key for key in self._entries
+                    if _related(path, _path(key[1]))]
+            for key in stale:
+                del self._entries[key]
+
+
+    def clear(self):
+        """Removes all the entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+
+def _header_names(kwargs):
+    return set(name.lower() for name in (kwargs.get("headers") or {}))
+
+
+def _header(kwargs, name):
+    """Returns the value of the request header, ignoring its case."""
+    for key, val in (kwargs.get("headers") or {}).items():
+        if key.lower() == name:
+            return val
+    return None
+
+
+def _copy(body):
+    if isinstance(body, (dict, list)):
+        return copy.deepcopy(body)
+    return body
+
+
+def _path(uri):
+    parsed = urllib.parse.urlparse(uri)
+    return "%s%s" % (parsed.netloc, parsed.path.rstrip("/"))
+
+
+def _related(path, other):
+    """
+    Returns True if one of the paths is the same as the other, or is one of
+    its ancestors.
+    """
+    if len(path) > len(other):
+        path, other = other, path
+    return other == path or other.startswith(path + "/")
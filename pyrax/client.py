@@ -24,8 +24,10 @@ OpenStack Client interface. Handles the REST calls and responses.
 
 from __future__ import absolute_import, unicode_literals
 
-import json
+import collections
+import copy
 import logging
+import threading
 import time
 
 import requests
@@ -33,7 +35,28 @@ import six
 from six.moves import urllib
 
 import pyrax
+import pyrax.breaker
+import pyrax.cache
 import pyrax.exceptions as exc
+import pyrax.hedging
+import pyrax.jsoncodec
+import pyrax.ratelimit
+import pyrax.retry
+import pyrax.singleflight
+import pyrax.stats
+import pyrax.transport
+
+
+# Python 2 has no monotonic clock.
+_now = getattr(time, "monotonic", time.time)
+# The number of most recent calls kept in a client's timings history.
+MAX_TIMINGS = 1000
+# The points in the life of a call at which hooks can be run.
+HOOK_TYPES = ("before_request", "after_response", "on_retry", "on_reauth",
+        "on_circuit_change")
+# Identical calls with these methods that are made at the same time are
+# coalesced into one.
+COALESCED_METHODS = ("GET", "HEAD")
 
 
 def _safe_quote(val):
@@ -44,6 +67,67 @@ def _safe_quote(val):
     return urllib.parse.quote(val, safe=SAFE_QUOTE_CHARS)
 
 
+def _safe_uri(management_url, uri):
+    """
+    Returns the full, properly-quoted URI for the request. Relative URIs are
+    appended to the 'management_url'; for absolute URIs, everything but the
+    scheme and netloc is quoted.
+    """
+    if uri.startswith("http"):
+        parsed = list(urllib.parse.urlparse(uri))
+        for pos, item in enumerate(parsed):
+            if pos < 2:
+                # Don't escape the scheme or netloc
+                continue
+            parsed[pos] = _safe_quote(parsed[pos])
+        return urllib.parse.urlunparse(parsed)
+    return "%s%s" % (management_url, _safe_quote(uri))
+
+
+def _content_length(resp, stream=False):
+    """
+    Returns the number of bytes in the response's body as received, or zero
+    if that is not known without reading a streamed body.
+    """
+    try:
+        return int(resp.headers.get("Content-Length"))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    if stream:
+        return 0
+    content = getattr(resp, "content", None)
+    if isinstance(content, (six.binary_type, six.text_type)):
+        return len(content)
+    return 0
+
+
+def _can_coalesce(method, kwargs):
+    return (method.upper() in COALESCED_METHODS and not kwargs.get("stream")
+            and kwargs.get("data") is None and kwargs.get("body") is None)
+
+
+def _flight_key(method, uri, kwargs):
+    """
+    Returns a key that is the same for calls that would send exactly the
+    same request.
+    """
+    headers = tuple(sorted(kwargs.get("headers", {}).items()))
+    others = tuple(sorted((key, repr(val)) for key, val in kwargs.items()
+            if key != "headers"))
+    return (method.upper(), uri, headers, others)
+
+
+def _copy_result(result):
+    """
+    Gives each thread sharing a coalesced call its own copy of the decoded
+    body. The response object itself is shared.
+    """
+    resp, body = result
+    if isinstance(body, (dict, list)):
+        body = copy.deepcopy(body)
+    return resp, body
+
+
 class BaseClient(object):
     """
     The base class for all pyrax clients.
@@ -52,10 +136,16 @@ class BaseClient(object):
     user_agent = None
     # Each client subclass should set their own name.
     name = "base"
+    # Lifecycle hooks for the calls made by all clients; see add_hook().
+    _hooks_map = {}
 
     def __init__(self, identity, region_name=None, endpoint_type=None,
             management_url=None, service_name=None, timings=False,
-            verify_ssl=True, http_log_debug=False, timeout=None):
+            verify_ssl=True, http_log_debug=False, timeout=None,
+            pool_maxsize=None, retry_policy=None, rate_limiter=None,
+            compression_threshold=None, response_cache=None,
+            circuit_breakers=None, hedge_policy=None, transport=None,
+            coalesce_requests=False):
         self.version = "v1.1"
         self.identity = identity
         self.region_name = region_name
@@ -66,7 +156,37 @@ class BaseClient(object):
         self.verify_ssl = verify_ssl
         self.http_log_debug = http_log_debug
         self.timeout = timeout
-        self.times = []  # [("item", starttime, endtime), ...]
+        # The most recent [("item", starttime, endtime), ...] when 'timings'
+        # is True.
+        self.times = collections.deque(maxlen=MAX_TIMINGS)
+        self.stats = pyrax.stats.ClientStats()
+        self.retry_policy = retry_policy
+        self.retries = 0
+        self.rate_limiter = rate_limiter
+        # A pyrax.breaker.BreakerRegistry; when None, the shared one is used
+        # if the 'circuit_breaker' setting is on.
+        self.circuit_breakers = circuit_breakers
+        # A pyrax.hedging.HedgePolicy for sending a second copy of slow GET
+        # and HEAD calls; None disables hedging.
+        self.hedge_policy = hedge_policy
+        self.pool_maxsize = pool_maxsize
+        # The name of the transport used to send calls; None is the default
+        # requests transport. See use_transport().
+        self.transport = transport
+        self._session = None
+        self._session_lock = threading.Lock()
+        # JSON request bodies of at least this many bytes are sent gzipped;
+        # None disables compressing them.
+        self.compression_threshold = compression_threshold
+        self.bytes_saved = 0
+        self._stats_lock = threading.Lock()
+        self.response_cache = response_cache
+        # When True, identical GET and HEAD calls made by several threads at
+        # the same time are only sent once. The threads then share the same
+        # response object, each with its own copy of the body.
+        self.coalesce_requests = coalesce_requests
+        self._flights = pyrax.singleflight.SingleFlight(
+                copy_result=_copy_result)
 
         self._manager = None
         # Hook method for subclasses to create their manager instance
@@ -83,12 +203,16 @@ class BaseClient(object):
 
 
     # The next 6 methods are simple pass-through to the manager.
-    def list(self, limit=None, marker=None):
+    def list(self, limit=None, marker=None, fields=None, as_dicts=False,
+            as_columns=False):
         """
         Returns a list of resource objects. Pagination is supported through the
-        optional 'marker' and 'limit' parameters.
+        optional 'marker' and 'limit' parameters. Pass the names of the values
+        you need as 'fields' to get rows of those values instead of objects,
+        as described in BaseManager.list().
         """
-        return self._manager.list(limit=limit, marker=marker)
+        return self._manager.list(limit=limit, marker=marker, fields=fields,
+                as_dicts=as_dicts, as_columns=as_columns)
 
 
     def get(self, item):
@@ -131,14 +255,87 @@ class BaseClient(object):
         self.identity.unauthenticate()
 
 
+    @property
+    def session(self):
+        """
+        The pooled HTTP session used for all of this client's requests. It is
+        created on first use, and keeps its connections alive between calls.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = pyrax.transport.create_transport(
+                            self.transport, pool_maxsize=self.pool_maxsize)
+        return self._session
+
+
+    def use_transport(self, name):
+        """
+        Sends this client's calls through the transport registered as 'name',
+        such as 'http2', from now on. The connections pooled by the previous
+        transport are released.
+        """
+        session = pyrax.transport.create_transport(name,
+                pool_maxsize=self.pool_maxsize)
+        with self._session_lock:
+            old, self._session = self._session, session
+            self.transport = name
+        if old is not None:
+            old.close()
+
+
+    def close(self):
+        """
+        Releases any pooled connections held by this client. The client can
+        still be used afterwards; a new session is created when needed.
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+
     def get_timings(self):
-        """Returns a list of all execution timings."""
-        return self.times
+        """
+        Returns a list of the execution timings of the most recent calls,
+        which are only recorded when the client's 'timings' is True.
+        """
+        return list(self.times)
 
 
     def reset_timings(self):
         """Clears the timing history."""
-        self.times = []
+        self.times = collections.deque(maxlen=MAX_TIMINGS)
+
+
+    def get_stats(self):
+        """
+        Returns a snapshot of the statistics for this client's calls: the
+        latency percentiles, status codes, bytes sent and received and retries
+        for each verb and URI template, plus the totals and the bytes saved
+        by compression, the number of calls that shared the response to
+        another, and the state of the circuit breaker for the client's
+        endpoint, if it has one.
+        """
+        snapshot = self.stats.snapshot()
+        snapshot["bytes_saved"] = self.bytes_saved
+        snapshot["coalesced"] = self._flights.shared
+        breaker = None
+        if self.management_url:
+            breaker = self._get_circuit_breaker(self.management_url)
+        snapshot["circuit_breaker"] = breaker and breaker.snapshot()
+        policy = self.hedge_policy
+        snapshot["hedging"] = policy and policy.snapshot()
+        return snapshot
+
+
+    def reset_stats(self):
+        """Discards the statistics for this client's calls."""
+        self.stats.reset()
+        self._flights.reset_stats()
+        with self._stats_lock:
+            self.bytes_saved = 0
+            self.retries = 0
 
 
     def get_limits(self):
@@ -149,6 +346,49 @@ class BaseClient(object):
         return resp_body
 
 
+    def enable_rate_limiting(self, block=True, fraction=0.9, timeout=None):
+        """
+        Loads the account's rate limits, and paces all further calls made by
+        this client so that they stay within 'fraction' of those limits. When
+        'block' is False, calls that would exceed a limit raise
+        RateLimitExceeded instead of waiting. Returns the RateLimiter, which
+        can also be assigned to the 'rate_limiter' of other clients.
+        """
+        limiter = pyrax.ratelimit.RateLimiter(self.get_limits(), block=block,
+                fraction=fraction, timeout=timeout)
+        self.rate_limiter = limiter
+        return limiter
+
+
+    def enable_hedging(self, percentile=95, budget=0.1, **kwargs):
+        """
+        Sends a second copy of any GET or HEAD call that takes longer than
+        the 'percentile' latency of the previous calls to the same API, and
+        uses whichever response arrives first. No more than 'budget' of the
+        calls are hedged. Any other keyword arguments are passed to the
+        HedgePolicy, which is returned, and can also be assigned to the
+        'hedge_policy' of other clients.
+        """
+        policy = pyrax.hedging.HedgePolicy(percentile=percentile,
+                budget=budget, **kwargs)
+        self.hedge_policy = policy
+        return policy
+
+
+    def enable_response_cache(self, max_entries=None, ttl=None):
+        """
+        Caches the responses to this client's GET and HEAD calls, and
+        revalidates them with the server instead of fetching them again. See
+        pyrax.cache.ResponseCache for how 'max_entries' and 'ttl' are used.
+        Returns the ResponseCache.
+        """
+        if max_entries is None:
+            max_entries = pyrax.cache.DEFAULT_MAX_ENTRIES
+        cache = pyrax.cache.ResponseCache(max_entries=max_entries, ttl=ttl)
+        self.response_cache = cache
+        return cache
+
+
     def _add_custom_headers(self, dct):
         """
         Clients for some services must add headers that are required for that
@@ -172,26 +412,211 @@ class BaseClient(object):
         kwargs.setdefault("headers", kwargs.get("headers", {}))
         kwargs["headers"]["User-Agent"] = self.user_agent
         kwargs["headers"]["Accept"] = "application/json"
+        kwargs["headers"].setdefault("Accept-Encoding",
+                pyrax.http.ACCEPT_ENCODING)
         if ("body" in kwargs) or ("data" in kwargs):
             if "Content-Type" not in kwargs["headers"]:
                 kwargs["headers"]["Content-Type"] = "application/json"
             elif kwargs["headers"]["Content-Type"] is None:
                 del kwargs["headers"]["Content-Type"]
+        if "body" in kwargs and self.compression_threshold is not None:
+            self._compress_body(kwargs)
         # Allow subclasses to add their own headers
         self._add_custom_headers(kwargs["headers"])
-        resp, body = pyrax.http.request(method, uri, *args, **kwargs)
+        kwargs["session"] = self.session
+        cache = self.response_cache
+        if cache is not None:
+            resp, body = self._cached_request(cache, uri, method, *args,
+                    **kwargs)
+        else:
+            resp, body = self._send_request(uri, method, *args, **kwargs)
         if resp.status_code >= 400:
             raise exc.from_response(resp, body)
         return resp, body
 
 
+    def _send_request(self, uri, method, *args, **kwargs):
+        resp, body = pyrax.http.request(method, uri, *args, **kwargs)
+        if not kwargs.get("stream"):
+            self._add_bytes_saved(pyrax.http.response_bytes_saved(resp))
+        return resp, body
+
+
+    def _cached_request(self, cache, uri, method, *args, **kwargs):
+        """
+        Makes the call through the response cache. Fresh cached responses are
+        returned without a call, stale ones are revalidated, and any call that
+        may change something removes the cached responses it affects.
+        """
+        if method.upper() not in pyrax.cache.CACHEABLE_METHODS:
+            try:
+                return self._send_request(uri, method, *args, **kwargs)
+            finally:
+                cache.invalidate(uri)
+        if not cache.is_cacheable(method, kwargs):
+            return self._send_request(uri, method, *args, **kwargs)
+        key = cache.key(method, uri, kwargs)
+        entry = cache.get(key)
+        if entry is not None:
+            if entry.fresh():
+                return entry.resp, entry.copy_body()
+            kwargs["headers"].update(entry.validators())
+        resp, body = self._send_request(uri, method, *args, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            cache.refresh(entry)
+            return entry.resp, entry.copy_body()
+        if resp.status_code == 200:
+            cache.put(key, resp, body)
+        return resp, body
+
+
+    def _compress_body(self, kwargs):
+        """
+        Replaces the 'body' in the request's kwargs with its JSON encoding,
+        gzipped if it is at least 'compression_threshold' bytes long.
+        """
+        data = pyrax.jsoncodec.dumps(kwargs.pop("body"))
+        if isinstance(data, six.text_type):
+            data = data.encode("utf-8")
+        if len(data) >= self.compression_threshold:
+            compressed = pyrax.http.gzip_compress(data)
+            if len(compressed) < len(data):
+                kwargs["headers"]["Content-Encoding"] = "gzip"
+                self._add_bytes_saved(len(data) - len(compressed))
+                data = compressed
+        kwargs["data"] = data
+
+
+    def _add_bytes_saved(self, num):
+        if num:
+            with self._stats_lock:
+                self.bytes_saved += num
+
+
     def _time_request(self, uri, method, **kwargs):
         """Wraps the request call and records the elapsed time."""
+        if self._hooks_map.get("before_request"):
+            self.run_hooks("before_request", method=method, uri=uri,
+                    template=self._uri_template(uri),
+                    headers=kwargs.setdefault("headers", {}))
         start_time = time.time()
-        resp, body = self.request(uri, method, **kwargs)
-        self.times.append(("%s %s" % (method, uri),
-                start_time, time.time()))
-        return resp, body
+        start = _now()
+        resp = None
+        status = None
+        error = None
+        try:
+            resp, body = self.request(uri, method, **kwargs)
+            status = getattr(resp, "status_code", None)
+            return resp, body
+        except exc.ClientException as e:
+            status = e.code
+            error = e
+            raise
+        except Exception as e:
+            status = e.__class__.__name__
+            error = e
+            raise
+        finally:
+            elapsed = _now() - start
+            if self.timings:
+                self.times.append(("%s %s" % (method, uri),
+                        start_time, start_time + elapsed))
+            self._record_stats(method, uri, start_time, elapsed, status, resp,
+                    error, kwargs.get("stream"))
+
+
+    def _record_stats(self, method, uri, start_time, elapsed, status, resp,
+            error, stream):
+        bytes_in = bytes_out = 0
+        if resp is not None:
+            bytes_in = _content_length(resp, stream)
+            sent = getattr(getattr(resp, "request", None), "body", None)
+            if isinstance(sent, (six.binary_type, six.text_type)):
+                bytes_out = len(sent)
+        template = self._uri_template(uri)
+        for stats in (self.stats, pyrax.stats.global_stats):
+            stats.record(method, template, elapsed, status, bytes_in=bytes_in,
+                    bytes_out=bytes_out)
+        if self._hooks_map.get("after_response"):
+            self.run_hooks("after_response", method=method, uri=uri,
+                    template=template, status=status, response=resp,
+                    error=error, start_time=start_time, elapsed=elapsed,
+                    bytes_in=bytes_in, bytes_out=bytes_out)
+
+
+    @classmethod
+    def add_hook(cls, hook_type, hook_func):
+        """
+        Registers 'hook_func' to be called at a point in the life of every
+        API call made by any client. It is called with the client and a dict
+        of information about the call, whose keys depend on the hook type:
+
+            before_request: method, uri, template, headers. The headers can
+                be modified, for example to add a tracing header.
+            after_response: method, uri, template, status, response, error,
+                start_time, elapsed, bytes_in, bytes_out. The 'status' is the
+                HTTP status, or the name of the error when there is no
+                response, and 'response' and 'error' are None when absent.
+            on_retry: method, uri, template, attempt, delay, error.
+            on_reauth: method, uri, template, error.
+            on_circuit_change: method, uri, template, host, old_state,
+                new_state. The states are 'closed', 'open' and 'half_open'.
+
+        The 'template' is the URI with the endpoint, query string and any IDs
+        or names removed, such as '/servers/{id}'. Errors raised by a hook are
+        logged and otherwise ignored. When no hooks are registered, calls
+        don't spend any time on them.
+        """
+        if hook_type not in HOOK_TYPES:
+            raise exc.InvalidHookType("'%s' is not a valid hook type; valid "
+                    "types are: %s" % (hook_type, ", ".join(HOOK_TYPES)))
+        if hook_type not in cls._hooks_map:
+            cls._hooks_map[hook_type] = []
+        cls._hooks_map[hook_type].append(hook_func)
+
+
+    @classmethod
+    def remove_hook(cls, hook_type, hook_func):
+        """Unregisters a hook function added with add_hook()."""
+        funcs = [func for func in cls._hooks_map.get(hook_type, [])
+                if func != hook_func]
+        if funcs:
+            cls._hooks_map[hook_type] = funcs
+        else:
+            cls._hooks_map.pop(hook_type, None)
+
+
+    def run_hooks(self, hook_type, **info):
+        """Calls each hook function registered for 'hook_type'."""
+        for hook_func in self._hooks_map.get(hook_type) or []:
+            try:
+                hook_func(self, info)
+            except Exception:
+                pyrax._logger.exception("Error in %s hook %r", hook_type,
+                        hook_func)
+
+
+    def _uri_template(self, uri):
+        """
+        Returns the URI without the endpoint or query string, and with any IDs
+        or names replaced, such as '/servers/{id}', so that the statistics for
+        calls to the same API are kept together.
+        """
+        mgmt = self.management_url
+        if mgmt and uri.startswith(mgmt):
+            path = uri[len(mgmt):].split("?", 1)[0]
+        else:
+            path = urllib.parse.urlparse(uri).path
+        return self._path_template(path)
+
+
+    def _path_template(self, path, members=None):
+        """
+        Hook for clients whose URIs can't be made into templates by the
+        default rules in pyrax.stats.path_template(). Clients whose resources
+        are addressed by name can pass the 'members' mapping described there.
+        """
+        return pyrax.stats.path_template(path, members=members)
 
 
     def _api_request(self, uri, method, **kwargs):
@@ -202,42 +627,191 @@ class BaseClient(object):
         """
         id_svc = self.identity
         if not all((self.management_url, id_svc.token, id_svc.tenant_id)):
-            id_svc.authenticate()
+            id_svc.reauthenticate(id_svc.auth_generation)
 
-        if not self.management_url:
+        # Read once, so that the whole call uses the same endpoint even if it
+        # is replaced by another thread meanwhile.
+        management_url = self.management_url
+        if not management_url:
             # We've authenticated but no management_url has been set. This
             # indicates that the service is not available.
             raise exc.ServiceNotAvailable("The '%s' service is not available."
                     % self)
-        if uri.startswith("http"):
-            parsed = list(urllib.parse.urlparse(uri))
-            for pos, item in enumerate(parsed):
-                if pos < 2:
-                    # Don't escape the scheme or netloc
-                    continue
-                parsed[pos] = _safe_quote(parsed[pos])
-            safe_uri = urllib.parse.urlunparse(parsed)
-        else:
-            safe_uri = "%s%s" % (self.management_url, _safe_quote(uri))
-        # Perform the request once. If we get a 401 back then it
-        # might be because the auth token expired, so try to
-        # re-authenticate and try again. If it still fails, bail.
+        safe_uri = _safe_uri(management_url, uri)
+        kwargs.setdefault("headers", {})["X-Auth-Token"] = id_svc.token
+        if id_svc.tenant_id:
+            kwargs["headers"]["X-Auth-Project-Id"] = id_svc.tenant_id
+        if self.coalesce_requests and _can_coalesce(method, kwargs):
+            key = _flight_key(method, safe_uri, kwargs)
+            return self._flights.do(key, self._retry_request, safe_uri,
+                    method, **kwargs)
+        return self._retry_request(safe_uri, method, **kwargs)
+
+
+    def _retry_request(self, safe_uri, method, **kwargs):
+        """
+        Makes the call, retrying it according to the client's retry policy,
+        and pacing it with the client's rate limiter. While the circuit
+        breaker for the endpoint is open, CircuitOpen is raised instead.
+        """
+        policy = self._get_retry_policy()
+        breaker = self._get_circuit_breaker(safe_uri)
+        # Bodies such as generators can't be sent twice, so never retry them.
+        rewind = pyrax.retry.body_rewinder(kwargs.get("data"))
+        attempt = 0
+        while True:
+            if breaker is not None:
+                self._circuit_changed(breaker, breaker.before_call(), method,
+                        safe_uri)
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire(method, safe_uri)
+                except Exception:
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+            try:
+                result = self._hedged_request(safe_uri, method, **kwargs)
+            except Exception as e:
+                if breaker is not None:
+                    self._circuit_changed(breaker, breaker.record(e), method,
+                            safe_uri)
+                if (policy is None or rewind is None or
+                        not policy.should_retry(method, attempt, e)):
+                    raise
+                delay = policy.get_delay(attempt, e)
+                attempt += 1
+                self._record_retry(method, safe_uri, attempt, delay, e)
+                time.sleep(delay)
+                rewind()
+            else:
+                if breaker is not None:
+                    self._circuit_changed(breaker, breaker.record(), method,
+                            safe_uri)
+                return result
+
+
+    def _hedged_request(self, uri, method, **kwargs):
+        """
+        Makes the call, hedging it with a second copy if the client has a
+        hedge policy and the call is a slow GET or HEAD without a body.
+        """
+        policy = self.hedge_policy
+        if (policy is None or method.upper() not in
+                pyrax.hedging.HEDGED_METHODS or kwargs.get("data") is not None
+                or kwargs.get("body") is not None):
+            return self._auth_request(uri, method, **kwargs)
+        delay = policy.get_delay(self.stats, method, self._uri_template(uri))
+        # Each copy gets its own headers, since both add to them.
+        copy_kwargs = dict(kwargs, headers=dict(kwargs.get("headers") or {}))
+
+        def primary():
+            return self._auth_request(uri, method, **kwargs)
+
+        def hedge():
+            return self._auth_request(uri, method, **copy_kwargs)
+
+        def allow():
+            if self.rate_limiter is None:
+                return True
+            try:
+                self.rate_limiter.acquire(method, uri, block=False)
+                return True
+            except exc.RateLimitExceeded:
+                return False
+
+        def discard(result):
+            if kwargs.get("stream"):
+                # Release the connection held by the unread body.
+                result[0].close()
+
+        return policy.run(primary, hedge, delay, allow=allow, discard=discard)
+
+
+    def _auth_request(self, uri, method, **kwargs):
+        """
+        Performs the request once. If we get a 401 back then it might be
+        because the auth token expired, so try to re-authenticate and try
+        again. If it still fails, bail.
+
+        When many threads share the identity, only the first of them to get
+        the 401 re-authenticates; the others wait for it to finish, and then
+        retry with the token it got.
+        """
+        id_svc = self.identity
+        generation = id_svc.auth_generation
+        headers = kwargs.get("headers")
+        if headers and "X-Auth-Token" in headers:
+            # The token may have been replaced since the headers were set; it
+            # must be at least as recent as the generation just read.
+            headers["X-Auth-Token"] = id_svc.token
         try:
-            kwargs.setdefault("headers", {})["X-Auth-Token"] = id_svc.token
-            if id_svc.tenant_id:
-                kwargs["headers"]["X-Auth-Project-Id"] = id_svc.tenant_id
-            resp, body = self._time_request(safe_uri, method, **kwargs)
-            return resp, body
+            return self._time_request(uri, method, **kwargs)
         except exc.Unauthorized as ex:
+            if self._hooks_map.get("on_reauth"):
+                self.run_hooks("on_reauth", method=method, uri=uri,
+                        template=self._uri_template(uri), error=ex)
             try:
-                id_svc.authenticate()
+                id_svc.reauthenticate(generation)
                 kwargs["headers"]["X-Auth-Token"] = id_svc.token
-                resp, body = self._time_request(safe_uri, method, **kwargs)
-                return resp, body
+                return self._time_request(uri, method, **kwargs)
             except exc.Unauthorized:
                 raise ex
 
 
+    def _get_retry_policy(self):
+        """
+        Returns the retry policy for this client: either the one set on the
+        client itself, or the default policy defined in the settings.
+        """
+        if self.retry_policy is not None:
+            return self.retry_policy
+        return pyrax.retry.get_default_policy()
+
+
+    def _get_circuit_breaker(self, uri):
+        """
+        Returns the circuit breaker for the host in 'uri', or None if this
+        client doesn't use circuit breakers.
+        """
+        registry = self.circuit_breakers
+        if registry is None:
+            registry = pyrax.breaker.get_default_registry()
+            if registry is None:
+                return None
+        return registry.get(urllib.parse.urlparse(uri).netloc)
+
+
+    def _circuit_changed(self, breaker, change, method, uri):
+        """Logs a change in the state of a circuit, and runs its hooks."""
+        if change is None:
+            return
+        old_state, new_state = change
+        log = (pyrax._logger.warning if new_state == pyrax.breaker.OPEN
+                else pyrax._logger.info)
+        log("Circuit for %s changed from %s to %s.", breaker.host, old_state,
+                new_state)
+        if self._hooks_map.get("on_circuit_change"):
+            self.run_hooks("on_circuit_change", method=method, uri=uri,
+                    template=self._uri_template(uri), host=breaker.host,
+                    old_state=old_state, new_state=new_state)
+
+
+    def _record_retry(self, method, uri, attempt, delay, error):
+        """Keeps count of retried calls, and logs each retry."""
+        with self._stats_lock:
+            self.retries += 1
+        template = self._uri_template(uri)
+        for stats in (self.stats, pyrax.stats.global_stats):
+            stats.record_retry(method, template)
+        if self._hooks_map.get("on_retry"):
+            self.run_hooks("on_retry", method=method, uri=uri,
+                    template=template, attempt=attempt, delay=delay,
+                    error=error)
+        pyrax._logger.debug("Retry %s of %s %s in %.2f seconds after: %s",
+                attempt, method, uri, delay, error)
+
+
     def method_head(self, uri, **kwargs):
         """Method used to make HEAD requests."""
         return self._api_request(uri, "HEAD", **kwargs)
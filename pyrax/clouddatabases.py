@@ -70,6 +70,10 @@ class CloudDatabaseManager(BaseManager):
     """
     This class manages communication with Cloud Database instances.
     """
+    # The number of instances that a listing returns by default.
+    page_size = 20
+
+
     def get(self, item):
         """
         This additional code is necessary to properly return the 'volume'
@@ -178,6 +182,14 @@ class CloudDatabaseDatabaseManager(BaseManager):
     """
     This class manages communication with databases on Cloud Database instances.
     """
+    page_size = 20
+
+
+    def _next_marker(self, last):
+        """Databases are paged by name, since they have no ID."""
+        return last.name
+
+
     def _create_body(self, name, character_set=None, collate=None):
         body = {"databases": [
                 {"name": name,
@@ -193,6 +205,14 @@ class CloudDatabaseUserManager(BaseManager):
     This class handles operations on the users in a database on a Cloud
     Database instance.
     """
+    page_size = 20
+
+
+    def _next_marker(self, last):
+        """Users are paged by name, since they have no ID."""
+        return last.name
+
+
     def _create_body(self, name, password, databases=None, database_names=None,
             host=None):
         db_dicts = [{"name": db} for db in database_names]
@@ -680,6 +700,15 @@ class CloudDatabaseClient(BaseClient):
     """
     name = "Cloud Databases"
 
+    def _path_template(self, path):
+        """
+        Databases and users are addressed by their name, so it is always
+        replaced in the URI templates used for statistics.
+        """
+        return super(CloudDatabaseClient, self)._path_template(path,
+                members={"databases": "{name}", "users": "{name}"})
+
+
     def _configure_manager(self):
         """
         Creates a manager to handle the instances, and another
@@ -18,7 +18,6 @@
 from __future__ import absolute_import, unicode_literals
 
 from functools import wraps
-import json
 import re
 import time
 
@@ -30,6 +29,7 @@ from pyrax.cloudloadbalancers import CloudLoadBalancer
 import pyrax.exceptions as exc
 from pyrax.manager import BaseManager
 from pyrax.resource import BaseResource
+from pyrax.resource import LazyDetail
 import pyrax.utils as utils
 
 # How long (in seconds) to wait for a response from async operations
@@ -59,13 +59,15 @@ class CloudDNSRecord(BaseResource):
     This class represents a domain record.
     """
     GET_DETAILS = False
+    # Domains can have thousands of records.
+    COMPACT = True
     # Initialize the supported attributes.
-    type = None
-    name = None
-    data = None
-    priority = None
-    ttl = None
-    comment = None
+    type = LazyDetail("type", None)
+    name = LazyDetail("name", None)
+    data = LazyDetail("data", None)
+    priority = LazyDetail("priority", None)
+    ttl = LazyDetail("ttl", None)
+    comment = LazyDetail("comment", None)
 
     def update(self, data=None, priority=None, ttl=None, comment=None):
         """
@@ -379,13 +381,20 @@ class CloudDNSManager(BaseManager):
         return qs
 
 
-    def list(self, limit=None, offset=None):
-        """Gets a list of all domains, or optionally a page of domains."""
+    def list(self, limit=None, offset=None, fields=None, as_dicts=False,
+            as_columns=False):
+        """
+        Gets a list of all domains, or optionally a page of domains. Pass the
+        names of the values you need as 'fields' to get rows of those values
+        instead of objects, as described in BaseManager.list().
+        """
         uri = "/%s%s" % (self.uri_base, self._get_pagination_qs(limit, offset))
-        return self._list(uri)
+        return self._list(uri, fields=fields, as_dicts=as_dicts,
+                as_columns=as_columns)
 
 
-    def _list(self, uri, obj_class=None, list_all=False):
+    def _list(self, uri, obj_class=None, list_all=False, fields=None,
+            as_dicts=False, as_columns=False):
         """
         Handles the communication with the API when getting
         a full listing of the resources managed by this class.
@@ -393,17 +402,25 @@ class CloudDNSManager(BaseManager):
         resp, resp_body = self._retry_get(uri)
         if obj_class is None:
             obj_class = self.resource_class
+        if as_columns:
+            # The columns are made from the rows of all the pages.
+            as_dicts = False
 
         data = resp_body[self.plural_response_key]
-        ret = [obj_class(self, res, loaded=False)
-                for res in data if res]
+        if fields:
+            ret = utils.project(data, fields, as_dicts=as_dicts)
+        else:
+            ret = [obj_class(self, res, loaded=False)
+                    for res in data if res]
         self._reset_paging("domain", resp_body)
         if list_all:
             dom_paging = self._paging.get("domain", {})
             while dom_paging.get("next_uri"):
                 next_uri = dom_paging.get("next_uri")
                 ret.extend(self._list(uri=next_uri, obj_class=obj_class,
-                        list_all=False))
+                        list_all=False, fields=fields, as_dicts=as_dicts))
+        if fields and as_columns:
+            return utils.to_columns(ret, fields)
         return ret
 
 
@@ -512,7 +529,7 @@ class CloudDNSManager(BaseManager):
         else:
             ret = resp, resp_body
         try:
-            resp_body = json.loads(resp_body)
+            resp_body = pyrax.jsoncodec.loads(resp_body)
         except Exception:
             pass
         return ret
@@ -1063,6 +1080,16 @@ class CloudDNSClient(BaseClient):
     """
     name = "Cloud DNS"
 
+    def _path_template(self, path):
+        """
+        PTR records are addressed by the name of the service that owns the
+        device, so it is always replaced in the URI templates used for
+        statistics.
+        """
+        return super(CloudDNSClient, self)._path_template(path,
+                members={"rdns": "{service}"})
+
+
     def _configure_manager(self):
         """
         Creates a manager to handle the instances, and another
@@ -1102,9 +1129,14 @@ class CloudDNSClient(BaseClient):
         self._manager._set_delay(delay)
 
 
-    def list(self, limit=None, offset=None):
-        """Returns a list of all resources."""
-        return self._manager.list(limit=limit, offset=offset)
+    def list(self, limit=None, offset=None, fields=None, as_dicts=False,
+            as_columns=False):
+        """
+        Returns a list of all resources. Pass the names of the values you need
+        as 'fields' to get rows of those values instead of objects.
+        """
+        return self._manager.list(limit=limit, offset=offset, fields=fields,
+                as_dicts=as_dicts, as_columns=as_columns)
 
 
     def list_previous_page(self):
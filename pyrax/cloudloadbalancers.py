@@ -431,6 +431,10 @@ class CloudLoadBalancer(BaseResource):
 
 
 class CloudLoadBalancerManager(BaseManager):
+    # The most load balancers that a listing returns at a time.
+    page_size = 100
+
+
     def update(self, lb, name=None, algorithm=None, protocol=None,
             halfClosed=None, port=None, timeout=None, httpsRedirect=None):
         """
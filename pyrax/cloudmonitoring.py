@@ -29,6 +29,22 @@ import pyrax.utils as utils
 
 _invalid_key_pat = re.compile(r"Validation error for key '([^']+)'")
 
+# The segment that follows each of these collections in a URI is an ID or
+# name, even when it is made only of letters.
+_PATH_MEMBERS = {
+        "entities": "{id}",
+        "checks": "{id}",
+        "alarms": "{id}",
+        "metrics": "{name}",
+        "notifications": "{id}",
+        "notification_plans": "{id}",
+        "notification_types": "{id}",
+        "check_types": "{id}",
+        "monitoring_zones": "{id}",
+        "agents": "{id}",
+        "agent_tokens": "{id}",
+        }
+
 
 def _params_to_dict(params, dct, local_dict):
     for param in params:
@@ -261,6 +277,10 @@ class CloudMonitorEntity(BaseResource):
 
 
 class _PaginationManager(BaseManager):
+    # The most items that a listing returns at a time.
+    page_size = 1000
+
+
     def list(self, limit=None, marker=None, return_next=False):
         """
         This is necessary to handle pagination correctly, as the Monitoring
@@ -281,6 +301,23 @@ class _PaginationManager(BaseManager):
             return ret
 
 
+    def _iter_listing(self, **params):
+        """
+        Generates the items on all the pages of the listing, for findall().
+        Each page gives the marker of the next one in its metadata, which
+        can't be read until the page's items have been, so the pages aren't
+        streamed.
+        """
+        marker = None
+        while True:
+            ents, marker = self.list(limit=self.page_size, marker=marker,
+                    return_next=True)
+            for ent in ents:
+                yield ent
+            if not marker:
+                return
+
+
 
 class CloudMonitorNotificationManager(_PaginationManager):
     """
@@ -1014,6 +1051,16 @@ class CloudMonitorClient(BaseClient):
         self.name = "Cloud Monitoring"
 
 
+    def _path_template(self, path):
+        """
+        Monitoring IDs and type names such as 'mzdfw' or 'email' may be made
+        only of letters, so they are always replaced in the URI templates
+        used for statistics.
+        """
+        return super(CloudMonitorClient, self)._path_template(path,
+                members=_PATH_MEMBERS)
+
+
     def _configure_manager(self):
         """
         Creates the Manager instances to handle monitoring.
@@ -17,11 +17,30 @@
 #    under the License.
 from __future__ import absolute_import, unicode_literals
 
+import importlib
+import sys
+
 # Since we use the novaclient package, we need to expose its exception
-# classes here.
-from novaclient import exceptions as _nova_exceptions
-ServerNotFound = _nova_exceptions.NotFound
-ServerClientException = _nova_exceptions.ClientException
+# classes here. novaclient is slow to import, so they are only imported when
+# first used; Python versions before 3.7 can't do that, and import them now.
+_nova_exceptions = {"ServerNotFound": "NotFound",
+        "ServerClientException": "ClientException",
+        }
+
+
+def __getattr__(name):
+    if name not in _nova_exceptions:
+        raise AttributeError("module '%s' has no attribute '%s'"
+                % (__name__, name))
+    module = importlib.import_module("novaclient.exceptions")
+    value = globals()[name] = getattr(module, _nova_exceptions[name])
+    return value
+
+
+if sys.version_info < (3, 7):
+    for _name in _nova_exceptions:
+        __getattr__(_name)
+
 
 class PyraxException(Exception):
     pass
@@ -29,6 +48,9 @@ class PyraxException(Exception):
 class AccessListIDNotFound(PyraxException):
     pass
 
+class AiohttpModuleNotInstalled(PyraxException):
+    pass
+
 class AuthenticationFailed(PyraxException):
     pass
 
@@ -41,6 +63,9 @@ class AuthSystemNotFound(PyraxException):
 class CDNFailed(PyraxException):
     pass
 
+class CircuitOpen(PyraxException):
+    pass
+
 class DBUpdateUnchanged(PyraxException):
     pass
 
@@ -95,6 +120,9 @@ class FileNotFound(PyraxException):
 class FolderNotFound(PyraxException):
     pass
 
+class HttpxModuleNotInstalled(PyraxException):
+    pass
+
 class KeyringModuleNotInstalled(PyraxException):
     pass
 
@@ -128,6 +156,9 @@ class InvalidDeviceType(PyraxException):
 class InvalidEmail(PyraxException):
     pass
 
+class InvalidHookType(PyraxException):
+    pass
+
 class InvalidImageMember(PyraxException):
     pass
 
@@ -164,6 +195,9 @@ class InvalidPTRRecord(PyraxException):
 class InvalidQueueName(PyraxException):
     pass
 
+class InvalidRateLimits(PyraxException):
+    pass
+
 class InvalidSessionPersistenceType(PyraxException):
     pass
 
@@ -176,6 +210,9 @@ class InvalidSize(PyraxException):
 class InvalidTemporaryURLMethod(PyraxException):
     pass
 
+class InvalidTransport(PyraxException):
+    pass
+
 class InvalidUploadID(PyraxException):
     pass
 
@@ -305,6 +342,12 @@ class PTRRecordUpdateFailed(PyraxException):
 class QueueClientIDNotDefined(PyraxException):
     pass
 
+class RateLimitExceeded(PyraxException):
+    pass
+
+class RegionTimeout(PyraxException):
+    pass
+
 class ServiceNotAvailable(PyraxException):
     pass
 
@@ -362,11 +405,14 @@ class ClientException(PyraxException):
     """
     The base exception class for all exceptions this library raises.
     """
-    def __init__(self, code, message=None, details=None, request_id=None):
+    def __init__(self, code, message=None, details=None, request_id=None,
+            retry_after=None):
         self.code = code
         self.message = message or "-no error message returned-"
         self.details = details
         self.request_id = request_id
+        # The raw value of any 'Retry-After' header sent with the response.
+        self.retry_after = retry_after
 
     def __str__(self):
         formatted_string = "%s (HTTP %s)" % (self.message, self.code)
@@ -376,7 +422,8 @@ class ClientException(PyraxException):
 
     def __reduce__(self):
         return (self.__class__, (self.code, self.message,
-                                 self.details, self.request_id))
+                                 self.details, self.request_id,
+                                 self.retry_after))
 
 
 class BadRequest(ClientException):
@@ -428,6 +475,14 @@ class OverLimit(ClientException):
     message = "Over limit"
 
 
+class TooManyRequests(ClientException):
+    """
+    HTTP 429 - Too many requests: you are being rate limited.
+    """
+    http_status = 429
+    message = "Too many requests"
+
+
 # NotImplemented is a python keyword.
 class HTTPNotImplemented(ClientException):
     """
@@ -437,6 +492,16 @@ class HTTPNotImplemented(ClientException):
     message = "Not Implemented"
 
 
+class HTTPServiceUnavailable(ClientException):
+    """
+    HTTP 503 - Service Unavailable: the service is temporarily unable to
+    handle the request. Not to be confused with ServiceNotAvailable, which is
+    raised when a service is not in the service catalog at all.
+    """
+    http_status = 503
+    message = "Service Unavailable"
+
+
 
 # In Python 2.4 Exception is old-style and thus doesn't have a __subclasses__()
 # so we can do this:
@@ -445,7 +510,8 @@ class HTTPNotImplemented(ClientException):
 #
 # Instead, we have to hardcode it:
 _code_map = dict((c.http_status, c) for c in [BadRequest, Unauthorized,
-        Forbidden, NotFound, OverLimit, HTTPNotImplemented])
+        Forbidden, NotFound, OverLimit, TooManyRequests, HTTPNotImplemented,
+        HTTPServiceUnavailable])
 
 
 def from_response(response, body):
@@ -469,6 +535,7 @@ def from_response(response, body):
 #    pyrax.utils.trace()
 
     request_id = response.headers.get("x-compute-request-id")
+    retry_after = response.headers.get("Retry-After")
     if body:
         message = "n/a"
         details = "n/a"
@@ -486,6 +553,7 @@ def from_response(response, body):
         else:
             message = body
         return cls(code=status, message=message, details=details,
-                   request_id=request_id)
+                   request_id=request_id, retry_after=retry_after)
     else:
-        return cls(code=status, request_id=request_id)
+        return cls(code=status, request_id=request_id,
+                   retry_after=retry_after)
@@ -0,0 +1,192 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Running the same client call in several regions at once, so that the whole
+operation takes as long as the slowest region rather than the sum of them.
+"""
+
+from concurrent import futures
+import time
+
+import six
+
+import pyrax
+import pyrax.exceptions as exc
+
+
+# Python 2 has no monotonic clock.
+_now = getattr(time, "monotonic", time.time)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class RegionResult(object):
+    """The outcome of a call in one region: its result or its error."""
+    def __init__(self, region, result=None, error=None, elapsed=None):
+        self.region = region
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+
+    def __repr__(self):
+        if self.ok:
+            return "<RegionResult %s: ok>" % self.region
+        return "<RegionResult %s: %r>" % (self.region, self.error)
+
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+    def get(self):
+        """Returns the result, or raises the error."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+
+class FanOutResults(dict):
+    """The RegionResult for each region, keyed by region."""
+    @property
+    def results(self):
+        """A dict of the results of the regions whose call succeeded."""
+        return dict((region, res.result) for region, res in self.items()
+                if res.ok)
+
+
+    @property
+    def errors(self):
+        """A dict of the errors of the regions whose call failed."""
+        return dict((region, res.error) for region, res in self.items()
+                if not res.ok)
+
+
+
+def _service_regions(context, service):
+    """Returns the regions in which the service is available."""
+    if not context.authenticated:
+        raise exc.NotAuthenticated("You must authenticate before making "
+                "calls to a service.")
+    mapped = context.service_mapping.get(service) or service
+    svc = context.services.get(mapped)
+    if svc is None:
+        raise exc.NoSuchClient("The service '%s' is not available." % service)
+    return sorted(svc.regions)
+
+
+def _call_in_region(context, service, region, public, func, args, kwargs,
+        started):
+    started[region] = _now()
+    client = context.get_client(service, region, public=public)
+    if isinstance(func, six.string_types):
+        return getattr(client, func)(*args, **kwargs)
+    return func(client, *args, **kwargs)
+
+
+def iter_fan_out(service, func, *args, **kwargs):
+    """
+    Calls 'func' in each region in which 'service' is available, using up to
+    'max_workers' threads, and generates a RegionResult for each region as
+    soon as its call finishes.
+
+    'func' is either the name of a client method, which is called with any
+    other positional and keyword arguments, or a function that is called
+    with the region's client followed by those arguments.
+
+    These keyword arguments control the fan-out itself:
+        regions: the regions to call; by default, all that have the service.
+        context: the identity to use; by default, pyrax.identity.
+        public: use the public endpoints (the default) or the private ones.
+        max_workers: the most calls to run at once.
+        timeout: the seconds each region's call may take. A region that
+            takes longer gets a RegionTimeout error; its call is left to
+            finish in the background.
+    """
+    regions = kwargs.pop("regions", None)
+    context = kwargs.pop("context", None) or pyrax.identity
+    public = kwargs.pop("public", True)
+    max_workers = kwargs.pop("max_workers", DEFAULT_MAX_WORKERS)
+    timeout = kwargs.pop("timeout", None)
+    if context is None:
+        raise exc.NotAuthenticated("You must authenticate before making "
+                "calls to a service.")
+    if regions is None:
+        regions = _service_regions(context, service)
+    regions = list(regions)
+    if not regions:
+        return
+    started = {}
+    pool = futures.ThreadPoolExecutor(max_workers=min(max_workers,
+            len(regions)))
+    try:
+        pending = {}
+        for region in regions:
+            future = pool.submit(_call_in_region, context, service, region,
+                    public, func, args, kwargs, started)
+            pending[future] = region
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                # Wake up in time for the first call that will time out. Calls
+                # that haven't started can't time out before 'timeout' is up.
+                now = _now()
+                deadlines = [started[region] + timeout
+                        for region in pending.values() if region in started]
+                wait_for = max(0, min(deadlines + [now + timeout]) - now)
+            done, not_done = futures.wait(pending, timeout=wait_for,
+                    return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                region = pending.pop(future)
+                elapsed = _now() - started.get(region, _now())
+                try:
+                    result = RegionResult(region, result=future.result(),
+                            elapsed=elapsed)
+                except Exception as e:
+                    result = RegionResult(region, error=e, elapsed=elapsed)
+                yield result
+            if timeout is None:
+                continue
+            now = _now()
+            for future, region in list(pending.items()):
+                start = started.get(region)
+                if start is not None and now - start >= timeout:
+                    del pending[future]
+                    yield RegionResult(region, error=exc.RegionTimeout(
+                            "The call in region '%s' did not finish within "
+                            "%s seconds." % (region, timeout)),
+                            elapsed=now - start)
+    finally:
+        # Don't wait for calls that timed out, or that were abandoned when
+        # the caller stopped iterating.
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def fan_out(service, func, *args, **kwargs):
+    """
+    Calls 'func' in each region in which 'service' is available, and returns
+    a FanOutResults with the result or error for each region, once all of
+    them have finished. See iter_fan_out() for the arguments.
+    """
+    results = FanOutResults()
+    for result in iter_fan_out(service, func, *args, **kwargs):
+        results[result.region] = result
+    return results
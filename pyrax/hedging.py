@@ -0,0 +1,230 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Hedged requests: when a read takes longer than most calls to the same API,
+an identical second request is sent, and whichever answers first is used.
+"""
+
+from concurrent import futures
+import threading
+
+import pyrax
+import pyrax.breaker
+
+
+# Only calls that can safely be sent twice are hedged.
+HEDGED_METHODS = ("GET", "HEAD")
+DEFAULT_MAX_WORKERS = 32
+
+
+class HedgePolicy(object):
+    """
+    Decides when to send a second copy of a slow GET or HEAD call, and runs
+    the two copies.
+
+    The copy is sent once the call has taken longer than the 'percentile'
+    latency of the previous calls to the same API, as recorded in the
+    client's statistics, but never sooner than 'min_delay' or later than
+    'max_delay' seconds. Until 'min_samples' calls have been recorded, the
+    'default_delay' is used; if that is None, calls are not hedged.
+
+    The budget limits the extra load: each call earns 'budget' of a hedge,
+    up to 'burst' hedges saved up, and sending a copy spends one. With the
+    default budget of 0.1, no more than about one call in ten is hedged, no
+    matter how slow the service gets.
+
+    Each call runs on a thread of its own, so that the calls are never
+    held up by each other. The copies run on a pool of up to 'max_workers'
+    threads, which can be shared by several clients by giving them the same
+    policy; when all of them are busy, calls are not hedged.
+    """
+    def __init__(self, percentile=95, min_delay=0.01, max_delay=None,
+            default_delay=None, min_samples=20, budget=0.1, burst=10,
+            max_workers=DEFAULT_MAX_WORKERS):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self.burst = burst
+        self.max_workers = max_workers
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._credit = float(burst)
+        self._lock = threading.Lock()
+        self._pool = None
+        # The pool's idle workers; a copy is only sent if one is free, so
+        # that it never waits in the pool's queue.
+        self._idle = threading.Semaphore(max_workers)
+
+
+    def __repr__(self):
+        return "<%s percentile=%s budget=%s>" % (self.__class__.__name__,
+                self.percentile, self.budget)
+
+
+    def get_delay(self, stats, method, template):
+        """
+        Returns the seconds to wait for a call before hedging it, based on the
+        ClientStats 'stats', or None if the call should not be hedged.
+        """
+        latency, count = stats.percentile(method, template, self.percentile)
+        if latency is None or count < self.min_samples:
+            return self.default_delay
+        delay = max(self.min_delay, latency)
+        if self.max_delay is not None:
+            delay = min(self.max_delay, delay)
+        return delay
+
+
+    def _earn(self):
+        with self._lock:
+            self.calls += 1
+            self._credit = min(float(self.burst), self._credit + self.budget)
+
+
+    def _spend(self):
+        """Returns True if the budget allows another hedge, and uses it."""
+        with self._lock:
+            if self._credit < 1:
+                return False
+            self._credit -= 1
+            self.hedges += 1
+            return True
+
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers)
+            return self._pool
+
+
+    @staticmethod
+    def _start(func):
+        """
+        Calls 'func' on a new thread, and returns a Future for its result.
+        The thread starts at once, so the call never waits for a worker.
+        """
+        future = futures.Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                result = func()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return future
+
+
+    def _submit_hedge(self, hedge):
+        """
+        Submits 'hedge' to the pool, and returns its Future, if a worker is
+        free and the budget allows it; otherwise returns None.
+        """
+        if not self._idle.acquire(False):
+            return None
+        if not self._spend():
+            self._idle.release()
+            return None
+        future = self._get_pool().submit(hedge)
+        future.add_done_callback(lambda fut: self._idle.release())
+        return future
+
+
+    def run(self, primary, hedge, delay, allow=None, discard=None):
+        """
+        Calls 'primary'. If it has not finished after 'delay' seconds, the
+        budget allows it, a worker is free, and 'allow()' returns True, also
+        calls 'hedge', and returns the result of whichever finishes first. A
+        call that fails because the service is unhealthy doesn't count as
+        finishing, unless both fail; the primary's error is then raised.
+        'discard' is called with the result that is not used, if any.
+        """
+        self._earn()
+        if delay is None:
+            return primary()
+        first = self._start(primary)
+        done, not_done = futures.wait([first], timeout=delay)
+        if done or not (allow is None or allow()):
+            return first.result()
+        second = self._submit_hedge(hedge)
+        if second is None:
+            return first.result()
+        calls = [first, second]
+        pending = set(calls)
+        while True:
+            done, pending = futures.wait(pending,
+                    return_when=futures.FIRST_COMPLETED)
+            winner = None
+            for future in calls:
+                if (future.done() and
+                        not pyrax.breaker.is_failure(future.exception())):
+                    winner = future
+                    break
+            if winner is None:
+                if pending:
+                    continue
+                # Both copies failed.
+                return first.result()
+            if winner is second:
+                with self._lock:
+                    self.hedge_wins += 1
+            for other in calls:
+                if other is not winner:
+                    self._discard_later(other, discard)
+            return winner.result()
+
+
+    @staticmethod
+    def _discard_later(future, discard):
+        if discard is None:
+            return
+
+        def done(fut):
+            if fut.exception() is None:
+                try:
+                    discard(fut.result())
+                except Exception:
+                    pyrax._logger.exception("Error discarding a hedged call")
+        future.add_done_callback(done)
+
+
+    def snapshot(self):
+        """Returns a dict with the number of calls, hedges and hedge wins."""
+        with self._lock:
+            return {"calls": self.calls,
+                    "hedges": self.hedges,
+                    "hedge_wins": self.hedge_wins,
+                    }
+
+
+    def close(self):
+        """Stops the pool's threads once their calls finish."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
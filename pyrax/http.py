@@ -19,11 +19,14 @@ Wrapper around the requests library. Used for making all HTTP calls.
 """
 
 import logging
-import json
+import zlib
+
 import requests
 
 import pyrax
 import pyrax.exceptions as exc
+import pyrax.jsoncodec
+from pyrax.jsonstream import JSONStream
 
 
 req_methods = {
@@ -38,6 +41,63 @@ req_methods = {
 # NOTE: FIX THIS!!!
 verify_ssl = False
 
+# Default sizing for the connection pools of pooled sessions. The first is
+# the number of distinct hosts whose pools are kept; the second is the
+# number of keep-alive connections held open for each of those hosts.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# The response encodings that requests decodes transparently.
+ACCEPT_ENCODING = "gzip, deflate"
+# The encodings whose savings are counted for responses.
+COMPRESSED_ENCODINGS = ("gzip", "deflate")
+
+
+def create_session(pool_connections=None, pool_maxsize=None):
+    """
+    Returns a requests Session whose connections are kept alive and re-used
+    between calls, so that only the first request to a host pays for the
+    TCP and TLS handshakes. The pool can be tuned with the
+    'pool_connections' and 'pool_maxsize' parameters; if they are not
+    specified, the module defaults are used.
+
+    Sessions are safe to share among threads; when you are done with one,
+    call its close() method to release the pooled connections.
+    """
+    if pool_connections is None:
+        pool_connections = DEFAULT_POOL_CONNECTIONS
+    if pool_maxsize is None:
+        pool_maxsize = DEFAULT_POOL_MAXSIZE
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def gzip_compress(data, level=6):
+    """Returns the bytes in 'data' compressed in the gzip format."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def response_bytes_saved(resp):
+    """
+    Returns the number of bytes saved by the compression of the response's
+    body, or zero if it was not compressed or its size on the wire is not
+    known. This reads the body, so it must not be used on streamed responses.
+    """
+    headers = resp.headers or {}
+    encoding = (headers.get("Content-Encoding") or "").lower()
+    if encoding not in COMPRESSED_ENCODINGS:
+        return 0
+    try:
+        wire_size = int(headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        return 0
+    return max(0, len(resp.content or b"") - wire_size)
+
 
 def request(method, uri, *args, **kwargs):
     """
@@ -46,10 +106,24 @@ def request(method, uri, *args, **kwargs):
 
     Formats the request into a dict representing the headers
     and body that will be used to make the API call.
+
+    If a Session, or any other transport from pyrax.transport, is passed in
+    the 'session' parameter, the call is made through it so that its pooled
+    connections are re-used. Otherwise a one-off connection is made for the
+    call.
+
+    When 'stream' is True, a successful response's body is not read, and a
+    JSONStream is returned in its place so that a large listing can be
+    decoded incrementally. Error responses are always read in full.
     """
-    req_method = req_methods[method.upper()]
+    session = kwargs.pop("session", None)
+    if session is not None:
+        req_method = getattr(session, method.lower())
+    else:
+        req_method = req_methods[method.upper()]
     raise_exception = kwargs.pop("raise_exception", True)
     raw_content = kwargs.pop("raw_content", False)
+    stream = kwargs.pop("stream", False)
     kwargs["headers"] = kwargs.get("headers", {})
     http_log_req(method, uri, args, kwargs)
     data = None
@@ -59,16 +133,20 @@ def request(method, uri, *args, **kwargs):
     elif "body" in kwargs:
         if "Content-Type" not in kwargs["headers"]:
             kwargs["headers"]["Content-Type"] = "application/json"
-        data = json.dumps(kwargs.pop("body"))
+        data = pyrax.jsoncodec.dumps(kwargs.pop("body"))
+    if stream:
+        kwargs["stream"] = True
     if data:
         resp = req_method(uri, data=data, **kwargs)
     else:
         resp = req_method(uri, **kwargs)
-    if raw_content:
+    if stream and resp.status_code < 400 and not raw_content:
+        body = JSONStream(resp)
+    elif raw_content:
         body = resp.content
     else:
         try:
-            body = resp.json()
+            body = pyrax.jsoncodec.loads(resp.content)
         except ValueError:
             # No JSON in response
             body = resp.content
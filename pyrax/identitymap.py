@@ -0,0 +1,184 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+An identity map for a manager's resources: it keeps a single live object for
+each resource class and ID, so that getting or listing a resource again updates and returns the
+object already in use instead of creating another one that must load its
+details all over again.
+"""
+
+import collections
+import threading
+import time
+
+
+# Python 2 has no monotonic clock.
+_now = getattr(time, "monotonic", time.time)
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def key_of(obj):
+    """
+    Returns the key for a resource object in an identity map, or None if it
+    has no ID. The key is the object's class and its ID as a string, so that
+    IDs given as ints and as strings match, and a manager that lists other
+    kinds of resources, such as flavors, never gets back an object of the
+    wrong class.
+    """
+    info = getattr(obj, "_info", None)
+    if not isinstance(info, dict):
+        return None
+    key = info.get("id")
+    return None if key is None else (obj.__class__, "%s" % key)
+
+
+
+class _Entry(object):
+    def __init__(self, obj, expires, complete):
+        self.obj = obj
+        self.expires = expires
+        # True once the object's full details have been fetched.
+        self.complete = complete
+
+
+
+class IdentityMap(object):
+    """
+    Holds the live object for each of up to 'max_entries' resources,
+    discarding the least recently used ones first. An object is used for
+    'ttl' seconds after its details were last fetched or listed; after that
+    it is forgotten, and the next call creates a new one.
+
+    Only objects whose full details have been fetched with get() are returned
+    by get_fresh(). Objects from listings are kept so that later listings and
+    fetches update them in place, but a listing's partial details don't stop
+    get() from fetching the full ones.
+    """
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def __repr__(self):
+        return "<IdentityMap entries=%s/%s ttl=%s>" % (len(self._entries),
+                self.max_entries, self.ttl)
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def _live_entry(self, key, now):
+        """Returns the unexpired entry for 'key', or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= now:
+            del self._entries[key]
+            return None
+        # Mark it as the most recently used.
+        del self._entries[key]
+        self._entries[key] = entry
+        return entry
+
+
+    def get_fresh(self, resource_class, key):
+        """
+        Returns the fetched 'resource_class' object whose ID is 'key' if it is
+        still fresh, counting a hit, or None, counting a miss.
+        """
+        key = (resource_class, "%s" % key)
+        with self._lock:
+            entry = self._live_entry(key, _now())
+            if entry is not None and entry.complete:
+                self.hits += 1
+                return entry.obj
+            self.misses += 1
+            return None
+
+
+    def add(self, obj, complete=False):
+        """
+        Adds a resource object, and returns the live object for its class and
+        ID. If
+        there already is one, it is updated with the new object's details and
+        returned instead. 'complete' means that the object has its full
+        details, as returned by a get() call, and not just those in a listing.
+        """
+        key = key_of(obj)
+        if key is None:
+            return obj
+        with self._lock:
+            now = _now()
+            entry = self._live_entry(key, now)
+            if entry is None:
+                entry = _Entry(obj, now + self.ttl, complete)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return obj
+            live = entry.obj
+            if complete:
+                entry.complete = True
+                entry.expires = now + self.ttl
+            elif not entry.complete:
+                entry.expires = now + self.ttl
+        if live is not obj:
+            live._add_details(obj._info)
+            if complete:
+                live.loaded = True
+        return live
+
+
+    def invalidate(self, key):
+        """Forgets the objects of any class whose ID is 'key'."""
+        key = "%s" % key
+        with self._lock:
+            stale = [entry_key for entry_key in self._entries
+                    if entry_key[1] == key]
+            for entry_key in stale:
+                del self._entries[entry_key]
+
+
+    def clear(self):
+        """Forgets all the objects."""
+        with self._lock:
+            self._entries.clear()
+
+
+    def snapshot(self):
+        """Returns a dict with the number of entries, hits and misses."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries),
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": (float(self.hits) / lookups
+                            if lookups else 0.0),
+                    }
+
+
+    def reset_stats(self):
+        """Sets the hit and miss counts back to zero."""
+        with self._lock:
+            self.hits = self.misses = 0
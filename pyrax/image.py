@@ -190,6 +190,11 @@ class ImageManager(BaseManager):
     """
     Manager class for an Image.
     """
+    filter_params = {"name": "name", "status": "status",
+            "visibility": "visibility", "owner": "owner",
+            "member_status": "member_status"}
+
+
     def _create_body(self, name, metadata=None):
         """
         Used to create the dict required to create a new queue
@@ -204,11 +209,13 @@ class ImageManager(BaseManager):
     def list(self, limit=None, marker=None, name=None, visibility=None,
             member_status=None, owner=None, tag=None, status=None,
             size_min=None, size_max=None, sort_key=None, sort_dir=None,
-            return_raw=False):
+            return_raw=False, fields=None, as_dicts=False, as_columns=False):
         """
         Returns a list of resource objects. Pagination is supported through the
         optional 'marker' and 'limit' parameters. Filtering the returned value
         is possible by specifying values for any of the other parameters.
+        Pass the names of the values you need as 'fields' to get rows of those
+        values instead of objects, as described in BaseManager.list().
         """
         uri = "/%s" % self.uri_base
         qs = utils.dict_to_qs(dict(limit=limit, marker=marker, name=name,
@@ -217,14 +224,35 @@ class ImageManager(BaseManager):
                 size_max=size_max, sort_key=sort_key, sort_dir=sort_dir))
         if qs:
             uri = "%s?%s" % (uri, qs)
-        return self._list(uri, return_raw=return_raw)
+        return self._list(uri, return_raw=return_raw, fields=fields,
+                as_dicts=as_dicts, as_columns=as_columns)
 
 
     def list_all(self, name=None, visibility=None, member_status=None,
             owner=None, tag=None, status=None, size_min=None, size_max=None,
-            sort_key=None, sort_dir=None):
+            sort_key=None, sort_dir=None, fields=None, as_dicts=False,
+            as_columns=False):
         """
         Returns all of the images in one call, rather than in paginated batches.
+        If 'fields' is given, rows of those values are returned instead of
+        objects, as described in BaseManager.list().
+        """
+
+        items = self._iter_all(name=name, visibility=visibility,
+                member_status=member_status, owner=owner, tag=tag,
+                status=status, size_min=size_min, size_max=size_max,
+                sort_key=sort_key, sort_dir=sort_dir)
+        if fields:
+            return utils.project(items, fields, as_dicts=as_dicts,
+                    as_columns=as_columns)
+        obj_class = self.resource_class
+        return [obj_class(manager=self, info=res) for res in items if res]
+
+
+    def _iter_all(self, **params):
+        """
+        Generates the entries of all the pages of the listing for 'params',
+        following each page's 'next' link.
         """
 
         def strip_version(uri):
@@ -235,21 +263,24 @@ class ImageManager(BaseManager):
             pos = uri.find("/images")
             return uri[pos:]
 
-        obj_class = self.resource_class
-        resp, resp_body = self.list(name=name, visibility=visibility,
-                member_status=member_status, owner=owner, tag=tag,
-                status=status, size_min=size_min, size_max=size_max,
-                sort_key=sort_key, sort_dir=sort_dir, return_raw=True)
-        data = resp_body.get(self.plural_response_key, resp_body)
-        next_uri = strip_version(resp_body.get("next", ""))
-        ret = [obj_class(manager=self, info=res) for res in data if res]
-        while next_uri:
-            resp, resp_body = self.api.method_get(next_uri)
-            data = resp_body.get(self.plural_response_key, resp_body)
+        resp, resp_body = self.list(return_raw=True, **params)
+        while True:
+            for res in resp_body.get(self.plural_response_key, resp_body):
+                yield res
             next_uri = strip_version(resp_body.get("next", ""))
-            ret.extend([obj_class(manager=self, info=res)
-                    for res in data if res])
-        return ret
+            if not next_uri:
+                return
+            resp, resp_body = self.api.method_get(next_uri)
+
+
+    def _iter_listing(self, **params):
+        """
+        Generates the images on all the pages of the listing, for findall().
+        """
+        obj_class = self.resource_class
+        for res in self._iter_all(**params):
+            if res:
+                yield obj_class(manager=self, info=res)
 
 
     def create(self, name, img_format=None, img_container_format=None,
@@ -511,6 +542,15 @@ class ImageClient(BaseClient):
     name = "Images"
 
 
+    def _path_template(self, path):
+        """
+        Image tags are plain strings that may be made only of letters, so
+        they are always replaced in the URI templates used for statistics.
+        """
+        return super(ImageClient, self)._path_template(path,
+                members={"tags": "{name}", "members": "{id}"})
+
+
     def _configure_manager(self):
         """
         Create the manager to handle queues.
@@ -527,21 +567,26 @@ class ImageClient(BaseClient):
 
     def list(self, limit=None, marker=None, name=None, visibility=None,
             member_status=None, owner=None, tag=None, status=None,
-            size_min=None, size_max=None, sort_key=None, sort_dir=None):
+            size_min=None, size_max=None, sort_key=None, sort_dir=None,
+            fields=None, as_dicts=False, as_columns=False):
         """
         Returns a list of resource objects. Pagination is supported through the
         optional 'marker' and 'limit' parameters. Filtering the returned value
         is possible by specifying values for any of the other parameters.
+        Pass the names of the values you need as 'fields' to get rows of those
+        values instead of objects, as described in BaseManager.list().
         """
         return self._manager.list(limit=limit, marker=marker, name=name,
                 visibility=visibility, member_status=member_status,
                 owner=owner, tag=tag, status=status, size_min=size_min,
-                size_max=size_max, sort_key=sort_key, sort_dir=sort_dir)
+                size_max=size_max, sort_key=sort_key, sort_dir=sort_dir,
+                fields=fields, as_dicts=as_dicts, as_columns=as_columns)
 
 
     def list_all(self, name=None, visibility=None, member_status=None,
             owner=None, tag=None, status=None, size_min=None, size_max=None,
-            sort_key=None, sort_dir=None):
+            sort_key=None, sort_dir=None, fields=None, as_dicts=False,
+            as_columns=False):
         """
         Returns all of the images in one call, rather than in paginated batches.
         The same filtering options available in list() apply here, with the
@@ -550,7 +595,8 @@ class ImageClient(BaseClient):
         return self._manager.list_all(name=name, visibility=visibility,
                 member_status=member_status, owner=owner, tag=tag,
                 status=status, size_min=size_min, size_max=size_max,
-                sort_key=sort_key, sort_dir=sort_dir)
+                sort_key=sort_key, sort_dir=sort_dir, fields=fields,
+                as_dicts=as_dicts, as_columns=as_columns)
 
 
     def update(self, img, value_dict):
@@ -0,0 +1,124 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+The JSON codec used to encode request bodies and decode responses. The
+'json_codec' setting selects one of CODECS; the faster ones are used only if
+their module is installed, and the standard library's json module is used
+otherwise.
+"""
+
+import importlib
+import json
+import threading
+import warnings
+
+import pyrax
+
+
+CODECS = ("stdlib", "orjson", "ujson", "rapidjson")
+DEFAULT_CODEC = "stdlib"
+
+# Raised by the fast encoders for values they don't support, such as the
+# integer dict keys that orjson rejects. Those values are encoded by the
+# standard library instead.
+_ENCODE_ERRORS = (TypeError, ValueError, OverflowError)
+
+
+class Codec(object):
+    """
+    A pair of JSON functions. 'dumps' returns either text or UTF-8 bytes,
+    both of which can be sent as a request body; 'loads' accepts either.
+    """
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self._dumps = dumps
+        self.loads = loads
+
+
+    def __repr__(self):
+        return "<Codec %s>" % self.name
+
+
+    def dumps(self, obj):
+        try:
+            return self._dumps(obj)
+        except _ENCODE_ERRORS:
+            if self is _stdlib:
+                raise
+            return json.dumps(obj)
+
+
+_stdlib = Codec("stdlib", json.dumps, json.loads)
+
+
+def _load_codec(name):
+    """
+    Returns the Codec called 'name', or None if its module is not installed.
+    """
+    if name == "stdlib":
+        return _stdlib
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        return None
+    if name == "ujson":
+        def dumps(obj):
+            return module.dumps(obj, escape_forward_slashes=False)
+        return Codec(name, dumps, module.loads)
+    return Codec(name, module.dumps, module.loads)
+
+
+# The codec is only looked up again when the setting changes.
+_codec_lock = threading.Lock()
+_codec_name = None
+_codec = _stdlib
+
+
+def get_codec():
+    """
+    Returns the Codec selected by the 'json_codec' setting. An unknown name,
+    or one whose module is not installed, falls back to the standard library
+    with a warning.
+    """
+    global _codec_name, _codec
+    name = pyrax.get_setting("json_codec") or DEFAULT_CODEC
+    if name == _codec_name:
+        return _codec
+    with _codec_lock:
+        if name != _codec_name:
+            codec = None
+            if name in CODECS:
+                codec = _load_codec(name)
+            if codec is None:
+                msg = ("The JSON codec '%s' is not available; the standard "
+                        "library's json module will be used." % name)
+                warnings.warn(msg)
+                pyrax._logger.warning(msg)
+                codec = _stdlib
+            _codec = codec
+            _codec_name = name
+        return _codec
+
+
+def dumps(obj):
+    """Encodes 'obj' with the current codec, as text or UTF-8 bytes."""
+    return get_codec().dumps(obj)
+
+
+def loads(data):
+    """Decodes the text or bytes in 'data' with the current codec."""
+    return get_codec().loads(data)
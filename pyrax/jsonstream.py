@@ -0,0 +1,191 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Incremental decoding of JSON listings, so that the elements of a large list
+can be processed as they arrive instead of after the whole response has been
+read and parsed.
+"""
+
+import codecs
+import json
+import re
+
+
+DEFAULT_CHUNKSIZE = 65536
+
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+class _Reader(object):
+    """
+    Holds the undecoded text read so far from an iterable of byte chunks.
+    Text before 'pos' has already been consumed, and is discarded whenever
+    more text is read.
+    """
+    def __init__(self, chunks, encoding="utf-8"):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+
+    def fill(self):
+        """Reads another chunk. Returns False if there are no more."""
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        for chunk in self.chunks:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode("utf-8")
+            text = self.decoder.decode(chunk)
+            if text:
+                self.buf += text
+                return True
+        self.buf += self.decoder.decode(b"", final=True)
+        self.eof = True
+        return True
+
+
+    def peek(self):
+        """
+        Skips any whitespace, and returns the next character without consuming
+        it, or None at the end of the input.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+
+    def expect(self, chars):
+        """Consumes the next character, which must be one of 'chars'."""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError("Expected one of %r at position %s, found %r" %
+                    (chars, self.pos, char))
+        self.pos += 1
+        return char
+
+
+    def value(self):
+        """Decodes and consumes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                val, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.buf) and not self.eof:
+                # A number may continue in the next chunk.
+                self.fill()
+                continue
+            self.pos = end
+            return val
+
+
+
+def _iter_array(reader):
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_items(chunks, key=None, encoding="utf-8"):
+    """
+    Generates the elements of a JSON list from an iterable of byte chunks,
+    such as a response's iter_content(), decoding each one as soon as all of
+    it has been read. Only one element at a time is held in memory.
+
+    If the body is a list, its elements are generated. If it is an object,
+    the elements of its 'key' member are generated instead; other members
+    are decoded and discarded. If that member is an object with a 'values'
+    list, that list is used. Nothing is generated if there is no such member.
+    Malformed JSON raises ValueError.
+    """
+    reader = _Reader(chunks, encoding=encoding)
+    char = reader.peek()
+    if char == "[":
+        for item in _iter_array(reader):
+            yield item
+        return
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            for item in _iter_array(reader):
+                yield item
+            return
+        val = reader.value()
+        if name == key:
+            if isinstance(val, dict) and isinstance(val.get("values"), list):
+                for item in val["values"]:
+                    yield item
+                return
+            raise ValueError("The '%s' member is not a list." % key)
+        if reader.expect(",}") == "}":
+            return
+
+
+
+class JSONStream(object):
+    """
+    The body returned for a request made with 'stream=True'. The response
+    has not been read; call items() to decode its listing incrementally.
+    The connection is released once the listing has been consumed, or when
+    close() is called.
+    """
+    def __init__(self, resp, chunk_size=DEFAULT_CHUNKSIZE):
+        self.resp = resp
+        self.chunk_size = chunk_size
+
+
+    def __repr__(self):
+        return "<JSONStream %s>" % self.resp
+
+
+    def items(self, key=None):
+        """
+        Generates the elements of the listing in the response; see
+        iter_items() for how 'key' is used.
+        """
+        encoding = self.resp.encoding or "utf-8"
+        try:
+            chunks = self.resp.iter_content(self.chunk_size)
+            for item in iter_items(chunks, key=key, encoding=encoding):
+                yield item
+        finally:
+            self.close()
+
+
+    def close(self):
+        """Releases the connection without reading any more of the body."""
+        self.resp.close()
@@ -23,6 +23,7 @@ Base utilities to build API operation managers and objects on top of.
 """
 
 import pyrax.exceptions as exc
+import pyrax.identitymap
 import pyrax.utils as utils
 
 
@@ -34,6 +35,54 @@ except NameError:
         return True not in (not x for x in iterable)
 
 
+def _matches(obj, searches):
+    """
+    Returns True if 'obj' has all the (attribute, value) pairs in 'searches'.
+    """
+    try:
+        return all(getattr(obj, attr) == value for (attr, value) in searches)
+    except AttributeError:
+        return False
+
+
+
+class _AttributeIndex(object):
+    """
+    The items of a listing, keyed by their value of an attribute. Items that
+    lack the attribute are left out; those whose value can't be a dict key,
+    such as a list, are kept aside and checked on every lookup.
+    """
+    def __init__(self, attr, items):
+        self.attr = attr
+        self._items = {}
+        self._unhashable = []
+        for item in items:
+            try:
+                value = getattr(item, attr)
+            except AttributeError:
+                continue
+            try:
+                self._items.setdefault(value, []).append(item)
+            except TypeError:
+                self._unhashable.append(item)
+
+
+    def __repr__(self):
+        return "<_AttributeIndex %s: %s values>" % (self.attr,
+                len(self._items))
+
+
+    def lookup(self, value):
+        """
+        Returns the items that may have 'value' for the attribute, or None if
+        the index can't be used to look up 'value'.
+        """
+        try:
+            return self._items.get(value, []) + self._unhashable
+        except TypeError:
+            return None
+
+
 
 class BaseManager(object):
     """
@@ -44,6 +93,18 @@ class BaseManager(object):
     response_key = None
     plural_response_key = None
     uri_base = None
+    # The IdentityMap of the live resource objects, if it is enabled.
+    identity_map = None
+    # The attributes that the API can filter a listing on, mapped to the
+    # keyword argument of list() that does so. findall() passes criteria on
+    # these attributes on to the API.
+    filter_params = {}
+    # The number of items findall() requests per page, for APIs that page
+    # their listings with 'limit' and 'marker'; it must not be more than the
+    # API returns at most. If None, it makes a single list() call.
+    page_size = None
+    # The _AttributeIndex for each indexed attribute.
+    _indexes = None
     _hooks_map = {}
 
 
@@ -59,7 +120,8 @@ class BaseManager(object):
         self.uri_base = uri_base
 
 
-    def list(self, limit=None, marker=None, return_raw=False, other_keys=None):
+    def list(self, limit=None, marker=None, return_raw=False, other_keys=None,
+            stream=False, fields=None, as_dicts=False, as_columns=False):
         """
         Returns a list of resource objects. Pagination is supported through the
         optional 'marker' and 'limit' parameters.
@@ -77,6 +139,19 @@ class BaseManager(object):
         whose keys are the 'other_keys' items, and whose values are the
         corresponding values in the response body, or None if no such key is
         present.
+
+        For very large listings, pass 'stream=True'. A generator is returned
+        instead of a list, and the resource objects are created as the
+        response is read, so that the whole listing is never held in memory.
+        The 'return_raw' and 'other_keys' parameters can't be used with it.
+
+        When only a few values of each resource are needed, pass their names
+        as 'fields'. Instead of resource objects, a tuple of those values is
+        returned for each resource, straight from the decoded response. Pass
+        'as_dicts=True' to get dicts with just those keys instead, or
+        'as_columns=True' to get a single dict with a list of the values for
+        each field. With 'stream=True', the tuples or dicts are generated as
+        the response is read.
         """
         uri = "/%s" % self.uri_base
         pagination_items = []
@@ -87,7 +162,13 @@ class BaseManager(object):
         pagination = "&".join(pagination_items)
         if pagination:
             uri = "%s?%s" % (uri, pagination)
-        return self._list(uri, return_raw=return_raw, other_keys=other_keys)
+        if stream:
+            if fields and as_columns:
+                return utils.to_columns(self._list_stream(uri, fields=fields),
+                        fields)
+            return self._list_stream(uri, fields=fields, as_dicts=as_dicts)
+        return self._list(uri, return_raw=return_raw, other_keys=other_keys,
+                fields=fields, as_dicts=as_dicts, as_columns=as_columns)
 
 
     def head(self, item):
@@ -98,7 +179,14 @@ class BaseManager(object):
 
     def get(self, item):
         """Gets a specific item."""
-        uri = "/%s/%s" % (self.uri_base, utils.get_id(item))
+        item_id = utils.get_id(item)
+        imap = self.identity_map
+        if imap is not None:
+            obj = imap.get_fresh(self.resource_class, item_id)
+            # An object reloading itself always fetches its details.
+            if obj is not None and obj is not item:
+                return obj
+        uri = "/%s/%s" % (self.uri_base, item_id)
         return self._get(uri)
 
 
@@ -142,7 +230,7 @@ class BaseManager(object):
 
 
     def _list(self, uri, obj_class=None, body=None, return_raw=False,
-            other_keys=None):
+            other_keys=None, fields=None, as_dicts=False, as_columns=False):
         """
         Handles the communication with the API when getting
         a full listing of the resources managed by this class.
@@ -157,7 +245,12 @@ class BaseManager(object):
             obj_class = self.resource_class
 
         data = self._data_from_response(resp_body)
-        ret = [obj_class(self, res, loaded=False) for res in data if res]
+        if fields:
+            ret = utils.project(data, fields, as_dicts=as_dicts,
+                    as_columns=as_columns)
+        else:
+            ret = [self._remember(obj_class(self, res, loaded=False))
+                    for res in data if res]
         if other_keys:
             keys = utils.coerce_to_list(other_keys)
             other = [self._data_from_response(resp_body, key) for key in keys]
@@ -166,6 +259,29 @@ class BaseManager(object):
             return ret
 
 
+    def _list_stream(self, uri, obj_class=None, body=None, fields=None,
+            as_dicts=False):
+        """
+        Generator version of _list(), which decodes the listing and creates
+        the resource objects, or the rows of 'fields', as the response is
+        read.
+        """
+        if body:
+            resp, resp_body = self.api.method_post(uri, body=body, stream=True)
+        else:
+            resp, resp_body = self.api.method_get(uri, stream=True)
+        items = resp_body.items(key=self.plural_response_key)
+        if fields:
+            for row in utils.iter_rows(items, fields, as_dicts=as_dicts):
+                yield row
+            return
+        if obj_class is None:
+            obj_class = self.resource_class
+        for res in items:
+            if res:
+                yield self._remember(obj_class(self, res, loaded=False))
+
+
     def _data_from_response(self, resp_body, key=None):
         """
         This works for most API responses, but some don't structure their
@@ -203,8 +319,8 @@ class BaseManager(object):
         a specific resource managed by this class.
         """
         resp, resp_body = self.api.method_get(uri)
-        return self.resource_class(self, resp_body, self.response_key,
-                loaded=True)
+        return self._remember(self.resource_class(self, resp_body,
+                self.response_key, loaded=True), complete=True)
 
 
     def _create(self, uri, body, return_none=False, return_raw=False,
@@ -215,6 +331,7 @@ class BaseManager(object):
         """
         self.run_hooks("modify_body_for_create", body, **kwargs)
         resp, resp_body = self.api.method_post(uri, body=body)
+        self._forget(uri)
         if return_none:
             # No response body
             return
@@ -234,6 +351,7 @@ class BaseManager(object):
         a specific resource managed by this class.
         """
         _resp, _body = self.api.method_delete(uri)
+        self._forget(uri)
 
 
     def _update(self, uri, body, **kwargs):
@@ -243,6 +361,7 @@ class BaseManager(object):
         """
         self.run_hooks("modify_body_for_update", body, **kwargs)
         resp, resp_body = self.api.method_put(uri, body=body)
+        self._forget(uri)
         return resp_body
 
 
@@ -253,15 +372,65 @@ class BaseManager(object):
         """
         uri = "/%s/%s/action" % (self.uri_base, utils.get_id(item))
         action_body = {action_type: body}
-        return self.api.method_post(uri, body=action_body)
+        ret = self.api.method_post(uri, body=action_body)
+        self._forget(uri)
+        return ret
 
 
-    def find(self, **kwargs):
+    def enable_identity_map(self, ttl=None, max_entries=None):
+        """
+        Keeps a single live object for each of this manager's resources, which
+        get() returns without a call while it is fresh, and which listings
+        update in place instead of creating new objects that must load their
+        details again. See pyrax.identitymap.IdentityMap for how 'ttl' and
+        'max_entries' are used. Returns the IdentityMap.
         """
-        Finds a single item with attributes matching ``**kwargs``.
+        if ttl is None:
+            ttl = pyrax.identitymap.DEFAULT_TTL
+        if max_entries is None:
+            max_entries = pyrax.identitymap.DEFAULT_MAX_ENTRIES
+        imap = pyrax.identitymap.IdentityMap(ttl=ttl, max_entries=max_entries)
+        self.identity_map = imap
+        return imap
 
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+
+    def _remember(self, obj, complete=False):
+        """
+        Returns the live object for the resource 'obj' from the identity map,
+        if there is one, updated with the details of 'obj'.
+        """
+        imap = self.identity_map
+        if imap is None:
+            return obj
+        return imap.add(obj, complete=complete)
+
+
+    def _forget(self, uri):
+        """
+        Removes the resource that a call to 'uri' may have changed from the
+        identity map. If 'uri' is not below this manager's 'uri_base', all of
+        them are removed.
+        """
+        # Any change may make the indexes wrong.
+        self._indexes = None
+        imap = self.identity_map
+        if imap is None:
+            return
+        path = uri.split("?", 1)[0].strip("/")
+        base = ("%s" % self.uri_base).strip("/")
+        if path == base:
+            # Creating a resource doesn't change the others.
+            return
+        if path.startswith(base + "/"):
+            imap.invalidate(path[len(base) + 1:].split("/", 1)[0])
+        else:
+            imap.clear()
+
+
+    def find(self, **kwargs):
+        """
+        Finds a single item with attributes matching ``**kwargs``, as
+        described in findall().
         """
         matches = self.findall(**kwargs)
         num_matches = len(matches)
@@ -280,20 +449,96 @@ class BaseManager(object):
         """
         Finds all items with attributes matching ``**kwargs``.
 
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+        If one of the attributes has been indexed with create_index(), the
+        items are looked up in that index without making any calls.
+        Otherwise the criteria on the attributes in 'filter_params' are sent
+        to the API, so that it only lists items that may match, and the
+        listing is read page by page. Every criterion is then checked on the
+        Python side.
+        """
+        searches = list(kwargs.items())
+        candidates = None
+        for attr, value in searches:
+            index = (self._indexes or {}).get(attr)
+            if index is not None:
+                candidates = index.lookup(value)
+                if candidates is not None:
+                    break
+        if candidates is None:
+            params = dict((self.filter_params[attr], value)
+                    for (attr, value) in searches
+                    if attr in self.filter_params)
+            candidates = self._iter_listing(**params)
+        return [obj for obj in candidates if _matches(obj, searches)]
+
+
+    def _iter_listing(self, **params):
+        """
+        Generates all the items listed by list(), called with 'params'. If
+        'page_size' is set, the listing is read a page at a time with
+        _list_page(), until a page is not full. Managers whose listings are
+        paged some other way must override this to read every page.
+        """
+        if not self.page_size:
+            for obj in self.list(**params):
+                yield obj
+            return
+        marker = None
+        while True:
+            count = 0
+            last = None
+            for last in self._list_page(marker, **params):
+                count += 1
+                yield last
+            if count < self.page_size:
+                return
+            next_marker = self._next_marker(last)
+            if next_marker == marker:
+                # The API ignored the marker.
+                return
+            marker = next_marker
+
+
+    def _list_page(self, marker, **params):
+        """
+        Generates the items on the page of the listing that follows 'marker',
+        as the response is read.
+        """
+        return self.list(limit=self.page_size, marker=marker, stream=True,
+                **params)
+
+
+    def _next_marker(self, last):
         """
-        found = []
-        searches = kwargs.items()
+        Returns the marker for the page that follows the one ending with the
+        item 'last'.
+        """
+        return utils.get_id(last)
 
-        for obj in self.list():
-            try:
-                if all(getattr(obj, attr) == value
-                        for (attr, value) in searches):
-                    found.append(obj)
-            except AttributeError:
-                continue
-        return found
+
+    def create_index(self, attr):
+        """
+        Lists all the items, and indexes them by their value of 'attr', so
+        that find() and findall() look them up without making any calls. The
+        indexes are dropped by any change made through this manager; call
+        this again to rebuild them, or drop_index() once changes have been
+        made some other way.
+        """
+        index = _AttributeIndex(attr, self._iter_listing())
+        indexes = dict(self._indexes or {})
+        indexes[attr] = index
+        self._indexes = indexes
+        return index
+
+
+    def drop_index(self, attr=None):
+        """Drops the index for 'attr', or all of them if 'attr' is None."""
+        if attr is None or not self._indexes:
+            self._indexes = None
+            return
+        indexes = dict(self._indexes)
+        indexes.pop(attr, None)
+        self._indexes = indexes
 
 
     @classmethod
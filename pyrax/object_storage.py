@@ -38,6 +38,7 @@ from pyrax.client import BaseClient
 import pyrax.exceptions as exc
 from pyrax.manager import BaseManager
 from pyrax.resource import BaseResource
+from pyrax.resource import LazyDetail
 import pyrax.utils as utils
 
 ACCOUNT_META_PREFIX = "X-Account-Meta-"
@@ -330,28 +331,45 @@ class Container(BaseResource):
 
 
     def list(self, marker=None, limit=None, prefix=None, delimiter=None,
-            end_marker=None, full_listing=False, return_raw=False):
+            end_marker=None, full_listing=False, return_raw=False,
+            stream=False, fields=None, as_dicts=False, as_columns=False):
         """
         List the objects in this container, using the parameters to control the
         number and content of objects. Note that this is limited by the
         absolute request limits of Swift (currently 10,000 objects). If you
         need to list all objects in the container, use the `list_all()` method
         instead.
+
+        Pass 'stream=True' to get a generator that creates the objects as the
+        listing is read, instead of a list.
+
+        Pass the names of the values you need, such as ("name", "bytes"), as
+        'fields' to get rows of those values instead of objects. See
+        StorageObjectManager.list() for the details.
         """
         if full_listing:
-            return self.list_all(prefix=prefix)
+            return self.list_all(prefix=prefix, fields=fields,
+                    as_dicts=as_dicts, as_columns=as_columns)
         else:
             return self.object_manager.list(marker=marker, limit=limit,
                     prefix=prefix, delimiter=delimiter, end_marker=end_marker,
-                    return_raw=return_raw)
+                    return_raw=return_raw, stream=stream, fields=fields,
+                    as_dicts=as_dicts, as_columns=as_columns)
 
 
-    def list_all(self, prefix=None):
+    def list_all(self, prefix=None, fields=None, as_dicts=False,
+            as_columns=False):
         """
         List all the objects in this container, optionally filtered by an
         initial prefix. Returns an iterator that will yield all the objects in
         the container, even if the number exceeds the absolute limits of Swift.
+
+        If 'fields' is given, rows of those values for all the objects are
+        returned instead, as for StorageObjectManager.list_all().
         """
+        if fields:
+            return self.object_manager.list_all(prefix=prefix, fields=fields,
+                    as_dicts=as_dicts, as_columns=as_columns)
         return self.manager.object_listing_iterator(self, prefix=prefix)
 
 
@@ -371,20 +389,16 @@ class Container(BaseResource):
 
     def find(self, **kwargs):
         """
-        Finds a single object with attributes matching ``**kwargs``.
-
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+        Finds a single object with attributes matching ``**kwargs``. A
+        search on 'name' only lists the objects with that prefix.
         """
         return self.object_manager.find(**kwargs)
 
 
     def findall(self, **kwargs):
         """
-        Finds all objects with attributes matching ``**kwargs``.
-
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+        Finds all objects with attributes matching ``**kwargs``. A search on
+        'name' only lists the objects with that prefix.
         """
         return self.object_manager.findall(**kwargs)
 
@@ -785,6 +799,13 @@ class Container(BaseResource):
 
 
 class ContainerManager(BaseManager):
+    # The most names that Swift lists at a time.
+    page_size = 10000
+    # A container's name begins with itself, so only the containers with
+    # that prefix need to be listed to find it.
+    filter_params = {"name": "prefix"}
+
+
     def list(self, limit=None, marker=None, end_marker=None, prefix=None):
         """
         Swift doesn't return listings in the same format as the rest of
@@ -800,6 +821,25 @@ class ContainerManager(BaseManager):
                 for res in resp_body if res]
 
 
+    def _list_page(self, marker, prefix=None):
+        """
+        Generates the containers on the page of the listing that follows
+        'marker', as the response is read.
+        """
+        uri = "/%s" % self.uri_base
+        qs = utils.dict_to_qs({"marker": marker, "limit": self.page_size,
+                "prefix": prefix})
+        uri = "%s?%s" % (uri, qs)
+        resp, resp_body = self.api.method_get(uri, stream=True)
+        for res in resp_body.items():
+            if res:
+                yield Container(self, res, loaded=False)
+
+
+    def _next_marker(self, last):
+        return last.name
+
+
     @_handle_container_not_found
     def get(self, container):
         """
@@ -1561,6 +1601,13 @@ class StorageObject(BaseResource):
     """
     This class represents an object stored in a Container.
     """
+    # Containers can hold millions of objects.
+    COMPACT = True
+    name = LazyDetail("name")
+    content_type = LazyDetail("content_type")
+    bytes = LazyDetail("bytes")
+    hash = LazyDetail("hash")
+
     def __init__(self, manager, info, *args, **kwargs):
         self._container = None
         if ("name" not in info) and ("subdir" in info):
@@ -1748,6 +1795,13 @@ class StorageObjectManager(BaseManager):
     """
     Handles all the interactions with StorageObjects.
     """
+    # The most names that Swift lists at a time.
+    page_size = 10000
+    # An object's name begins with itself, so only the objects with that
+    # prefix need to be listed to find it.
+    filter_params = {"name": "prefix"}
+
+
     @property
     def name(self):
         """The URI base is the same as the container name."""
@@ -1765,20 +1819,98 @@ class StorageObjectManager(BaseManager):
 
 
     def list(self, marker=None, limit=None, prefix=None, delimiter=None,
-            end_marker=None, return_raw=False):
+            end_marker=None, return_raw=False, stream=False, fields=None,
+            as_dicts=False, as_columns=False):
+        """
+        Returns a list of the objects in the container. With 'stream=True',
+        a generator is returned instead, which creates the objects as the
+        listing is read so that it is never held in memory all at once.
+
+        To get just some of the values of each object, such as its name, hash
+        and bytes, pass their names as 'fields'. A tuple of those values is
+        returned for each object instead of a StorageObject, or a dict with
+        just those keys if 'as_dicts' is True. With 'as_columns=True', a dict
+        with a list of the values of each field is returned. The values come
+        straight from the listing, in which the entries for the
+        pseudo-subdirectories that a 'delimiter' groups objects into have a
+        'subdir' value instead of a 'name'.
+        """
         uri = "/%s" % self.uri_base
         qs = utils.dict_to_qs({"marker": marker, "limit": limit,
                 "prefix": prefix, "delimiter": delimiter,
                 "end_marker": end_marker})
         if qs:
             uri = "%s?%s" % (uri, qs)
+        if stream:
+            if fields and as_columns:
+                return utils.to_columns(self._list_stream(uri, fields=fields),
+                        fields)
+            return self._list_stream(uri, fields=fields, as_dicts=as_dicts)
         resp, resp_body = self.api.method_get(uri)
         if return_raw:
             return resp_body
+        if fields:
+            return utils.project(resp_body, fields, as_dicts=as_dicts,
+                    as_columns=as_columns)
         objs = [StorageObject(self, elem) for elem in resp_body]
         return objs
 
 
+    def _list_stream(self, uri, obj_class=None, body=None, fields=None,
+            as_dicts=False):
+        """
+        Swift listings are a plain list, and are never wrapped in a key.
+        """
+        resp, resp_body = self.api.method_get(uri, stream=True)
+        if fields:
+            for row in utils.iter_rows(resp_body.items(), fields,
+                    as_dicts=as_dicts):
+                yield row
+            return
+        for elem in resp_body.items():
+            yield StorageObject(self, elem)
+
+
+    def _iter_all(self, prefix=None):
+        """
+        Generates the entries of the listing of all the objects in the
+        container, making as many calls as needed.
+        """
+        marker = None
+        while True:
+            page = self.list(marker=marker, prefix=prefix, return_raw=True)
+            if not page:
+                return
+            for elem in page:
+                yield elem
+            last = page[-1]
+            marker = last.get("name") or last.get("subdir")
+
+
+    def list_all(self, prefix=None, fields=None, as_dicts=False,
+            as_columns=False):
+        """
+        Returns all of the objects in the container, optionally limited to
+        those whose names start with 'prefix', making as many calls as needed.
+        The 'fields', 'as_dicts' and 'as_columns' parameters work as they do
+        for list().
+        """
+        items = self._iter_all(prefix=prefix)
+        if fields:
+            return utils.project(items, fields, as_dicts=as_dicts,
+                    as_columns=as_columns)
+        return [StorageObject(self, elem) for elem in items]
+
+
+    def _list_page(self, marker, prefix=None):
+        return self.list(marker=marker, limit=self.page_size, prefix=prefix,
+                stream=True)
+
+
+    def _next_marker(self, last):
+        return last.name
+
+
     @_handle_object_not_found
     def get(self, obj):
         """
@@ -1943,6 +2075,7 @@ class StorageObjectManager(BaseManager):
         uri = "/%s/%s" % (self.uri_base, obj_name)
         resp, resp_body = self.api.method_put(uri, data=content,
                 headers=headers)
+        self._forget(uri)
 
 
     @_handle_object_not_found
@@ -2048,6 +2181,7 @@ class StorageObjectManager(BaseManager):
         """
         if nms is None:
             nms = self.api.list_object_names(self.name, full_listing=True)
+        self.drop_index()
         return self.api.bulk_delete(self.name, nms, async_=async_)
 
 
@@ -2253,6 +2387,18 @@ class StorageClient(BaseClient):
         return item
 
 
+    def _path_template(self, path):
+        """
+        Container and object names are chosen by the user, so both are
+        always replaced in the URI templates used for statistics.
+        """
+        if path.startswith("/") or not path:
+            parts = [part for part in path.split("/", 2)[1:] if part]
+            names = ["{container}", "{object}"][:len(parts)]
+            return "/" + "/".join(names)
+        return super(StorageClient, self)._path_template(path)
+
+
     def _configure_manager(self):
         """
         Creates a manager to handle interacting with Containers.
@@ -72,14 +72,30 @@ class BaseQueueManager(BaseManager):
     standards that the regular base classes are based on.
     """
     def _list(self, uri, obj_class=None, body=None, return_raw=False,
-            other_keys=None):
+            other_keys=None, fields=None, as_dicts=False, as_columns=False):
         try:
             return super(BaseQueueManager, self)._list(uri, obj_class=None,
-                    body=None, return_raw=return_raw, other_keys=other_keys)
+                    body=None, return_raw=return_raw, other_keys=other_keys,
+                    fields=fields, as_dicts=as_dicts, as_columns=as_columns)
         except (exc.NotFound, AttributeError):
             return []
 
 
+    def _list_stream(self, uri, obj_class=None, body=None, fields=None,
+            as_dicts=False):
+        count = 0
+        try:
+            for item in super(BaseQueueManager, self)._list_stream(uri,
+                    obj_class=obj_class, body=body, fields=fields,
+                    as_dicts=as_dicts):
+                count += 1
+                yield item
+        except (exc.NotFound, ValueError):
+            # An empty listing has no body at all.
+            if count:
+                raise
+
+
 
 class Queue(BaseResource):
     """
@@ -450,6 +466,10 @@ class QueueManager(BaseQueueManager):
     """
     Manager class for a Queue.
     """
+    # The most queues that a listing returns at a time.
+    page_size = 20
+
+
     def _create_body(self, name, metadata=None):
         """
         Used to create the dict required to create a new queue
@@ -534,6 +554,15 @@ class QueueClient(BaseClient):
                 uri_base="queues")
 
 
+    def _path_template(self, path):
+        """
+        Queues are addressed by their name, so it is always replaced in the
+        URI templates used for statistics.
+        """
+        return super(QueueClient, self)._path_template(path,
+                members={"queues": "{name}"})
+
+
     def _add_custom_headers(self, dct):
         """
         Add the Client-ID header required by Cloud Queues
@@ -0,0 +1,212 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Client-side pacing of API calls, based on the rate limits that the services
+report through their /limits call.
+"""
+
+import fnmatch
+import re
+import threading
+import time
+
+from six.moves import urllib
+
+import pyrax.exceptions as exc
+
+
+# Python 2 has no monotonic clock.
+_now = getattr(time, "monotonic", time.time)
+
+# Allowance for floating-point rounding when a bucket has just refilled.
+_EPSILON = 1e-9
+# The shortest pause made while waiting for a bucket to refill.
+MIN_SLEEP = 0.001
+
+UNIT_SECONDS = {
+        "SECOND": 1,
+        "MINUTE": 60,
+        "HOUR": 3600,
+        "DAY": 86400,
+        }
+
+
+class TokenBucket(object):
+    """
+    Allows up to 'capacity' calls at once, refilled at 'rate' calls per
+    second. It is not locked; the RateLimiter that owns it does that.
+
+    A bucket with a rate of zero represents a limit that allows no calls.
+    """
+    def __init__(self, rate, capacity, tokens=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        if tokens is None:
+            tokens = capacity
+        self.tokens = min(float(tokens), self.capacity)
+        self._stamp = _now()
+
+
+    def __repr__(self):
+        return "<TokenBucket rate=%.4f/s capacity=%s>" % (self.rate,
+                self.capacity)
+
+
+    def _refill(self):
+        now = _now()
+        self.tokens = min(self.capacity,
+                self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+
+    def wait_time(self):
+        """
+        Returns the number of seconds until a token will be available, zero
+        if one is available now, or None if one will never be available.
+        """
+        self._refill()
+        if self.tokens >= 1 - _EPSILON:
+            return 0
+        if not self.rate:
+            return None
+        return (1 - self.tokens) / self.rate
+
+
+    def take(self):
+        """Removes a token from the bucket."""
+        self.tokens = max(0.0, self.tokens - 1)
+
+
+
+class RateLimiter(object):
+    """
+    Keeps one token bucket for each (verb, URI regex) rate limit, and paces
+    calls so that those limits are never exceeded. A single limiter can be
+    shared by any number of threads and clients.
+
+    The buckets are filled at 'fraction' of the server's limit, leaving some
+    headroom for calls made from elsewhere. When 'block' is True, acquire()
+    waits for a token to become available; otherwise it raises
+    RateLimitExceeded immediately.
+    """
+    def __init__(self, limits=None, block=True, fraction=0.9, timeout=None):
+        self.block = block
+        self.fraction = fraction
+        self.timeout = timeout
+        self._buckets = []
+        self._lock = threading.Lock()
+        if limits:
+            self.load_limits(limits)
+
+
+    def __repr__(self):
+        return "<RateLimiter buckets=%s block=%s>" % (len(self._buckets),
+                self.block)
+
+
+    def load_limits(self, limits):
+        """
+        Replaces the current buckets with ones for the supplied limits. These
+        can be the full response of a client's get_limits() call, its list of
+        'rate' entries, or the list returned by
+        CloudDNSClient.get_rate_limits(). Raises InvalidRateLimits if the
+        limits are not in any of those formats.
+        """
+        if isinstance(limits, dict):
+            limits = limits.get("limits", limits)
+            if not isinstance(limits, dict):
+                raise exc.InvalidRateLimits("Unrecognized rate limits: %s"
+                        % limits)
+            limits = limits.get("rate") or []
+        buckets = []
+        try:
+            for rate_limit in limits:
+                regex = rate_limit.get("regex")
+                if not regex:
+                    # Fall back to the 'uri' glob, such as '*/domains*'.
+                    regex = fnmatch.translate(rate_limit.get("uri") or "*")
+                entries = rate_limit.get("limit", rate_limit.get("limits"))
+                if entries is None:
+                    raise KeyError("limit")
+                for limit in entries:
+                    buckets.append(self._make_bucket(limit["verb"], regex,
+                            limit["value"], limit["unit"],
+                            limit.get("remaining")))
+        except (AttributeError, KeyError, TypeError) as e:
+            raise exc.InvalidRateLimits("Unrecognized rate limits: %s" % e)
+        with self._lock:
+            self._buckets = buckets
+
+
+    def add_limit(self, verb, regex, value, unit="MINUTE"):
+        """Adds a single limit of 'value' calls per 'unit'."""
+        bucket = self._make_bucket(verb, regex, value, unit)
+        with self._lock:
+            self._buckets.append(bucket)
+
+
+    def _make_bucket(self, verb, regex, value, unit, remaining=None):
+        seconds = UNIT_SECONDS[unit.upper()]
+        if value <= 0:
+            # No calls are allowed at all.
+            bucket = TokenBucket(0, 0)
+        else:
+            allowed = max(1.0, value * self.fraction)
+            tokens = None
+            if remaining is not None:
+                tokens = remaining * self.fraction
+            bucket = TokenBucket(allowed / seconds, allowed, tokens=tokens)
+        return (verb.upper(), re.compile(regex), bucket)
+
+
+    def _matching(self, method, uri):
+        path = urllib.parse.urlparse(uri).path or uri
+        return [bucket for verb, regex, bucket in self._buckets
+                if verb == method and regex.search(path)]
+
+
+    def acquire(self, method, uri, block=None):
+        """
+        Takes a token from every bucket whose limit applies to the call. If
+        any of them is empty, waits for it to refill, or raises
+        RateLimitExceeded when not blocking or when the wait would exceed the
+        limiter's 'timeout'. Returns the number of seconds spent waiting.
+        """
+        if block is None:
+            block = self.block
+        method = method.upper()
+        waited = 0.0
+        while True:
+            with self._lock:
+                buckets = self._matching(method, uri)
+                waits = [bkt.wait_time() for bkt in buckets]
+                if None in waits:
+                    raise exc.RateLimitExceeded("The rate limit for %s %s "
+                            "does not allow any calls." % (method, uri))
+                wait = max(waits or [0])
+                if not wait:
+                    for bkt in buckets:
+                        bkt.take()
+                    return waited
+            wait = max(wait, MIN_SLEEP)
+            if not block or (self.timeout is not None and
+                    waited + wait > self.timeout):
+                raise exc.RateLimitExceeded("The rate limit for %s %s would "
+                        "be exceeded; the next call is allowed in %.2f "
+                        "seconds." % (method, uri, wait))
+            time.sleep(wait)
+            waited += wait
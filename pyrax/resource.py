@@ -28,6 +28,57 @@ import pyrax
 import pyrax.utils as utils
 
 
+# The names defined by each resource class, keyed by class.
+_class_names = {}
+# The attributes set by BaseResource.__init__().
+_INSTANCE_NAMES = ("manager", "_loaded", "_info")
+_NO_DEFAULT = object()
+
+
+class LazyDetail(object):
+    """
+    Declares a detail of a COMPACT resource class that is used often. It is
+    read from the resource's '_info' the first time it is used, and from then
+    on is a plain attribute. This is much quicker than the first use of other
+    details, which goes through __getattr__(). If the detail is missing, the
+    'default' is returned, or if none is given, __getattr__() handles it as
+    usual.
+    """
+    def __init__(self, name, default=_NO_DEFAULT):
+        self.name = name
+        self.default = default
+
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        try:
+            val = obj._info[self.name]
+        except KeyError:
+            if self.default is _NO_DEFAULT:
+                return obj.__getattr__(self.name)
+            return self.default
+        object.__setattr__(obj, self.name, val)
+        return val
+
+
+
+def _names_of(cls):
+    """
+    Returns the names that a detail must be set as an attribute to replace:
+    the attributes, methods and properties of the class, other than its
+    LazyDetails, and the attributes that every resource has.
+    """
+    names = _class_names.get(cls)
+    if names is None:
+        names = frozenset(name for name in dir(cls)
+                if not isinstance(getattr(cls, name, None), LazyDetail))
+        names = names.union(_INSTANCE_NAMES)
+        _class_names[cls] = names
+    return names
+
+
+
 class BaseResource(object):
     """
     A resource represents a particular instance of an object (server, flavor,
@@ -42,6 +93,10 @@ class BaseResource(object):
     _non_display = []
     # Properties to add to the __repr__() display
     _repr_properties = []
+    # When True, the details are read from the '_info' dict when they are
+    # first used, instead of each being copied to an attribute up front. This
+    # saves time and memory for resources that are listed in large numbers.
+    COMPACT = False
 
 
     def __init__(self, manager, info, key=None, loaded=False):
@@ -58,22 +113,73 @@ class BaseResource(object):
         """Subclasses may override this to provide a pretty ID which can be used
         for bash completion.
         """
-        if self.NAME_ATTR in self.__dict__ and self.HUMAN_ID:
+        if self.NAME_ATTR in self._attribute_names() and self.HUMAN_ID:
             return utils.to_slug(getattr(self, self.NAME_ATTR))
         return None
 
 
+    def _attribute_names(self):
+        """Returns the names of the details set on the object."""
+        names = set(self.__dict__)
+        if self.COMPACT:
+            names.update(key.decode("utf-8") if isinstance(key, bytes) else key
+                    for key in self.__dict__.get("_info") or ())
+        return names
+
+
     def _add_details(self, info):
         """
         Takes the dict returned by the API call and sets the
         corresponding attributes on the object.
         """
+        if self.COMPACT:
+            self._add_compact_details(info)
+            return
         for (key, val) in six.iteritems(info):
-            if isinstance(key, six.text_type) and six.PY2:
-                key = key.encode(pyrax.get_encoding())
-            elif isinstance(key, bytes):
-                key = key.decode("utf-8")
-            setattr(self, key, val)
+            self._add_detail(key, val)
+
+
+    def _add_compact_details(self, info):
+        """
+        Keeps the details in '_info' for __getattr__() to find. Only those
+        that a class attribute would otherwise hide are set as attributes.
+        """
+        names = _names_of(self.__class__)
+        if info is not self._info:
+            merged = dict(self._info)
+            merged.update(info)
+            self._info = merged
+            # Details that are already attributes, such as those read before,
+            # are replaced, just as they are for other resources. The instance
+            # __dict__ is only read here, as reading it makes Python build it
+            # out of its compact form.
+            names = names.union(self.__dict__)
+        for key in names.intersection(info):
+            self._add_detail(key, info[key])
+
+
+    def _add_detail(self, key, val):
+        if isinstance(key, six.text_type) and six.PY2:
+            key = key.encode(pyrax.get_encoding())
+        elif isinstance(key, bytes):
+            key = key.decode("utf-8")
+        setattr(self, key, val)
+
+
+    def _compact_detail(self, key):
+        """
+        Returns the detail 'key' from '_info', and keeps it as an attribute
+        so that it is found directly from then on. Raises KeyError if there
+        is no such detail.
+        """
+        info = object.__getattribute__(self, "_info")
+        try:
+            val = info[key]
+        except KeyError:
+            # Details with bytes keys are found by their decoded name.
+            val = info[key.encode("utf-8")]
+        object.__setattr__(self, key, val)
+        return val
 
 
     def __getattr__(self, key):
@@ -83,18 +189,30 @@ class BaseResource(object):
         are referenced, a GET is made to get the full details for the
         object.
         """
+        compact = self.COMPACT and key != "_info"
+        if compact:
+            try:
+                return self._compact_detail(key)
+            except (KeyError, AttributeError):
+                pass
         if not self.loaded:
             self.get()
         # Attribute should be set; if not, it's not valid
         try:
             return self.__dict__[key]
         except KeyError:
-            raise AttributeError("'%s' object has no attribute "
-                    "'%s'." % (self.__class__, key))
+            pass
+        if compact:
+            try:
+                return self._compact_detail(key)
+            except (KeyError, AttributeError):
+                pass
+        raise AttributeError("'%s' object has no attribute "
+                "'%s'." % (self.__class__, key))
 
 
     def __repr__(self):
-        reprkeys = sorted(key for key in self.__dict__.keys()
+        reprkeys = sorted(key for key in self._attribute_names()
                 if (key[0] != "_") and
                    (key not in ("manager", "created", "updated")) and
                    (key not in self._non_display))
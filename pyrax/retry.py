@@ -0,0 +1,236 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Retry policies used by the clients to decide whether a failed API call should
+be made again, and how long to wait before doing so.
+"""
+
+import email.utils
+import random
+import sys
+import threading
+import time
+import warnings
+
+import requests
+import six
+
+import pyrax
+import pyrax.exceptions as exc
+
+
+# Methods that can safely be repeated without changing the outcome.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed call should be retried, and how long to wait
+    before retrying.
+
+    The delay grows exponentially from 'backoff' seconds, and is capped at
+    'max_backoff' seconds. When 'jitter' is True, a random delay between zero
+    and that value is used instead, so that many clients throttled at the same
+    moment don't all come back at once. A 'Retry-After' value sent by the
+    server always takes precedence; if the server asks for a longer wait than
+    'max_backoff', the call is not retried.
+
+    Non-idempotent methods such as POST are only retried for the statuses in
+    'throttle_statuses', since those mean the request was rejected without
+    being processed. Idempotent methods are also retried for the statuses in
+    'retry_statuses', and when the connection fails.
+    """
+    throttle_statuses = (413, 429, 503)
+    retry_statuses = (500, 502, 504)
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30,
+            jitter=True, retry_statuses=None, throttle_statuses=None,
+            idempotent_methods=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        if retry_statuses is not None:
+            self.retry_statuses = tuple(retry_statuses)
+        if throttle_statuses is not None:
+            self.throttle_statuses = tuple(throttle_statuses)
+        self.idempotent_methods = tuple(m.upper() for m in
+                (idempotent_methods or IDEMPOTENT_METHODS))
+
+
+    def __repr__(self):
+        return "<%s max_retries=%s backoff=%s max_backoff=%s>" % (
+                self.__class__.__name__, self.max_retries, self.backoff,
+                self.max_backoff)
+
+
+    def is_retryable(self, method, error):
+        """
+        Returns True if the error is one that this policy considers worth
+        retrying for the given HTTP method, ignoring the number of attempts.
+        """
+        idempotent = method.upper() in self.idempotent_methods
+        if isinstance(error, exc.ClientException):
+            try:
+                status = int(error.code)
+            except (TypeError, ValueError):
+                return False
+            if status == 413 and error.retry_after is None:
+                # Without a Retry-After this is 'Request Entity Too Large',
+                # which will fail again no matter how often it is repeated.
+                return False
+            if status in self.throttle_statuses:
+                return True
+            return idempotent and status in self.retry_statuses
+        connect_errors, connection_errors = _transport_errors()
+        if isinstance(error, connect_errors):
+            # The request never reached the server.
+            return True
+        if isinstance(error, connection_errors):
+            return idempotent
+        return False
+
+
+    def should_retry(self, method, attempt, error):
+        """
+        Returns True if the call that failed with 'error' should be made again.
+        'attempt' is the number of retries that have already been made.
+        """
+        if attempt >= self.max_retries:
+            return False
+        if not self.is_retryable(method, error):
+            return False
+        retry_after = self._retry_after(error)
+        return retry_after is None or retry_after <= self.max_backoff
+
+
+    def get_delay(self, attempt, error=None):
+        """
+        Returns the number of seconds to wait before making retry number
+        'attempt' (starting from zero).
+        """
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+    @staticmethod
+    def _retry_after(error):
+        """
+        Returns the number of seconds requested by the 'Retry-After' value of
+        the error, or None if there is no such value. The header can be either
+        a number of seconds or an HTTP date.
+        """
+        val = getattr(error, "retry_after", None)
+        if val is None:
+            return None
+        try:
+            return max(0.0, float(val))
+        except (TypeError, ValueError):
+            pass
+        parsed = email.utils.parsedate_tz(val)
+        if parsed is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+def _transport_errors():
+    """
+    Returns a tuple of the exception classes raised when a connection could
+    not be made, and a tuple of those raised when a connection failed or timed
+    out. The asyncio and aiohttp errors raised by the async clients are only
+    included once those modules have been imported, so that the synchronous
+    clients never have to import them.
+    """
+    connect_errors = [requests.exceptions.ConnectTimeout]
+    connection_errors = [requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout]
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None:
+        connect_timeout = getattr(aiohttp, "ConnectionTimeoutError", None)
+        if connect_timeout is not None:
+            connect_errors.append(connect_timeout)
+        # This includes the aiohttp read timeouts.
+        connection_errors.append(aiohttp.ClientConnectionError)
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is not None:
+        connection_errors.append(asyncio.TimeoutError)
+    return tuple(connect_errors), tuple(connection_errors)
+
+
+def body_rewinder(data):
+    """
+    Returns a function that prepares the request body 'data' to be sent again,
+    or None if it cannot be replayed. Strings and bytes can simply be re-sent;
+    seekable files are rewound to their current position. Anything else, such
+    as a generator or a non-seekable stream, is consumed by the first attempt.
+    """
+    if data is None or isinstance(data, (six.binary_type, six.text_type)):
+        return lambda: None
+    try:
+        pos = data.tell()
+    except Exception:
+        return None
+    return lambda: data.seek(pos)
+
+
+# The default policy is only rebuilt when the settings change.
+_default_policy_lock = threading.Lock()
+_default_policy_key = None
+_default_policy = None
+
+
+def _parse_default_policy(max_retries, backoff):
+    if not max_retries:
+        return None
+    try:
+        max_retries = int(max_retries)
+        if backoff is not None:
+            backoff = float(backoff)
+            if backoff < 0:
+                raise ValueError("negative backoff")
+    except (TypeError, ValueError):
+        msg = ("Invalid retry settings max_retries=%r, retry_backoff=%r; "
+                "failed calls will not be retried." % (max_retries, backoff))
+        warnings.warn(msg)
+        pyrax._logger.warning(msg)
+        return None
+    if max_retries <= 0:
+        return None
+    if backoff is None:
+        return RetryPolicy(max_retries=max_retries)
+    return RetryPolicy(max_retries=max_retries, backoff=backoff)
+
+
+def get_default_policy():
+    """
+    Returns the retry policy defined by the 'max_retries' and 'retry_backoff'
+    settings, or None if retrying has not been enabled or the settings are
+    not valid numbers.
+    """
+    global _default_policy_key, _default_policy
+    key = (pyrax.get_setting("max_retries"),
+            pyrax.get_setting("retry_backoff"))
+    with _default_policy_lock:
+        if key != _default_policy_key:
+            _default_policy = _parse_default_policy(*key)
+            _default_policy_key = key
+        return _default_policy
@@ -0,0 +1,113 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Coalescing of identical calls made at the same time by several threads, so
+that only one of them is actually made and the others share its result.
+"""
+
+import copy
+import threading
+
+import six
+
+
+class _Flight(object):
+    """A call in progress, and its result or error once it has finished."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call for each key at a time. A thread that asks for a
+    key whose call is already running waits for that call to finish, and
+    then gets its result, or has its error raised.
+
+    Waiting threads get 'copy_result(result)' rather than the result itself,
+    so that they can't affect each other by modifying it. Each of them also
+    has its own copy of the error raised, whose cause is the original.
+
+    'shared' counts the calls that got the result of another.
+    """
+    def __init__(self, copy_result=None):
+        self.copy_result = copy_result
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._flights = {}
+
+
+    def __len__(self):
+        return len(self._flights)
+
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Returns the result of 'func(*args, **kwargs)', or the result of the
+        call with the same key that is already running.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                six.raise_from(self._copy_error(flight.error), flight.error)
+            if self.copy_result is None:
+                return flight.result
+            return self.copy_result(flight.result)
+        finished = False
+        try:
+            flight.result = func(*args, **kwargs)
+            finished = True
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            finished = True
+            raise
+        finally:
+            if not finished:
+                # Don't leave the waiters with a result of None.
+                flight.error = RuntimeError("The call for %s was interrupted."
+                        % (key,))
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+    @staticmethod
+    def _copy_error(error):
+        """
+        Returns a copy of 'error' to raise in a waiting thread, so that the
+        threads' tracebacks are not added to the same exception.
+        """
+        try:
+            return copy.copy(error)
+        except Exception:
+            return error
+
+
+    def reset_stats(self):
+        """Sets the count of shared calls back to zero."""
+        with self._lock:
+            self.shared = 0
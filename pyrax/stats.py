@@ -0,0 +1,249 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+Bounded statistics on the API calls made by the clients: latency histograms,
+status code counts, bytes sent and received, and retries, all kept per
+endpoint. Each client keeps its own statistics, and every call is also
+recorded in the global statistics returned by get_stats().
+"""
+
+import math
+import re
+import threading
+
+
+# The smallest latency, in seconds, that has its own histogram bucket.
+MIN_LATENCY = 0.0001
+# Each bucket's upper bound is this much larger than the previous one's, so
+# percentiles are accurate to within about 10%.
+BUCKET_GROWTH = 2 ** 0.125
+# Enough buckets to cover latencies of up to about an hour.
+NUM_BUCKETS = 200
+# Calls to any further endpoints are counted together, under OTHER_ENDPOINT.
+MAX_ENDPOINTS = 256
+OTHER_ENDPOINT = "{other}"
+
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+# Path segments made of letters only, such as 'servers' or 'os-keypairs',
+# are kept in URI templates; any other segment is taken to be an ID or name.
+_NAME_SEGMENT = re.compile(r"^[A-Za-z][A-Za-z_-]{0,39}$")
+
+
+def path_template(path, members=None):
+    """
+    Returns the path with each segment that looks like an ID or name replaced
+    by '{id}', so that calls to the same API share their statistics. For
+    example, '/servers/1234/action' becomes '/servers/{id}/action'.
+
+    Names made only of letters can't be told apart from the fixed parts of a
+    path, so clients whose resources are addressed by name may pass
+    'members', a dict mapping a collection name such as 'queues' to the
+    placeholder that always replaces the segment following it.
+    """
+    if not members:
+        segments = [seg if (not seg or _NAME_SEGMENT.match(seg)) else "{id}"
+                for seg in path.split("/")]
+        return "/".join(segments)
+    segments = []
+    prev = None
+    for seg in path.split("/"):
+        if seg and prev in members:
+            segments.append(members[prev])
+            prev = None
+            continue
+        if seg and not _NAME_SEGMENT.match(seg):
+            seg = "{id}"
+        segments.append(seg)
+        prev = seg
+    return "/".join(segments)
+
+
+
+class LatencyHistogram(object):
+    """
+    Counts latencies in logarithmically-sized buckets, so that recording one
+    takes constant time and memory no matter how many are recorded. It is not
+    locked; the ClientStats that owns it does that.
+    """
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+
+    def record(self, seconds):
+        """Adds a latency, in seconds."""
+        if seconds <= MIN_LATENCY:
+            idx = 0
+        else:
+            idx = int(math.log(seconds / MIN_LATENCY) / _LOG_GROWTH) + 1
+            idx = min(idx, NUM_BUCKETS - 1)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+
+    def percentile(self, pct):
+        """
+        Returns the latency below which 'pct' percent of the recorded ones
+        fall, or None if nothing has been recorded. The value is the upper
+        bound of the bucket holding that percentile, limited to the largest
+        latency recorded.
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * pct / 100.0)))
+        seen = 0
+        for idx, num in enumerate(self.counts):
+            seen += num
+            if seen >= rank:
+                break
+        return min(self.max, MIN_LATENCY * BUCKET_GROWTH ** idx)
+
+
+    def summary(self):
+        """Returns a dict of the count, min, max, mean and percentiles."""
+        mean = self.total / self.count if self.count else None
+        return {"count": self.count,
+                "min": self.min,
+                "max": self.max,
+                "mean": mean,
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "p99": self.percentile(99),
+                }
+
+
+
+class EndpointStats(object):
+    """The statistics for the calls to a single verb and URI template."""
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+
+
+    def summary(self):
+        return {"latency": self.latency.summary(),
+                "statuses": dict(self.statuses),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "retries": self.retries,
+                }
+
+
+
+class ClientStats(object):
+    """
+    Holds the EndpointStats for each verb and URI template called, up to
+    MAX_ENDPOINTS of them. It can be shared by any number of threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+
+    def _endpoint(self, method, template):
+        key = "%s %s" % (method, template)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            if len(self._endpoints) >= MAX_ENDPOINTS:
+                key = "%s %s" % (method, OTHER_ENDPOINT)
+                stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats()
+        return stats
+
+
+    def record(self, method, template, seconds, status, bytes_in=0,
+            bytes_out=0):
+        """
+        Records a call that took 'seconds' and ended with 'status', which is
+        either the HTTP status code or, for calls that got no response, the
+        name of the error.
+        """
+        with self._lock:
+            stats = self._endpoint(method, template)
+            stats.latency.record(seconds)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+
+    def record_retry(self, method, template):
+        """Records that a call is being retried."""
+        with self._lock:
+            self._endpoint(method, template).retries += 1
+
+
+    def percentile(self, method, template, pct):
+        """
+        Returns the latency below which 'pct' percent of the calls to one
+        verb and URI template fall, and the number of calls it is based on.
+        """
+        key = "%s %s" % (method, template)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                return None, 0
+            return stats.latency.percentile(pct), stats.latency.count
+
+
+    def snapshot(self):
+        """
+        Returns a dict with the summary of each endpoint's statistics, keyed
+        by verb and URI template, and the totals across all endpoints.
+        """
+        with self._lock:
+            endpoints = dict((key, stats.summary())
+                    for key, stats in self._endpoints.items())
+        totals = {"calls": 0, "bytes_in": 0, "bytes_out": 0, "retries": 0}
+        for summary in endpoints.values():
+            totals["calls"] += summary["latency"]["count"]
+            for key in ("bytes_in", "bytes_out", "retries"):
+                totals[key] += summary[key]
+        totals["endpoints"] = endpoints
+        return totals
+
+
+    def reset(self):
+        """Discards all the statistics recorded so far."""
+        with self._lock:
+            self._endpoints = {}
+
+
+
+# Every call made by any client is also recorded here.
+global_stats = ClientStats()
+
+
+def get_stats():
+    """Returns a snapshot of the statistics for all the clients' calls."""
+    return global_stats.snapshot()
+
+
+def reset_stats():
+    """Discards the statistics for all the clients' calls."""
+    global_stats.reset()
@@ -0,0 +1,173 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+A file-backed cache of authentication responses, so that short-lived
+processes using the same credentials can re-use a token and its service
+catalog instead of each authenticating from scratch.
+"""
+
+import contextlib
+import errno
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; entries are then written atomically, but
+    # without locking.
+    fcntl = None
+
+import pyrax
+
+
+# Python 2 has no os.replace(); os.rename() replaces files on POSIX.
+_replace = getattr(os, "replace", os.rename)
+
+
+def cache_key(auth_endpoint, credentials):
+    """
+    Returns the name under which the response to an authentication request
+    with these credentials is cached. It is a hash, so that nothing secret
+    appears in the file name, and a change of password or API key means the
+    old entry is no longer used.
+    """
+    data = json.dumps([auth_endpoint, credentials], sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+
+class TokenCache(object):
+    """
+    Stores authentication responses as files in 'directory', which is created
+    if necessary. Only the current user can read the directory and the files
+    in it. Reads and writes are locked against other processes where the
+    platform supports it, and each entry is replaced atomically.
+    """
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+
+
+    def __repr__(self):
+        return "<TokenCache %s>" % self.directory
+
+
+    def _path(self, key):
+        return os.path.join(self.directory, "%s.json" % key)
+
+
+    @contextlib.contextmanager
+    def _locked(self, key, exclusive):
+        if fcntl is None:
+            yield
+            return
+        lock_path = os.path.join(self.directory, "%s.lock" % key)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+
+    def _ensure_directory(self):
+        """
+        Creates the directory, or makes sure that an existing one belongs to
+        the current user and that nobody else can use it.
+        """
+        try:
+            os.makedirs(self.directory, 0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        if os.name != "posix":
+            return
+        # makedirs() leaves the mode of an existing directory unchanged.
+        info = os.stat(self.directory)
+        if info.st_uid != os.getuid():
+            raise OSError(errno.EPERM, "The token cache directory belongs "
+                    "to another user", self.directory)
+        if stat.S_IMODE(info.st_mode) & 0o077:
+            os.chmod(self.directory, 0o700)
+
+
+    def get(self, key):
+        """
+        Returns the cached response body for 'key', or None if there is none
+        or it can't be read.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with self._locked(key, exclusive=False):
+                with open(path) as cache_file:
+                    return json.load(cache_file)
+        except (IOError, OSError, ValueError) as e:
+            pyrax._logger.debug("Could not read the token cache %s: %s"
+                    % (path, e))
+            return None
+
+
+    def put(self, key, body):
+        """
+        Stores a response body for 'key'. Errors are logged and otherwise
+        ignored, since the cache is only an optimization.
+        """
+        try:
+            self._ensure_directory()
+            with self._locked(key, exclusive=True):
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory,
+                        suffix=".tmp")
+                try:
+                    # mkstemp() creates the file readable by its owner only.
+                    with os.fdopen(fd, "w") as cache_file:
+                        json.dump(body, cache_file)
+                    _replace(tmp_path, self._path(key))
+                except Exception:
+                    os.remove(tmp_path)
+                    raise
+        except (IOError, OSError, TypeError, ValueError) as e:
+            pyrax._logger.debug("Could not write the token cache %s: %s"
+                    % (self.directory, e))
+
+
+    def delete(self, key):
+        """Removes the entry for 'key', if there is one."""
+        try:
+            with self._locked(key, exclusive=True):
+                os.remove(self._path(key))
+        except (IOError, OSError):
+            pass
+
+
+
+_caches_lock = threading.Lock()
+_caches = {}
+
+
+def get_cache(directory):
+    """Returns the TokenCache for 'directory', creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = TokenCache(directory)
+        return cache
@@ -0,0 +1,328 @@
+# Copyright (c)2014 Rackspace US, Inc.
+
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from __future__ import absolute_import, unicode_literals
+"""
+The transports that send the HTTP calls made by pyrax.http.request(). The
+default is a pooled requests Session. The 'http2' transport uses the 'httpx'
+package to multiplex concurrent calls to a host over a few HTTP/2
+connections, and must be installed with: pip install httpx[http2]
+"""
+
+import threading
+
+import requests
+import six
+
+import pyrax
+import pyrax.exceptions as exc
+import pyrax.http
+
+
+DEFAULT_TRANSPORT = "requests"
+# The size of the chunks read from file objects sent as request bodies.
+UPLOAD_CHUNKSIZE = 65536
+
+# The httpx module takes a while to import, so it is only imported when an
+# HTTP2Transport is created.
+httpx = None
+
+
+def _import_httpx():
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+            # The HTTP/2 support is a separate package.
+            import h2
+        except ImportError:
+            raise exc.HttpxModuleNotInstalled("The 'httpx' Python module is "
+                    "not installed on this system; install it with 'pip "
+                    "install httpx[http2]'.")
+        httpx = module
+    return httpx
+
+
+class Transport(object):
+    """
+    The interface through which pyrax.http.request() sends calls. It is the
+    part of a requests Session that pyrax uses: request(), a method for each
+    verb, and close(). The responses must have the attributes of a requests
+    Response that pyrax uses: status_code, headers, content, encoding,
+    reason, request.body, iter_content() and close(). Errors must be raised
+    as the requests exceptions, such as ConnectionError and Timeout.
+    """
+    name = None
+
+    def __repr__(self):
+        return "<%s>" % self.__class__.__name__
+
+
+    def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+
+    def close(self):
+        """Releases any pooled connections."""
+        pass
+
+
+
+# The names of httpx errors, with the requests exceptions that stand for
+# them. The first that matches an error is used, so subclasses come first.
+_ERROR_CLASSES = (
+        ("ConnectTimeout", requests.exceptions.ConnectTimeout),
+        # A connection was never available, so the call wasn't sent.
+        ("PoolTimeout", requests.exceptions.ConnectTimeout),
+        ("TimeoutException", requests.exceptions.ReadTimeout),
+        ("ProxyError", requests.exceptions.ProxyError),
+        ("UnsupportedProtocol", requests.exceptions.InvalidSchema),
+        ("TransportError", requests.exceptions.ConnectionError),
+        ("TooManyRedirects", requests.exceptions.TooManyRedirects),
+        ("DecodingError", requests.exceptions.ContentDecodingError),
+        ("InvalidURL", requests.exceptions.InvalidURL),
+        ("StreamConsumed", requests.exceptions.StreamConsumedError),
+        ("HTTPStatusError", requests.exceptions.HTTPError),
+        )
+
+
+def _httpx_errors():
+    """Returns the classes of the errors raised by httpx."""
+    return (httpx.HTTPError, httpx.InvalidURL, httpx.StreamError)
+
+
+def _requests_error(error):
+    """Returns the requests exception matching an httpx error."""
+    for name, requests_class in _ERROR_CLASSES:
+        httpx_class = getattr(httpx, name, None)
+        if httpx_class is not None and isinstance(error, httpx_class):
+            return requests_class(error)
+    return requests.exceptions.RequestException(error)
+
+
+def _timeout(timeout):
+    """Converts a requests timeout, which may be a (connect, read) tuple."""
+    if isinstance(timeout, (tuple, list)):
+        connect, read = timeout
+        return httpx.Timeout(None, connect=connect, read=read)
+    return timeout
+
+
+def _upload_chunks(data):
+    while True:
+        chunk = data.read(UPLOAD_CHUNKSIZE)
+        if not chunk:
+            return
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode("utf-8")
+        yield chunk
+
+
+
+class _SentRequest(object):
+    """The parts of the request that pyrax reads from a response."""
+    def __init__(self, method, url, headers, body):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+
+
+class HTTP2Response(object):
+    """
+    Wraps an httpx response, giving it the names of a requests Response so
+    that the rest of the library can handle either one.
+    """
+    def __init__(self, resp, request):
+        self._resp = resp
+        self.request = request
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.reason = resp.reason_phrase
+        self.url = str(resp.url)
+        self.http_version = resp.http_version
+
+
+    def __repr__(self):
+        return "<HTTP2Response [%s]>" % self.status_code
+
+
+    @property
+    def encoding(self):
+        return self._resp.encoding
+
+
+    @property
+    def content(self):
+        try:
+            return self._resp.read()
+        except _httpx_errors() as e:
+            raise _requests_error(e)
+
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", "replace")
+
+
+    def iter_content(self, chunk_size=1):
+        try:
+            for chunk in self._resp.iter_bytes(chunk_size):
+                yield chunk
+        except _httpx_errors() as e:
+            raise _requests_error(e)
+
+
+    def close(self):
+        self._resp.close()
+
+
+
+class HTTP2Transport(Transport):
+    """
+    Sends calls with httpx over HTTP/2, so that any number of concurrent calls
+    to a host share a single connection instead of needing one each. Hosts
+    that don't offer HTTP/2, including any reached over plain HTTP, are
+    called with HTTP/1.1.
+    """
+    name = "http2"
+
+    def __init__(self, pool_connections=None, pool_maxsize=None):
+        _import_httpx()
+        if pool_connections is None:
+            pool_connections = pyrax.http.DEFAULT_POOL_CONNECTIONS
+        if pool_maxsize is None:
+            pool_maxsize = pyrax.http.DEFAULT_POOL_MAXSIZE
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        # The certificate verification is set per httpx client, so there is
+        # one for each value of 'verify' used.
+        self._clients = {}
+        self._lock = threading.Lock()
+
+
+    def _get_client(self, verify):
+        client = self._clients.get(verify)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(verify)
+                if client is None:
+                    limits = httpx.Limits(
+                            max_connections=(self.pool_connections *
+                                self.pool_maxsize),
+                            max_keepalive_connections=self.pool_maxsize)
+                    client = httpx.Client(http2=True, verify=verify,
+                            limits=limits, timeout=None)
+                    self._clients[verify] = client
+        return client
+
+
+    def request(self, method, url, headers=None, data=None, params=None,
+            timeout=None, verify=True, stream=False, allow_redirects=True):
+        method = method.upper()
+        # Headers set to None are not sent, as with requests.
+        headers = dict((key, "%s" % val) for key, val in
+                (headers or {}).items() if val is not None)
+        content = form = None
+        if isinstance(data, dict):
+            form = data
+        elif hasattr(data, "read"):
+            content = _upload_chunks(data)
+        else:
+            content = data
+        body = content if isinstance(content,
+                (six.binary_type, six.text_type)) else None
+        client = self._get_client(verify)
+        try:
+            req = client.build_request(method, url, headers=headers,
+                    content=content, data=form, params=params,
+                    timeout=_timeout(timeout))
+            resp = client.send(req, stream=stream,
+                    follow_redirects=allow_redirects)
+        except _httpx_errors() as e:
+            raise _requests_error(e)
+        return HTTP2Response(resp, _SentRequest(method, url, headers, body))
+
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients = {}
+        for client in clients:
+            client.close()
+
+
+
+# The factories of the transports, keyed by name. Each is called with the
+# 'pool_connections' and 'pool_maxsize' keyword arguments.
+_transports = {
+        "requests": pyrax.http.create_session,
+        "http2": HTTP2Transport,
+        }
+
+
+def register_transport(name, factory):
+    """
+    Makes a transport available under 'name'. 'factory' is called with the
+    'pool_connections' and 'pool_maxsize' keyword arguments, and returns a
+    Transport, or any other object with the same methods.
+    """
+    _transports[name] = factory
+
+
+def available_transports():
+    """Returns the names of the registered transports."""
+    return sorted(_transports)
+
+
+def create_transport(name=None, pool_connections=None, pool_maxsize=None):
+    """
+    Returns a new instance of the transport registered as 'name', or of the
+    default transport when 'name' is None.
+    """
+    if name is None:
+        name = DEFAULT_TRANSPORT
+    factory = _transports.get(name)
+    if factory is None:
+        raise exc.InvalidTransport("There is no transport named '%s'; the "
+                "available transports are: %s" % (name,
+                ", ".join(available_transports())))
+    return factory(pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize)
@@ -310,6 +310,48 @@ def coerce_to_list(val):
     return val
 
 
+def iter_rows(items, fields, as_dicts=False):
+    """
+    Generates the values of 'fields' for each of the dicts in 'items', as a
+    tuple in the order of 'fields', or with 'as_dicts=True', as a dict with
+    just those keys. Missing values are None, and empty items are skipped.
+    """
+    fields = tuple(coerce_to_list(fields))
+    for item in items:
+        if not item:
+            continue
+        values = tuple(map(item.get, fields))
+        if as_dicts:
+            yield dict(zip(fields, values))
+        else:
+            yield values
+
+
+def project(items, fields, as_dicts=False, as_columns=False):
+    """
+    Returns the values of 'fields' for each of the dicts in 'items', which is
+    much cheaper than creating an object for each one when only a few of
+    their values are needed. By default a list of tuples is returned, one per
+    item. Pass 'as_dicts=True' to get a list of dicts instead, or
+    'as_columns=True' to get a dict with a list of the values of each field.
+    """
+    if as_columns:
+        return to_columns(iter_rows(items, fields), fields)
+    return list(iter_rows(items, fields, as_dicts=as_dicts))
+
+
+def to_columns(rows, fields):
+    """
+    Takes the tuples of values of 'fields' generated by iter_rows(), and
+    returns a dict with a list of the values of each field.
+    """
+    fields = coerce_to_list(fields)
+    columns = [list(column) for column in zip(*rows)]
+    if not columns:
+        columns = [[] for field in fields]
+    return dict(zip(fields, columns))
+
+
 def folder_size(pth, ignore=None):
     """
     Returns the total bytes for the specified path, optionally ignoring
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 from setuptools import setup
+from setuptools.command.build_py import build_py as _build_py
 from setuptools.command.sdist import sdist as _sdist
 import re
 import sys
@@ -58,6 +59,18 @@ class sdist(_sdist):
         # Run parent constructor
         _sdist.run(self)
 
+class build_py(_build_py):
+    """ custom build_py command, to leave out modules needing a newer Python """
+
+    # Modules that use syntax older versions of Python can't compile.
+    min_versions = {"pyrax.aio": (3, 6)}
+
+    def find_package_modules(self, package, package_dir):
+        modules = _build_py.find_package_modules(self, package, package_dir)
+        return [(pkg, module, path) for pkg, module, path in modules
+                if sys.version_info >= self.min_versions.get(
+                    "%s.%s" % (pkg.replace("/", "."), module), (0,))]
+
 # Get the long description from the relevant file
 try:
     f = codecs.open('README.rst', encoding='utf-8')
@@ -95,10 +108,14 @@ setup(
         "keyring",
         "requests>=2.2.1,<3",
         "six>=1.9.0,<2",
+        "futures; python_version < '3'",
     ] + testing_requires,
+    extras_require={
+        "http2": ["httpx[http2]; python_version >= '3.7'"],
+    },
     packages=[
         "pyrax",
         "pyrax/identity",
     ],
-    cmdclass={'sdist': sdist}
+    cmdclass={'build_py': build_py, 'sdist': sdist}
 )
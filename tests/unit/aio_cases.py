@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for pyrax.aio. They use syntax that is only valid in Python 3.6 or
+later, and so are imported by test_aio only on those versions.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import io
+import json
+import unittest
+
+from mock import MagicMock as Mock
+
+import pyrax
+import pyrax.exceptions as exc
+import pyrax.utils as utils
+
+from pyrax import aio
+from pyrax import fakes
+from pyrax.manager import BaseManager
+from pyrax.resource import BaseResource
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:
+    aiohttp = web = None
+
+
+@unittest.skipIf(web is None, "requires aiohttp")
+class AsyncClientTest(unittest.TestCase):
+    """
+    Runs the async clients against a local aiohttp server that stands in for
+    the API endpoints.
+    """
+    def __init__(self, *args, **kwargs):
+        super(AsyncClientTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.calls = []
+        self.paths = []
+        self.objects = {}
+        self.fail_statuses = []
+        app = web.Application()
+        app.router.add_route("*", "/v1/{path:.*}", self._handler)
+        app.router.add_route("*", "/v2/{path:.*}", self._handler)
+        self.runner = web.AppRunner(app)
+        self.wait(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.wait(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = "http://127.0.0.1:%s/v1" % port
+        self.identity = fakes.FakeIdentity()
+        self.identity.token = "token"
+        self.identity.tenant_id = "tenant"
+        self.manager = BaseManager(None, resource_class=BaseResource,
+                response_key="widget", uri_base="widgets")
+        self.client = aio.AsyncBaseClient(self.identity,
+                management_url=self.base_url, manager=self.manager)
+
+    def tearDown(self):
+        self.wait(self.client.close())
+        self.wait(self.runner.cleanup())
+        self.loop.close()
+
+    def wait(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    async def _handler(self, request):
+        path = request.match_info["path"]
+        body = await request.read()
+        self.calls.append((request.method, path, request.headers, body))
+        self.paths.append(request.path)
+        if self.fail_statuses:
+            return web.Response(status=self.fail_statuses.pop(0),
+                    headers={"Retry-After": "0"})
+        if path == "widgets" and request.method == "POST":
+            return web.json_response({"widget": {"id": 3}}, status=201)
+        if path == "widgets" and request.method == "GET":
+            return web.json_response({"widgets": [{"id": 1, "name": "a"},
+                    {"id": 2, "name": "b"}]})
+        if path == "widgets/1":
+            return web.json_response({"widget": {"id": 1, "name": "a"}})
+        if path.startswith("cont/"):
+            if request.method == "PUT":
+                self.objects[path] = body
+                return web.Response(status=201)
+            if path in self.objects:
+                return web.Response(body=self.objects[path])
+        return web.json_response({"itemNotFound": {"message": "nope"}},
+                status=404)
+
+    def test_list(self):
+        ret = self.wait(self.client.list())
+        self.assertEqual(len(ret), 2)
+        self.assertTrue(all(isinstance(itm, BaseResource) for itm in ret))
+        self.assertTrue(all(itm.manager is self.manager for itm in ret))
+        self.assertEqual(ret[1].name, "b")
+        mthd, path, headers, body = self.calls[0]
+        self.assertEqual((mthd, path), ("GET", "widgets"))
+        self.assertEqual(headers["X-Auth-Token"], "token")
+        self.assertEqual(headers["Accept"], "application/json")
+
+    def test_list_fields(self):
+        ret = self.wait(self.client.list(fields=["name", "id"]))
+        self.assertEqual(ret, [("a", 1), ("b", 2)])
+        ret = self.wait(self.client.list(fields="id", as_columns=True))
+        self.assertEqual(ret, {"id": [1, 2]})
+
+    def test_get(self):
+        ret = self.wait(self.client.get(1))
+        self.assertEqual(ret.id, 1)
+        self.assertTrue(ret.loaded)
+
+    def test_post_body(self):
+        self.wait(self.client.method_post("/widgets", body={"a": 1}))
+        mthd, path, headers, body = self.calls[0]
+        self.assertEqual(json.loads(body.decode("utf-8")), {"a": 1})
+        self.assertEqual(headers["Content-Type"], "application/json")
+
+    def test_quoting(self):
+        self.fail_statuses = [418]
+        self.assertRaises(exc.ClientException, self.wait,
+                self.client.method_get("/widgets/a b"))
+        self.assertEqual(self.calls[0][1], "widgets/a b")
+
+    def test_not_found(self):
+        self.assertRaises(exc.NotFound, self.wait,
+                self.client.method_get("/missing"))
+
+    def test_retry(self):
+        self.client.retry_policy = pyrax.retry.RetryPolicy(max_retries=2)
+        self.fail_statuses = [503, 429]
+        resp, body = self.wait(self.client.method_get("/widgets"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(self.client.retries, 2)
+
+    def test_retry_rewinds_file(self):
+        sclt = aio.AsyncStorageClient(self.identity,
+                management_url=self.base_url,
+                retry_policy=pyrax.retry.RetryPolicy(max_retries=1))
+        self.fail_statuses = [503]
+        self.wait(sclt.create_object("cont", "obj", io.BytesIO(b"abc")))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.objects["cont/obj"], b"abc")
+        self.wait(sclt.close())
+
+    def test_no_retry_async_iterable(self):
+        sclt = aio.AsyncStorageClient(self.identity,
+                management_url=self.base_url,
+                retry_policy=pyrax.retry.RetryPolicy(max_retries=2))
+        self.fail_statuses = [503]
+
+        async def gen():
+            yield b"abc"
+
+        self.assertRaises(exc.HTTPServiceUnavailable, self.wait,
+                sclt.create_object("cont", "obj", gen()))
+        self.assertEqual(len(self.calls), 1)
+        self.wait(sclt.close())
+
+    def test_connection_errors_retryable(self):
+        policy = pyrax.retry.RetryPolicy()
+        for err in (aiohttp.ServerDisconnectedError(),
+                aiohttp.ServerTimeoutError(), asyncio.TimeoutError()):
+            self.assertTrue(policy.is_retryable("GET", err))
+            self.assertFalse(policy.is_retryable("POST", err))
+
+    def test_authenticate_once(self):
+        self.identity.token = None
+
+        def fake_auth():
+            self.identity.token = "new"
+            self.identity.auth_generation += 1
+
+        self.identity.authenticate = Mock(side_effect=fake_auth)
+
+        async def many():
+            return await asyncio.gather(*[self.client.method_get("/widgets")
+                    for i in range(5)])
+
+        self.wait(many())
+        self.identity.authenticate.assert_called_once_with()
+        self.assertTrue(all(call[2]["X-Auth-Token"] == "new"
+                for call in self.calls))
+
+    def test_reauth_once(self):
+        self.fail_statuses = [401, 401]
+        tokens = iter(["t1", "t2"])
+
+        def fake_auth():
+            self.identity.token = next(tokens)
+            self.identity.auth_generation += 1
+
+        self.identity.authenticate = Mock(side_effect=fake_auth)
+
+        async def both():
+            return await asyncio.gather(self.client.method_get("/widgets"),
+                    self.client.method_get("/widgets"))
+
+        self.wait(both())
+        self.identity.authenticate.assert_called_once_with()
+
+    def test_reauth(self):
+        self.fail_statuses = [401]
+        self.identity.authenticate = Mock()
+        resp, body = self.wait(self.client.method_get("/widgets"))
+        self.assertEqual(resp.status_code, 200)
+        self.identity.authenticate.assert_called_once_with()
+
+    def sync_client(self):
+        clt = fakes.FakeClient()
+        clt.identity = self.identity
+        clt.region_name = "DFW"
+        clt.management_url = self.base_url
+        clt.verify_ssl = True
+        clt.timeout = 10
+        clt.pool_maxsize = None
+        clt.retry_policy = None
+        clt._manager = self.manager
+        clt._add_custom_headers = Mock()
+        return clt
+
+    def test_from_client(self):
+        clt = self.sync_client()
+        aclt = aio.AsyncBaseClient.from_client(clt)
+        self.assertTrue(aclt.identity is clt.identity)
+        self.assertEqual(aclt.management_url, self.base_url)
+        self.assertEqual(aclt.user_agent, clt.user_agent)
+        self.assertTrue(aclt._manager.manager is clt._manager)
+        self.wait(aclt.method_get("/widgets"))
+        self.assertTrue(clt._add_custom_headers.called)
+        self.wait(aclt.close())
+
+    def test_from_client_reauth_endpoint(self):
+        clt = self.sync_client()
+        aclt = aio.AsyncBaseClient.from_client(clt)
+        new_url = self.base_url.replace("/v1", "/v2")
+
+        def fake_auth():
+            self.identity.token = "new"
+            self.identity.auth_generation += 1
+            clt.management_url = new_url
+
+        self.identity.authenticate = Mock(side_effect=fake_auth)
+        self.fail_statuses = [401]
+        resp, body = self.wait(aclt.method_get("/widgets"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(aclt.management_url, new_url)
+        self.assertEqual(self.paths, ["/v1/widgets", "/v2/widgets"])
+        self.assertEqual(self.calls[-1][2]["X-Auth-Token"], "new")
+        self.wait(aclt.close())
+
+    def test_reauth_shares_identity_lock(self):
+        self.fail_statuses = [401]
+        generation = self.identity.auth_generation
+        self.identity.reauthenticate = Mock(
+                return_value=self.identity.auth_generation)
+        self.wait(self.client.method_get("/widgets"))
+        self.identity.reauthenticate.assert_called_once_with(generation)
+
+    def test_storage_objects(self):
+        sclt = aio.AsyncStorageClient(self.identity,
+                management_url=self.base_url)
+        content = b"x" * 100000
+
+        async def gen():
+            for pos in range(0, len(content), 30000):
+                yield content[pos:pos + 30000]
+
+        self.wait(sclt.create_object("cont", "obj", content))
+        self.assertEqual(self.calls[-1][2]["ETag"],
+                utils.get_checksum(content))
+        self.assertEqual(self.wait(sclt.fetch_object("cont", "obj")), content)
+        self.wait(sclt.create_object("cont", "streamed", gen()))
+        self.assertEqual(self.objects["cont/streamed"], content)
+
+        async def collect():
+            chunks = []
+            gen = await sclt.fetch_object("cont", "obj", chunk_size=4096)
+            async for chunk in gen:
+                chunks.append(chunk)
+            return chunks
+
+        chunks = self.wait(collect())
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks))
+        self.assertEqual(b"".join(chunks), content)
+        self.wait(sclt.close())
+
+
+if __name__ == "__main__":
+    unittest.main()
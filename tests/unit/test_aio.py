@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import sys
+import unittest
+
+# The async tests can't even be compiled by older versions of Python.
+if sys.version_info >= (3, 6):
+    from tests.unit.aio_cases import AsyncClientTest
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from concurrent import futures
+import threading
+import time
+import unittest
+
+import pyrax
+from pyrax.batching import Batch
+from pyrax.batching import _service_of
+
+
+class FakeClient(object):
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def call(self, val, delay=0):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(delay)
+        with self.lock:
+            self.running -= 1
+        return val
+
+    def fail(self):
+        raise ValueError("failed")
+
+
+class FakeManager(object):
+    def __init__(self, api):
+        self.api = api
+
+
+class FakeResource(object):
+    def __init__(self, manager):
+        self.manager = manager
+        self.name = "resource name"
+
+
+class BatchTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(BatchTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.client = FakeClient("Cloud DNS")
+
+    def tearDown(self):
+        pass
+
+    def test_pyrax_batch(self):
+        batch = pyrax.batch(max_workers=4)
+        self.assertTrue(isinstance(batch, Batch))
+        self.assertEqual(batch.max_workers, 4)
+
+    def test_service_of(self):
+        mgr = FakeManager(self.client)
+        self.assertEqual(_service_of(self.client), "Cloud DNS")
+        self.assertEqual(_service_of(mgr), "Cloud DNS")
+        self.assertEqual(_service_of(FakeResource(mgr)), "Cloud DNS")
+        self.assertIsNone(_service_of(None))
+
+    def test_wrap(self):
+        with Batch(max_workers=4) as batch:
+            clt = batch.wrap(self.client)
+            futs = [clt.call(num) for num in range(10)]
+            self.assertEqual(clt.name, "Cloud DNS")
+        self.assertTrue(all(fut.done() for fut in futs))
+        self.assertEqual(batch.gather(futs), list(range(10)))
+        self.assertEqual(batch.gather(), list(range(10)))
+
+    def test_submit(self):
+        with Batch() as batch:
+            fut = batch.submit(self.client.call, "x")
+            plain = batch.submit(lambda a, b: a + b, 1, b=2)
+        self.assertEqual(fut.result(), "x")
+        self.assertEqual(plain.result(), 3)
+
+    def test_concurrent(self):
+        with Batch(max_workers=8) as batch:
+            clt = batch.wrap(self.client)
+            for num in range(8):
+                clt.call(num, delay=0.05)
+        self.assertTrue(self.client.max_running > 1)
+
+    def test_per_service_limit(self):
+        other = FakeClient("Cloud Files")
+        with Batch(max_workers=8, per_service=2) as batch:
+            dns = batch.wrap(self.client)
+            files = batch.wrap(other)
+            for num in range(6):
+                dns.call(num, delay=0.02)
+                files.call(num, delay=0.02)
+        self.assertTrue(self.client.max_running <= 2)
+        self.assertTrue(other.max_running <= 2)
+        self.assertEqual(len(batch.gather()), 12)
+
+    def test_limits_by_service(self):
+        with Batch(max_workers=8, per_service=4,
+                limits={"Cloud DNS": 1}) as batch:
+            dns = batch.wrap(self.client)
+            futs = [dns.call(num, delay=0.01) for num in range(5)]
+        self.assertEqual(self.client.max_running, 1)
+        self.assertEqual(batch.gather(futs), list(range(5)))
+
+    def test_errors_in_futures(self):
+        with Batch() as batch:
+            fut = batch.wrap(self.client).fail()
+        self.assertTrue(isinstance(fut.exception(), ValueError))
+        self.assertRaises(ValueError, batch.gather)
+
+    def test_as_completed(self):
+        with Batch(max_workers=2) as batch:
+            clt = batch.wrap(self.client)
+            slow = clt.call("slow", delay=0.2)
+            fast = clt.call("fast")
+            done = list(batch.as_completed())
+        self.assertEqual(done, [fast, slow])
+
+    def test_cancel_on_error(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        timer = threading.Timer(0.1, release.set)
+        try:
+            with Batch(max_workers=1) as batch:
+                first = batch.submit(block)
+                second = batch.submit(block)
+                started.wait(5)
+                timer.start()
+                raise KeyError()
+        except KeyError:
+            pass
+        # The running call is waited for; the queued one is cancelled.
+        self.assertTrue(first.done())
+        self.assertFalse(first.cancelled())
+        self.assertTrue(second.cancelled())
+
+    def test_gather_timeout(self):
+        release = threading.Event()
+        batch = Batch()
+        fut = batch.submit(release.wait, 5)
+        self.assertRaises(futures.TimeoutError, batch.gather, [fut],
+                timeout=0.01)
+        release.set()
+        batch.close()
+        self.assertTrue(fut.result())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from mock import patch
+import requests
+
+import pyrax
+import pyrax.breaker as breaker
+import pyrax.exceptions as exc
+from pyrax.breaker import BreakerRegistry
+from pyrax.breaker import CircuitBreaker
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(CircuitBreakerTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.patcher = patch.object(breaker, "_now", self.clock)
+        self.patcher.start()
+        self.breaker = CircuitBreaker("example.com", failure_rate=0.5,
+                min_calls=4, window=60, reset_timeout=30)
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def call(self, error=None):
+        self.breaker.before_call()
+        return self.breaker.record(error)
+
+    def trip(self):
+        for num in range(4):
+            change = self.call(exc.HTTPServiceUnavailable(503))
+        self.assertEqual(change, ("closed", "open"))
+
+    def test_is_failure(self):
+        self.assertFalse(breaker.is_failure(None))
+        self.assertTrue(breaker.is_failure(exc.ClientException(500)))
+        self.assertTrue(breaker.is_failure(exc.HTTPServiceUnavailable(503)))
+        self.assertFalse(breaker.is_failure(exc.NotFound(404)))
+        self.assertFalse(breaker.is_failure(exc.TooManyRequests(429)))
+        self.assertTrue(breaker.is_failure(
+                requests.exceptions.ConnectionError()))
+        self.assertTrue(breaker.is_failure(requests.exceptions.ReadTimeout()))
+        self.assertFalse(breaker.is_failure(ValueError()))
+
+    def test_stays_closed_below_min_calls(self):
+        for num in range(3):
+            self.assertIsNone(self.call(exc.HTTPServiceUnavailable(503)))
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+    def test_stays_closed_below_failure_rate(self):
+        for num in range(3):
+            self.call()
+        for num in range(2):
+            self.call(requests.exceptions.ConnectionError())
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+    def test_client_errors_not_failures(self):
+        for num in range(10):
+            self.call(exc.NotFound(404))
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+
+    def test_opens(self):
+        self.trip()
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+        self.clock.now += 10
+        try:
+            self.breaker.before_call()
+        except exc.CircuitOpen as e:
+            self.assertEqual(e.host, "example.com")
+            self.assertEqual(e.retry_after, 20)
+        else:
+            self.fail("CircuitOpen not raised")
+
+    def test_window_expires_old_calls(self):
+        for num in range(3):
+            self.call(exc.HTTPServiceUnavailable(503))
+        self.clock.now += 61
+        self.call(exc.HTTPServiceUnavailable(503))
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+        self.assertEqual(self.breaker.snapshot()["calls"], 1)
+
+    def test_half_open_probe_succeeds(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertEqual(self.breaker.before_call(), ("open", "half_open"))
+        # Only one probe at a time.
+        self.assertRaises(exc.CircuitOpen, self.breaker.before_call)
+        self.assertEqual(self.breaker.record(), ("half_open", "closed"))
+        self.assertEqual(self.breaker.snapshot()["calls"], 0)
+        self.assertIsNone(self.call())
+
+    def test_half_open_probe_fails(self):
+        self.trip()
+        self.clock.now += 30
+        self.breaker.before_call()
+        change = self.breaker.record(requests.exceptions.ConnectTimeout())
+        self.assertEqual(change, ("half_open", "open"))
+        self.assertRaises(exc.CircuitOpen, self.breaker.before_call)
+        self.clock.now += 30
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+
+    def test_several_probes(self):
+        self.breaker.probes = 2
+        self.trip()
+        self.clock.now += 30
+        self.breaker.before_call()
+        self.breaker.before_call()
+        self.assertRaises(exc.CircuitOpen, self.breaker.before_call)
+        self.assertIsNone(self.breaker.record())
+        self.assertEqual(self.breaker.record(), ("half_open", "closed"))
+
+    def test_release(self):
+        self.trip()
+        self.clock.now += 30
+        self.breaker.before_call()
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+        self.breaker.before_call()
+
+    def test_late_record_while_open(self):
+        self.trip()
+        self.assertIsNone(self.breaker.record(exc.NotFound(404)))
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+
+    def test_reset(self):
+        self.trip()
+        self.breaker.reset()
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+        self.breaker.before_call()
+
+    def test_snapshot(self):
+        self.call()
+        self.call(exc.ClientException(500))
+        snap = self.breaker.snapshot()
+        self.assertEqual(snap["state"], "closed")
+        self.assertEqual(snap["calls"], 2)
+        self.assertEqual(snap["failures"], 1)
+        self.assertEqual(snap["failure_rate"], 0.5)
+        self.assertIsNone(snap["retry_in"])
+        self.call(exc.ClientException(500))
+        self.call(exc.ClientException(500))
+        self.clock.now += 5
+        self.assertEqual(self.breaker.snapshot()["retry_in"], 25)
+
+
+
+class BreakerRegistryTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(BreakerRegistryTest, self).__init__(*args, **kwargs)
+
+    def test_get(self):
+        registry = BreakerRegistry(min_calls=1)
+        brk = registry.get("example.com")
+        self.assertTrue(brk is registry.get("example.com"))
+        self.assertFalse(brk is registry.get("example.org"))
+        self.assertEqual(brk.min_calls, 1)
+
+    def test_states(self):
+        registry = BreakerRegistry(min_calls=1)
+        registry.get("example.com")
+        bad = registry.get("example.org")
+        bad.before_call()
+        bad.record(exc.ClientException(500))
+        states = registry.states()
+        self.assertEqual(states["example.com"]["state"], "closed")
+        self.assertEqual(states["example.org"]["state"], "open")
+        self.assertEqual(registry.open_hosts(), ["example.org"])
+        registry.reset()
+        self.assertEqual(registry.states(), {})
+
+    def test_get_default_registry(self):
+        for val, expected in ((None, None), ("False", None), (False, None),
+                ("True", breaker.default_registry), ("1",
+                breaker.default_registry), (True, breaker.default_registry)):
+            with patch.object(pyrax, "get_setting", return_value=val):
+                self.assertTrue(breaker.get_default_registry() is expected)
+
+    def test_get_states(self):
+        self.assertEqual(breaker.get_states(),
+                breaker.default_registry.states())
+
+
+if __name__ == "__main__":
+    unittest.main()
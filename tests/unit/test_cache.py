@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from mock import patch
+
+import pyrax.cache as cache
+from pyrax.cache import ResponseCache
+
+from pyrax import fakes
+
+BASE = "http://example.com/v1"
+
+
+def fake_resp(**headers):
+    resp = fakes.FakeResponse()
+    resp.headers = headers
+    return resp
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ResponseCacheTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.cache = ResponseCache(max_entries=3)
+
+    def tearDown(self):
+        pass
+
+    def test_is_cacheable(self):
+        self.assertTrue(ResponseCache.is_cacheable("get", {}))
+        self.assertTrue(ResponseCache.is_cacheable("HEAD", {}))
+        self.assertFalse(ResponseCache.is_cacheable("POST", {}))
+        self.assertFalse(ResponseCache.is_cacheable("GET", {"stream": True}))
+        self.assertFalse(ResponseCache.is_cacheable("GET", {"data": "x"}))
+        for name in ("Range", "X-Newest", "if-none-match"):
+            self.assertFalse(ResponseCache.is_cacheable("GET",
+                    {"headers": {name: "x"}}))
+        self.assertFalse(ResponseCache.is_cacheable("GET",
+                {"headers": {"Cache-Control": "no-cache"}}))
+        self.assertTrue(ResponseCache.is_cacheable("GET",
+                {"headers": {"X-Auth-Token": "x"}}))
+
+    def test_key_accept(self):
+        uri = "%s/cont" % BASE
+        json_key = ResponseCache.key("GET", uri,
+                {"headers": {"Accept": "application/json"}})
+        xml_key = ResponseCache.key("GET", uri,
+                {"headers": {"accept": "application/xml"}})
+        self.assertNotEqual(json_key, xml_key)
+        self.assertEqual(json_key, ResponseCache.key("GET", uri,
+                {"headers": {"ACCEPT": "application/json"}}))
+
+    def test_put_needs_validator_or_ttl(self):
+        self.assertIsNone(self.cache.put("k", fake_resp(), {}))
+        self.assertIsNotNone(self.cache.put("k", fake_resp(ETag="abc"), {}))
+        self.cache.ttl = 5
+        self.assertIsNotNone(self.cache.put("j", fake_resp(), {}))
+
+    def test_no_store(self):
+        resp = fake_resp(ETag="abc", **{"Cache-Control": "No-Store"})
+        self.assertIsNone(self.cache.put("k", resp, {}))
+
+    def test_validators(self):
+        entry = self.cache.put("k", fake_resp(ETag="abc",
+                **{"Last-Modified": "yesterday"}), {})
+        self.assertEqual(entry.validators(), {"If-None-Match": "abc",
+                "If-Modified-Since": "yesterday"})
+        self.assertFalse(entry.fresh())
+
+    def test_fresh(self):
+        self.cache.ttl = 10
+        with patch.object(cache, "_now", return_value=100):
+            entry = self.cache.put("k", fake_resp(), {})
+        with patch.object(cache, "_now", return_value=109):
+            self.assertTrue(entry.fresh())
+        with patch.object(cache, "_now", return_value=110):
+            self.assertFalse(entry.fresh())
+            self.cache.refresh(entry)
+        with patch.object(cache, "_now", return_value=119):
+            self.assertTrue(entry.fresh())
+
+    def test_body_copied(self):
+        body = {"a": [1]}
+        entry = self.cache.put("k", fake_resp(ETag="x"), body)
+        body["a"].append(2)
+        copied = entry.copy_body()
+        copied["a"].append(3)
+        self.assertEqual(entry.copy_body(), {"a": [1]})
+
+    def test_lru(self):
+        for key in "abc":
+            self.cache.put(key, fake_resp(ETag=key), None)
+        self.cache.get("a")
+        self.cache.put("d", fake_resp(ETag="d"), None)
+        self.assertEqual(len(self.cache), 3)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+
+    def test_invalidate(self):
+        self.cache.max_entries = 10
+        uris = ["%s" % BASE, "%s/cont" % BASE, "%s/cont?format=json" % BASE,
+                "%s/cont/obj" % BASE, "%s/cont/other" % BASE,
+                "%s/cont2" % BASE, "http://other.com/v1/cont"]
+        for uri in uris:
+            key = ResponseCache.key("GET", uri, {})
+            self.cache.put(key, fake_resp(ETag="x"), None)
+        self.cache.invalidate("%s/cont/obj" % BASE)
+        remaining = sorted(key[1] for key in self.cache._entries)
+        self.assertEqual(remaining, sorted(["%s/cont/other" % BASE,
+                "%s/cont2" % BASE, "http://other.com/v1/cont"]))
+
+    def test_clear(self):
+        self.cache.put("k", fake_resp(ETag="x"), None)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
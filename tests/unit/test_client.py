@@ -9,6 +9,7 @@ import os
 import pkg_resources
 import requests
 import unittest
+import zlib
 
 import six
 from six.moves import urllib
@@ -91,7 +92,8 @@ class ClientTest(unittest.TestCase):
         sav = mgr.list
         mgr.list = Mock()
         self.client.list()
-        mgr.list.assert_called_once_with(limit=None, marker=None)
+        mgr.list.assert_called_once_with(limit=None, marker=None,
+                fields=None, as_dicts=False, as_columns=False)
         mgr.list = sav
 
     def test_list_limit(self):
@@ -99,7 +101,17 @@ class ClientTest(unittest.TestCase):
         sav = mgr.list
         mgr.list = Mock()
         self.client.list(limit=10, marker="abc")
-        mgr.list.assert_called_once_with(limit=10, marker="abc")
+        mgr.list.assert_called_once_with(limit=10, marker="abc",
+                fields=None, as_dicts=False, as_columns=False)
+        mgr.list = sav
+
+    def test_list_fields(self):
+        mgr = self.client._manager
+        sav = mgr.list
+        mgr.list = Mock()
+        self.client.list(fields=["id", "status"], as_columns=True)
+        mgr.list.assert_called_once_with(limit=None, marker=None,
+                fields=["id", "status"], as_dicts=False, as_columns=True)
         mgr.list = sav
 
     def test_get(self):
@@ -159,6 +171,154 @@ class ClientTest(unittest.TestCase):
         clt.reset_timings()
         self.assertEqual(clt.get_timings(), [])
 
+    def test_timings_bounded(self):
+        clt = self.client
+        clt.timings = True
+        clt.request = Mock(return_value=(fakes.FakeResponse(), None))
+        for num in range(client.MAX_TIMINGS + 5):
+            clt._time_request("%s/servers/%s" % (DUMMY_URL, num), "GET")
+        timings = clt.get_timings()
+        self.assertEqual(len(timings), client.MAX_TIMINGS)
+        self.assertEqual(timings[-1][0], "GET %s/servers/%s" % (DUMMY_URL,
+                client.MAX_TIMINGS + 4))
+
+    def test_timings_off(self):
+        clt = self.client
+        clt.timings = False
+        clt.request = Mock(return_value=(fakes.FakeResponse(), None))
+        clt._time_request(DUMMY_URL, "GET")
+        self.assertEqual(clt.get_timings(), [])
+
+    def test_time_request_stats(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        resp = fakes.FakeResponse()
+        resp.headers = {"Content-Length": "42"}
+        resp.request = Mock(body=b"12345")
+        clt.request = Mock(return_value=(resp, None))
+        clt._time_request("%s/servers/1234?x=1" % DUMMY_URL, "PUT")
+        clt.request.side_effect = exc.NotFound(404)
+        self.assertRaises(exc.NotFound, clt._time_request,
+                "%s/servers/99" % DUMMY_URL, "PUT")
+        clt.request.side_effect = requests.exceptions.ConnectionError()
+        self.assertRaises(requests.exceptions.ConnectionError,
+                clt._time_request, "%s/servers/99" % DUMMY_URL, "PUT")
+        snap = clt.get_stats()
+        ep = snap["endpoints"]["PUT /servers/{id}"]
+        self.assertEqual(ep["statuses"], {200: 1, 404: 1,
+                "ConnectionError": 1})
+        self.assertEqual(ep["bytes_in"], 42)
+        self.assertEqual(ep["bytes_out"], 5)
+        self.assertEqual(ep["latency"]["count"], 3)
+        self.assertTrue("PUT /servers/{id}" in
+                pyrax.stats.get_stats()["endpoints"])
+
+    def test_reset_stats(self):
+        clt = self.client
+        clt.request = Mock(return_value=(fakes.FakeResponse(), None))
+        clt._time_request(DUMMY_URL, "GET")
+        clt.bytes_saved = 10
+        clt.retries = 2
+        clt.reset_stats()
+        snap = clt.get_stats()
+        self.assertEqual(snap["endpoints"], {})
+        self.assertEqual(snap["bytes_saved"], 0)
+        self.assertEqual(snap["coalesced"], 0)
+        self.assertEqual(clt.retries, 0)
+
+    def test_hooks(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        calls = []
+
+        def before(client, info):
+            calls.append(("before", client, info))
+            info["headers"]["X-Trace"] = "abc"
+
+        def after(client, info):
+            calls.append(("after", client, info))
+
+        clt.add_hook("before_request", before)
+        clt.add_hook("after_response", after)
+        try:
+            resp = fakes.FakeResponse()
+            resp.headers = {"Content-Length": "7"}
+            clt.request = Mock(return_value=(resp, None))
+            clt._time_request("%s/servers/12" % DUMMY_URL, "GET",
+                    headers={})
+        finally:
+            clt.remove_hook("before_request", before)
+            clt.remove_hook("after_response", after)
+        self.assertEqual(clt._hooks_map, {})
+        self.assertEqual(clt.request.call_args[1]["headers"],
+                {"X-Trace": "abc"})
+        self.assertEqual([call[0] for call in calls], ["before", "after"])
+        self.assertTrue(calls[0][1] is clt)
+        self.assertEqual(calls[0][2]["template"], "/servers/{id}")
+        info = calls[1][2]
+        self.assertEqual(info["status"], 200)
+        self.assertTrue(info["response"] is resp)
+        self.assertIsNone(info["error"])
+        self.assertEqual(info["bytes_in"], 7)
+        self.assertTrue(info["elapsed"] >= 0)
+
+    def test_hook_errors_ignored(self):
+        clt = self.client
+        hook = Mock(side_effect=RuntimeError("oops"))
+        clt.add_hook("after_response", hook)
+        try:
+            clt.request = Mock(side_effect=exc.NotFound(404))
+            with patch.object(pyrax, "_logger") as mock_log:
+                self.assertRaises(exc.NotFound, clt._time_request, DUMMY_URL,
+                        "GET")
+        finally:
+            clt.remove_hook("after_response", hook)
+        info = hook.call_args[0][1]
+        self.assertEqual(info["status"], 404)
+        self.assertTrue(isinstance(info["error"], exc.NotFound))
+        self.assertTrue(mock_log.exception.called)
+
+    def test_hook_invalid_type(self):
+        self.assertRaises(exc.InvalidHookType, self.client.add_hook,
+                "before_everything", Mock())
+
+    @patch("time.sleep")
+    def test_retry_and_reauth_hooks(self, mock_sleep):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.identity.authenticate = Mock()
+        clt.retry_policy = pyrax.retry.RetryPolicy(max_retries=1, backoff=1,
+                jitter=False)
+        err = exc.HTTPServiceUnavailable(503)
+        clt._time_request = Mock(side_effect=[exc.Unauthorized(401), (1, 1),
+                err, err])
+        on_retry = Mock()
+        on_reauth = Mock()
+        clt.add_hook("on_retry", on_retry)
+        clt.add_hook("on_reauth", on_reauth)
+        try:
+            clt._api_request("/abc", "GET")
+            self.assertRaises(exc.HTTPServiceUnavailable, clt._api_request,
+                    "/abc", "GET")
+        finally:
+            clt.remove_hook("on_retry", on_retry)
+            clt.remove_hook("on_reauth", on_reauth)
+        self.assertEqual(on_reauth.call_count, 1)
+        self.assertEqual(on_reauth.call_args[0][1]["template"], "/abc")
+        info = on_retry.call_args[0][1]
+        self.assertEqual((info["attempt"], info["delay"]), (1, 1))
+        self.assertTrue(info["error"] is err)
+
+    def test_uri_template(self):
+        clt = self.client
+        clt.management_url = "%s/v2/1234" % DUMMY_URL
+        self.assertEqual(clt._uri_template("%s/v2/1234/servers/abc1?a=b" %
+                DUMMY_URL), "/servers/{id}")
+        self.assertEqual(clt._uri_template("http://other.com/v1/AUTH_1/x"),
+                "/{id}/{id}/x")
+
     def test_get_limits(self):
         clt = self.client
         data = utils.random_unicode()
@@ -201,6 +361,62 @@ class ClientTest(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(body, body_content)
 
+    @patch("pyrax.http.request")
+    def test_request_accept_encoding(self, mock_req):
+        clt = self.client
+        mock_req.return_value = (fakes.FakeResponse(), None)
+        clt.request(utils.random_unicode(), "GET")
+        headers = mock_req.call_args[1]["headers"]
+        self.assertEqual(headers["Accept-Encoding"], "gzip, deflate")
+
+    @patch("pyrax.http.request")
+    def test_request_compressed_body(self, mock_req):
+        clt = self.client
+        clt.compression_threshold = 100
+        mock_req.return_value = (fakes.FakeResponse(), None)
+        body = {"records": [{"name": "www%s.example.com" % num,
+                "type": "A", "data": "10.0.0.1"} for num in range(50)]}
+        clt.request(utils.random_unicode(), "POST", body=body)
+        kwargs = mock_req.call_args[1]
+        self.assertFalse("body" in kwargs)
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+        data = zlib.decompress(kwargs["data"], 16 + zlib.MAX_WBITS)
+        self.assertEqual(json.loads(data.decode("utf-8")), body)
+        raw_size = len(json.dumps(body).encode("utf-8"))
+        self.assertEqual(clt.bytes_saved, raw_size - len(kwargs["data"]))
+
+    @patch("pyrax.http.request")
+    def test_request_small_body_not_compressed(self, mock_req):
+        clt = self.client
+        clt.compression_threshold = 100
+        mock_req.return_value = (fakes.FakeResponse(), None)
+        clt.request(utils.random_unicode(), "POST", body={"a": 1})
+        kwargs = mock_req.call_args[1]
+        self.assertFalse("Content-Encoding" in kwargs["headers"])
+        self.assertEqual(kwargs["data"], b'{"a": 1}')
+        self.assertEqual(clt.bytes_saved, 0)
+
+    @patch("pyrax.http.request")
+    def test_request_compression_disabled(self, mock_req):
+        clt = self.client
+        mock_req.return_value = (fakes.FakeResponse(), None)
+        clt.request(utils.random_unicode(), "POST", body={"a": 1})
+        kwargs = mock_req.call_args[1]
+        self.assertEqual(kwargs["body"], {"a": 1})
+
+    @patch("pyrax.http.request")
+    def test_request_response_bytes_saved(self, mock_req):
+        clt = self.client
+        resp = fakes.FakeResponse()
+        resp.headers = {"Content-Encoding": "gzip", "Content-Length": "10"}
+        resp.content = b"x" * 100
+        mock_req.return_value = (resp, None)
+        clt.request(utils.random_unicode(), "GET")
+        self.assertEqual(clt.bytes_saved, 90)
+        clt.request(utils.random_unicode(), "GET", stream=True)
+        self.assertEqual(clt.bytes_saved, 90)
+
     @patch("pyrax.exceptions.from_response")
     @patch("pyrax.http.request")
     def test_request_400(self, mock_req, mock_from):
@@ -253,6 +469,59 @@ class ClientTest(unittest.TestCase):
                 fake_method)
         mock_from.assert_called_once_with(fakeresp, "")
 
+    @patch("pyrax.http.request")
+    def test_request_uses_session(self, mock_req):
+        clt = self.client
+        fakeresp = fakes.FakeResponse()
+        fakeresp.status_code = 200
+        mock_req.return_value = (fakeresp, {})
+        fake_uri = utils.random_unicode()
+        clt.request(fake_uri, "GET")
+        cargs, ckwargs = mock_req.call_args
+        self.assertTrue(ckwargs["session"] is clt.session)
+
+    def test_session_lazy(self):
+        clt = self.client
+        clt.pool_maxsize = 5
+        self.assertIsNone(clt._session)
+        sess = clt.session
+        self.assertTrue(clt.session is sess)
+        adapter = sess.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, 5)
+        clt.close()
+
+    def test_session_transport(self):
+        clt = self.client
+        clt.transport = "fake"
+        transport = Mock()
+        with patch.dict(pyrax.transport._transports,
+                {"fake": Mock(return_value=transport)}):
+            self.assertTrue(clt.session is transport)
+
+    def test_use_transport(self):
+        clt = self.client
+        old = clt._session = Mock()
+        transport = Mock()
+        factory = Mock(return_value=transport)
+        with patch.dict(pyrax.transport._transports, {"fake": factory}):
+            clt.use_transport("fake")
+        factory.assert_called_once_with(pool_connections=None,
+                pool_maxsize=clt.pool_maxsize)
+        old.close.assert_called_once_with()
+        self.assertTrue(clt.session is transport)
+        self.assertEqual(clt.transport, "fake")
+        self.assertRaises(exc.InvalidTransport, clt.use_transport, "nothing")
+        self.assertTrue(clt.session is transport)
+
+    def test_close(self):
+        clt = self.client
+        sess = clt._session = Mock()
+        clt.close()
+        sess.close.assert_called_once_with()
+        self.assertIsNone(clt._session)
+        # Closing again is harmless
+        clt.close()
+
     def test_time_request(self):
         clt = self.client
         sav = clt.request
@@ -290,6 +559,29 @@ class ClientTest(unittest.TestCase):
         clt.request = sav_req
         id_svc.authenticate = sav_auth
 
+    def test_api_request_expired_already_reauthed(self):
+        clt = self.client
+        id_svc = clt.identity
+        clt.management_url = DUMMY_URL
+        id_svc.token = "old"
+        id_svc.tenant_id = utils.random_unicode()
+        id_svc.authenticate = Mock()
+        tokens = []
+
+        def fake_request(uri, method, **kwargs):
+            tokens.append(kwargs["headers"]["X-Auth-Token"])
+            if len(tokens) == 1:
+                # Another thread re-authenticates while this call is made.
+                id_svc.token = "new"
+                id_svc.auth_generation += 1
+                raise exc.Unauthorized("")
+            return (fakes.FakeResponse(), None)
+
+        clt._time_request = Mock(side_effect=fake_request)
+        clt._api_request(DUMMY_URL, "PUT")
+        self.assertFalse(id_svc.authenticate.called)
+        self.assertEqual(tokens, ["old", "new"])
+
     def test_api_request_not_authed(self):
         clt = self.client
         id_svc = clt.identity
@@ -377,6 +669,360 @@ class ClientTest(unittest.TestCase):
         clt._time_request = sav_req
         clt.management_url = sav_mgt
 
+    @patch("time.sleep")
+    def test_api_request_retry(self, mock_sleep):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.retry_policy = pyrax.retry.RetryPolicy(max_retries=2, backoff=1,
+                jitter=False)
+        returns = [exc.HTTPServiceUnavailable(503), exc.TooManyRequests(429,
+                retry_after="3"), (1, 1)]
+
+        def fake_req(*args, **kwargs):
+            result = returns.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        clt._time_request = Mock(side_effect=fake_req)
+        ret = clt._api_request("/abc", "GET")
+        self.assertEqual(ret, (1, 1))
+        self.assertEqual(clt._time_request.call_count, 3)
+        self.assertEqual(clt.retries, 2)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [1, 3])
+        self.assertEqual(clt.get_stats()["retries"], 2)
+
+    @patch("time.sleep")
+    def test_api_request_retry_exhausted(self, mock_sleep):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.retry_policy = pyrax.retry.RetryPolicy(max_retries=1)
+        clt._time_request = Mock(side_effect=exc.HTTPServiceUnavailable(503))
+        self.assertRaises(exc.HTTPServiceUnavailable, clt._api_request, "/abc",
+                "GET")
+        self.assertEqual(clt._time_request.call_count, 2)
+
+    @patch("time.sleep")
+    def test_api_request_retry_rewinds_file(self, mock_sleep):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.retry_policy = pyrax.retry.RetryPolicy(max_retries=1)
+        data = six.BytesIO(b"abcdef")
+        data.seek(2)
+        sent = []
+
+        def fake_req(*args, **kwargs):
+            sent.append(kwargs["data"].read())
+            if len(sent) == 1:
+                raise exc.HTTPServiceUnavailable(503)
+            return (1, 1)
+
+        clt._time_request = Mock(side_effect=fake_req)
+        clt._api_request("/abc", "PUT", data=data)
+        self.assertEqual(sent, [b"cdef", b"cdef"])
+
+    @patch("time.sleep")
+    def test_api_request_no_retry_generator(self, mock_sleep):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.retry_policy = pyrax.retry.RetryPolicy(max_retries=2)
+        data = (chunk for chunk in [b"a", b"b"])
+        clt._time_request = Mock(side_effect=exc.HTTPServiceUnavailable(503))
+        self.assertRaises(exc.HTTPServiceUnavailable, clt._api_request, "/abc",
+                "PUT", data=data)
+        self.assertEqual(clt._time_request.call_count, 1)
+        self.assertFalse(mock_sleep.called)
+
+    def test_api_request_no_retry_policy(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt._get_retry_policy = Mock(return_value=None)
+        clt._time_request = Mock(side_effect=exc.HTTPServiceUnavailable(503))
+        self.assertRaises(exc.HTTPServiceUnavailable, clt._api_request, "/abc",
+                "GET")
+        self.assertEqual(clt._time_request.call_count, 1)
+
+    def test_api_request_rate_limited(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.rate_limiter = Mock()
+        clt._time_request = Mock(return_value=(1, 1))
+        clt._api_request("/abc", "GET")
+        clt.rate_limiter.acquire.assert_called_once_with("GET",
+                "%s/abc" % DUMMY_URL)
+
+    def test_api_request_circuit_breaker(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt._get_retry_policy = Mock(return_value=None)
+        clt.circuit_breakers = pyrax.breaker.BreakerRegistry(min_calls=2,
+                reset_timeout=60)
+        clt._time_request = Mock(side_effect=exc.HTTPServiceUnavailable(503))
+        on_change = Mock()
+        clt.add_hook("on_circuit_change", on_change)
+        try:
+            for num in range(2):
+                self.assertRaises(exc.HTTPServiceUnavailable,
+                        clt._api_request, "/abc", "GET")
+            self.assertRaises(exc.CircuitOpen, clt._api_request, "/abc",
+                    "GET")
+        finally:
+            clt.remove_hook("on_circuit_change", on_change)
+        self.assertEqual(clt._time_request.call_count, 2)
+        info = on_change.call_args[0][1]
+        self.assertEqual(info["host"], "example.com")
+        self.assertEqual((info["old_state"], info["new_state"]),
+                ("closed", "open"))
+        state = clt.get_stats()["circuit_breaker"]
+        self.assertEqual(state["state"], "open")
+        self.assertEqual(state["failures"], 2)
+
+    @patch("time.sleep")
+    def test_api_request_circuit_open_not_retried(self, mock_sleep):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.retry_policy = pyrax.retry.RetryPolicy(max_retries=3)
+        clt.circuit_breakers = pyrax.breaker.BreakerRegistry(min_calls=1)
+        clt._time_request = Mock(side_effect=exc.HTTPServiceUnavailable(503))
+        self.assertRaises(exc.CircuitOpen, clt._api_request, "/abc", "GET")
+        self.assertEqual(clt._time_request.call_count, 1)
+
+    def test_api_request_circuit_rate_limited(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        clt.circuit_breakers = Mock()
+        breaker = clt.circuit_breakers.get.return_value
+        breaker.before_call.return_value = None
+        clt.rate_limiter = Mock()
+        clt.rate_limiter.acquire.side_effect = exc.RateLimitExceeded("")
+        self.assertRaises(exc.RateLimitExceeded, clt._api_request, "/abc",
+                "GET")
+        breaker.release.assert_called_once_with()
+        self.assertFalse(breaker.record.called)
+
+    def test_get_circuit_breaker(self):
+        clt = self.client
+        with patch.object(pyrax.breaker, "get_default_registry",
+                return_value=None):
+            self.assertIsNone(clt._get_circuit_breaker(DUMMY_URL))
+            self.assertIsNone(clt.get_stats()["circuit_breaker"])
+        registry = pyrax.breaker.BreakerRegistry()
+        clt.circuit_breakers = registry
+        breaker = clt._get_circuit_breaker("https://example.com:443/v1/x")
+        self.assertTrue(breaker is registry.get("example.com:443"))
+
+    def test_hedged_request(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = utils.random_unicode()
+        clt.identity.tenant_id = utils.random_unicode()
+        policy = clt.enable_hedging(percentile=90, budget=0.2,
+                default_delay=0.5)
+        self.assertTrue(clt.hedge_policy is policy)
+        self.assertEqual(policy.budget, 0.2)
+        self.assertEqual(policy.default_delay, 0.5)
+        policy.run = Mock(return_value=(1, 1))
+        clt._auth_request = Mock(return_value=(2, 2))
+        self.assertEqual(clt._api_request("/abc", "GET"), (1, 1))
+        primary, hedge, delay = policy.run.call_args[0]
+        self.assertEqual(delay, 0.5)
+        self.assertEqual(hedge(), (2, 2))
+        primary()
+        hedge_headers = clt._auth_request.call_args_list[0][1]["headers"]
+        primary_headers = clt._auth_request.call_args_list[1][1]["headers"]
+        self.assertEqual(hedge_headers, primary_headers)
+        self.assertFalse(hedge_headers is primary_headers)
+        self.assertEqual(clt.get_stats()["hedging"], policy.snapshot())
+
+    def test_hedged_request_not_hedged(self):
+        clt = self.client
+        clt._auth_request = Mock(return_value=(1, 1))
+        clt._hedged_request(DUMMY_URL, "GET")
+        self.assertIsNone(clt.get_stats()["hedging"])
+        clt.hedge_policy = Mock()
+        clt._hedged_request(DUMMY_URL, "POST", body={})
+        clt._hedged_request(DUMMY_URL, "GET", data=b"x")
+        self.assertEqual(clt._auth_request.call_count, 3)
+        self.assertFalse(clt.hedge_policy.run.called)
+
+    def test_hedged_request_rate_limited(self):
+        clt = self.client
+        clt.hedge_policy = Mock()
+        clt.hedge_policy.get_delay.return_value = 0.1
+        clt._hedged_request(DUMMY_URL, "HEAD")
+        allow = clt.hedge_policy.run.call_args[1]["allow"]
+        self.assertTrue(allow())
+        clt.rate_limiter = Mock()
+        self.assertTrue(allow())
+        clt.rate_limiter.acquire.assert_called_once_with("HEAD", DUMMY_URL,
+                block=False)
+        clt.rate_limiter.acquire.side_effect = exc.RateLimitExceeded("")
+        self.assertFalse(allow())
+
+    def test_hedged_request_discards_stream(self):
+        clt = self.client
+        clt.hedge_policy = Mock()
+        clt._hedged_request(DUMMY_URL, "GET", stream=True)
+        discard = clt.hedge_policy.run.call_args[1]["discard"]
+        resp = Mock()
+        discard((resp, None))
+        resp.close.assert_called_once_with()
+
+    def test_coalesce_requests_default(self):
+        self.assertFalse(self.client.coalesce_requests)
+
+    def test_api_request_coalesced(self):
+        clt = self.client
+        clt.coalesce_requests = True
+        clt.management_url = DUMMY_URL
+        clt.identity.token = "token"
+        clt.identity.tenant_id = "tenant"
+        clt._flights = Mock()
+        clt._flights.do.return_value = (1, 1)
+        ret = clt._api_request("/abc", "GET", raw_content=True)
+        self.assertEqual(ret, (1, 1))
+        key = clt._flights.do.call_args[0][0]
+        self.assertEqual(key, ("GET", "%s/abc" % DUMMY_URL,
+                (("X-Auth-Project-Id", "tenant"), ("X-Auth-Token", "token")),
+                (("raw_content", "True"),)))
+
+    def test_api_request_not_coalesced(self):
+        clt = self.client
+        clt.management_url = DUMMY_URL
+        clt.identity.token = "token"
+        clt.identity.tenant_id = "tenant"
+        clt.coalesce_requests = True
+        clt._flights = Mock()
+        clt._time_request = Mock(return_value=(1, 1))
+        clt._api_request("/abc", "POST")
+        clt._api_request("/abc", "GET", stream=True)
+        clt._api_request("/abc", "HEAD", data="x")
+        clt.coalesce_requests = False
+        clt._api_request("/abc", "GET")
+        self.assertFalse(clt._flights.do.called)
+        self.assertEqual(clt._time_request.call_count, 4)
+
+    def test_copy_result(self):
+        body = {"a": [1]}
+        resp, copied = client._copy_result(("resp", body))
+        self.assertEqual(resp, "resp")
+        self.assertEqual(copied, body)
+        self.assertFalse(copied is body)
+
+    def test_enable_response_cache(self):
+        clt = self.client
+        cache = clt.enable_response_cache(max_entries=5, ttl=3)
+        self.assertTrue(clt.response_cache is cache)
+        self.assertEqual((cache.max_entries, cache.ttl), (5, 3))
+
+    @patch("pyrax.http.request")
+    def test_request_cached_revalidated(self, mock_req):
+        clt = self.client
+        clt.enable_response_cache()
+        uri = "%s/domains" % DUMMY_URL
+        resp = fakes.FakeResponse()
+        resp.headers = {"ETag": "v1"}
+        not_modified = fakes.FakeResponse()
+        not_modified.status_code = 304
+        not_modified.headers = {}
+        mock_req.side_effect = [(resp, {"domains": [1]}), (not_modified, "")]
+        ret1 = clt.request(uri, "GET")
+        ret2 = clt.request(uri, "GET")
+        self.assertEqual(ret1, (resp, {"domains": [1]}))
+        self.assertEqual(ret2, (resp, {"domains": [1]}))
+        headers = mock_req.call_args[1]["headers"]
+        self.assertEqual(headers["If-None-Match"], "v1")
+
+    @patch("pyrax.http.request")
+    def test_request_cached_fresh(self, mock_req):
+        clt = self.client
+        clt.enable_response_cache(ttl=60)
+        uri = "%s/domains" % DUMMY_URL
+        mock_req.return_value = (fakes.FakeResponse(), {"a": 1})
+        clt.request(uri, "GET")
+        resp, body = clt.request(uri, "GET")
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertEqual(body, {"a": 1})
+
+    @patch("pyrax.http.request")
+    def test_request_cache_range(self, mock_req):
+        clt = self.client
+        clt.enable_response_cache(ttl=60)
+        uri = "%s/cont/obj" % DUMMY_URL
+        full = fakes.FakeResponse()
+        partial = fakes.FakeResponse()
+        partial.status_code = 206
+        mock_req.side_effect = [(full, "abcdef"), (partial, "ab"),
+                (full, "abcdef")]
+        clt.request(uri, "GET")
+        resp, body = clt.request(uri, "GET", headers={"Range": "bytes=0-1"})
+        self.assertEqual((resp, body), (partial, "ab"))
+        self.assertNotIn("If-None-Match", mock_req.call_args[1]["headers"])
+        resp, body = clt.request(uri, "GET")
+        self.assertEqual(body, "abcdef")
+        self.assertEqual(mock_req.call_count, 2)
+
+    @patch("pyrax.http.request")
+    def test_request_cache_invalidated(self, mock_req):
+        clt = self.client
+        clt.enable_response_cache(ttl=60)
+        uri = "%s/domains" % DUMMY_URL
+        mock_req.return_value = (fakes.FakeResponse(), {"a": 1})
+        clt.request(uri, "GET")
+        clt.request("%s/123" % uri, "DELETE")
+        clt.request(uri, "GET")
+        self.assertEqual(mock_req.call_count, 3)
+
+    @patch("pyrax.http.request")
+    def test_request_cache_invalidated_on_error(self, mock_req):
+        clt = self.client
+        clt.enable_response_cache(ttl=60)
+        uri = "%s/domains" % DUMMY_URL
+        mock_req.return_value = (fakes.FakeResponse(), {"a": 1})
+        clt.request(uri, "GET")
+        mock_req.side_effect = requests.exceptions.ConnectionError()
+        self.assertRaises(requests.exceptions.ConnectionError, clt.request,
+                uri, "POST", body={})
+        self.assertEqual(len(clt.response_cache), 0)
+
+    def test_enable_rate_limiting(self):
+        clt = self.client
+        limits = {"limits": {"rate": [{"regex": ".*", "limit": [{
+                "verb": "GET", "value": 10, "unit": "MINUTE"}]}]}}
+        clt.get_limits = Mock(return_value=limits)
+        limiter = clt.enable_rate_limiting(block=False)
+        self.assertTrue(clt.rate_limiter is limiter)
+        self.assertFalse(limiter.block)
+        self.assertEqual(len(limiter._buckets), 1)
+
+    def test_get_retry_policy(self):
+        clt = self.client
+        policy = pyrax.retry.RetryPolicy()
+        clt.retry_policy = policy
+        self.assertTrue(clt._get_retry_policy() is policy)
+        clt.retry_policy = None
+        with patch.object(pyrax.retry, "get_default_policy",
+                return_value=policy):
+            self.assertTrue(clt._get_retry_policy() is policy)
+
     def test_method_head(self):
         clt = self.client
         sav = clt._api_request
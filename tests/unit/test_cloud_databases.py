@@ -922,6 +922,12 @@ class CloudDatabasesTest(unittest.TestCase):
                 "datastore": {"type": "MariaDB", "version": "10"}}}
         self.assertEqual(ret, expected)
 
+    def test_clt_path_template(self):
+        clt = self.client
+        self.assertEqual(clt._path_template(
+                "/instances/8f14e45f/users/bob/databases/sales"),
+                "/instances/{id}/users/{name}/databases/{name}")
+
 
 if __name__ == "__main__":
     unittest.main()
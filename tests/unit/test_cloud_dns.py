@@ -166,6 +166,29 @@ class CloudDNSTest(unittest.TestCase):
         ret = mgr._list(example_uri, list_all=True)
         self.assertEqual(len(ret), 2)
 
+    def test_manager_list_fields(self):
+        clt = self.client
+        mgr = clt._manager
+        ret_body = {"domains": [{"id": 1, "name": "a.com"},
+                {"id": 2, "name": "b.com"}]}
+        clt.method_get = Mock(return_value=({}, ret_body))
+        ret = clt.list(fields=["name", "id"])
+        self.assertEqual(ret, [("a.com", 1), ("b.com", 2)])
+        ret = clt.list(fields="name", as_dicts=True)
+        self.assertEqual(ret, [{"name": "a.com"}, {"name": "b.com"}])
+
+    def test_manager_list_all_columns(self):
+        clt = self.client
+        mgr = clt._manager
+        next_uri = "%s/domains/%s" % (example_uri, utils.random_unicode())
+        first = {"domains": [{"id": 1, "name": "a.com"}],
+                "links": [{"href": next_uri, "rel": "next"}]}
+        last = {"domains": [{"id": 2, "name": "b.com"}]}
+        clt.method_get = Mock(side_effect=[({}, first), ({}, last)])
+        ret = mgr._list(example_uri, list_all=True, fields=["id", "name"],
+                as_dicts=True, as_columns=True)
+        self.assertEqual(ret, {"id": [1, 2], "name": ["a.com", "b.com"]})
+
     def test_list_previous_page(self):
         clt = self.client
         mgr = clt._manager
@@ -876,6 +899,13 @@ class CloudDNSTest(unittest.TestCase):
         clt = self.client
         self.assertRaises(exc.ServiceResponseFailure, clt.get_absolute_limits)
 
+    def test_client_path_template(self):
+        clt = self.client
+        self.assertEqual(clt._path_template("/rdns/cloudServersOpenStack"),
+                "/rdns/{service}")
+        self.assertEqual(clt._path_template("/domains/1234/records/A-5678"),
+                "/domains/{id}/records/{id}")
+
 
 if __name__ == "__main__":
     unittest.main()
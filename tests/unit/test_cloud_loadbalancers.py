@@ -14,6 +14,7 @@ from pyrax.cloudloadbalancers import Node
 from pyrax.cloudloadbalancers import VirtualIP
 from pyrax.cloudloadbalancers import assure_parent
 from pyrax.cloudloadbalancers import assure_loadbalancer
+from pyrax.jsonstream import JSONStream
 import pyrax.exceptions as exc
 import pyrax.utils as utils
 
@@ -569,6 +570,25 @@ class CloudLoadBalancerTest(unittest.TestCase):
         self.assertRaises(exc.UnattachedVirtualIP, mgr.delete_virtualip, lb,
                 vip)
 
+    def test_mgr_findall_pages(self):
+        mgr = self.client._manager
+        mgr.page_size = 2
+        pages = [b'{"loadBalancers": [{"id": 1, "name": "a"}, '
+                b'{"id": 2, "name": "b"}]}',
+                b'{"loadBalancers": [{"id": 3, "name": "a"}]}']
+        streams = []
+        for page in pages:
+            resp = Mock(encoding="utf-8")
+            resp.iter_content.return_value = [page]
+            streams.append((resp, JSONStream(resp)))
+        mgr.api.method_get = Mock(side_effect=streams)
+        ret = mgr.findall(name="a")
+        self.assertEqual([lb.id for lb in ret], [1, 3])
+        mgr.api.method_get.assert_any_call("/loadbalancers?limit=2",
+                stream=True)
+        mgr.api.method_get.assert_called_with(
+                "/loadbalancers?limit=2&marker=2", stream=True)
+
     def test_mgr_get_access_list(self):
         lb = self.loadbalancer
         mgr = lb.manager
@@ -204,7 +204,21 @@ class CloudMonitoringTest(unittest.TestCase):
                 other_keys="metadata")
         self.assertEqual(ret, (ents, next_marker))
 
-    def test_notif_manager_create(self):
+    def test_pagination_mgr_findall(self):
+        pm = _PaginationManager(self.client)
+        ent1 = fakes.FakeEntity()
+        ent1.label = "a"
+        ent2 = fakes.FakeEntity()
+        ent2.label = "b"
+        pm.list = Mock(side_effect=[([ent1], "next"), ([ent2], None)])
+        ret = pm.findall(label="b")
+        self.assertEqual(ret, [ent2])
+        pm.list.assert_any_call(limit=pm.page_size, marker=None,
+                return_next=True)
+        pm.list.assert_called_with(limit=pm.page_size, marker="next",
+                return_next=True)
+
+
         clt = self.client
         mgr = clt._notification_manager
         obj_id = utils.random_unicode()
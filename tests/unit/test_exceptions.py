@@ -45,6 +45,14 @@ class ExceptionsTest(unittest.TestCase):
         self.assertEqual(ret.details, "fake_details")
         self.assertTrue("HTTP 666" in str(ret))
 
+    def test_from_response_retry_after(self):
+        fake_resp = fakes.FakeResponse()
+        fake_resp.status_code = 429
+        fake_resp.headers = {"Retry-After": "7"}
+        ret = exc.from_response(fake_resp, None)
+        self.assertTrue(isinstance(ret, exc.TooManyRequests))
+        self.assertEqual(ret.retry_after, "7")
+
     def test_pickle(self):
         error = exc.NotFound(42, 'message', 'details', 0xDEADBEEF)
 
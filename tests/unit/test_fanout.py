@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+import unittest
+
+from mock import MagicMock as Mock
+
+import pyrax
+import pyrax.exceptions as exc
+import pyrax.fanout as fanout
+from pyrax.fanout import FanOutResults
+from pyrax.fanout import RegionResult
+
+from pyrax import fakes
+
+
+class FakeRegionClient(object):
+    def __init__(self, region):
+        self.region = region
+
+    def list_things(self, prefix=""):
+        return "%s%s" % (prefix, self.region)
+
+
+class FanOutTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(FanOutTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.identity = fakes.FakeIdentity()
+        self.identity.authenticated = True
+        self.identity.get_client = Mock(side_effect=self.get_client)
+        svc = fakes.FakeIdentityService(self.identity)
+        svc.endpoints = {"DFW": None, "ORD": None, "LON": None}
+        self.identity.services = {"fake": svc}
+
+    def tearDown(self):
+        pass
+
+    def get_client(self, service, region, public=True):
+        if region == "BAD":
+            raise exc.NoSuchClient("")
+        return FakeRegionClient(region)
+
+    def test_fan_out_method_name(self):
+        res = fanout.fan_out("fake", "list_things", prefix="x-",
+                context=self.identity)
+        self.assertEqual(res.results, {"DFW": "x-DFW", "ORD": "x-ORD",
+                "LON": "x-LON"})
+        self.assertEqual(res.errors, {})
+        for region, result in res.items():
+            self.assertTrue(result.ok)
+            self.assertIsNotNone(result.elapsed)
+
+    def test_fan_out_function(self):
+        res = fanout.fan_out("fake", lambda clt, n: clt.region * n, 2,
+                context=self.identity, regions=["DFW"])
+        self.assertEqual(res.results, {"DFW": "DFWDFW"})
+        self.identity.get_client.assert_called_once_with("fake", "DFW",
+                public=True)
+
+    def test_fan_out_errors(self):
+        res = fanout.fan_out("fake", "list_things", context=self.identity,
+                regions=["DFW", "BAD"], public=False)
+        self.assertEqual(res.results, {"DFW": "DFW"})
+        self.assertTrue(isinstance(res.errors["BAD"], exc.NoSuchClient))
+        self.assertRaises(exc.NoSuchClient, res["BAD"].get)
+        self.assertEqual(res["DFW"].get(), "DFW")
+
+    def test_fan_out_concurrent(self):
+        barrier = threading.Event()
+        arrived = []
+
+        def func(clt):
+            arrived.append(clt.region)
+            if len(arrived) == 3:
+                barrier.set()
+            # Only finishes if all three regions are called at once.
+            return barrier.wait(5)
+
+        res = fanout.fan_out("fake", func, context=self.identity)
+        self.assertEqual(res.results, {"DFW": True, "ORD": True, "LON": True})
+
+    def test_iter_fan_out_as_completed(self):
+        release = threading.Event()
+
+        def func(clt):
+            if clt.region == "ORD":
+                release.wait(5)
+            return clt.region
+
+        results = fanout.iter_fan_out("fake", func, context=self.identity,
+                regions=["ORD", "DFW"])
+        first = next(results)
+        self.assertEqual(first.region, "DFW")
+        release.set()
+        second = next(results)
+        self.assertEqual(second.region, "ORD")
+        self.assertRaises(StopIteration, next, results)
+
+    def test_fan_out_timeout(self):
+        release = threading.Event()
+
+        def func(clt):
+            if clt.region == "ORD":
+                release.wait(5)
+            return clt.region
+
+        start = time.time()
+        res = fanout.fan_out("fake", func, context=self.identity,
+                regions=["ORD", "DFW"], timeout=0.1)
+        release.set()
+        self.assertTrue(time.time() - start < 2)
+        self.assertEqual(res.results, {"DFW": "DFW"})
+        self.assertTrue(isinstance(res.errors["ORD"], exc.RegionTimeout))
+
+    def test_fan_out_no_regions(self):
+        res = fanout.fan_out("fake", "list_things", context=self.identity,
+                regions=[])
+        self.assertEqual(res, {})
+
+    def test_fan_out_unknown_service(self):
+        self.assertRaises(exc.NoSuchClient, fanout.fan_out, "nothing",
+                "list_things", context=self.identity)
+
+    def test_fan_out_not_authenticated(self):
+        self.identity.authenticated = False
+        self.assertRaises(exc.NotAuthenticated, fanout.fan_out, "fake",
+                "list_things", context=self.identity)
+
+    def test_fan_out_default_identity(self):
+        sav = pyrax.identity
+        pyrax.identity = None
+        self.assertRaises(exc.NotAuthenticated, fanout.fan_out, "fake",
+                "list_things")
+        pyrax.identity = self.identity
+        res = fanout.fan_out("fake", "list_things", regions=["LON"])
+        self.assertEqual(res.results, {"LON": "LON"})
+        pyrax.identity = sav
+
+    def test_region_result_repr(self):
+        self.assertTrue("ok" in repr(RegionResult("DFW", result=1)))
+        err = exc.RegionTimeout("slow")
+        self.assertTrue("slow" in repr(RegionResult("DFW", error=err)))
+
+    def test_results_and_errors(self):
+        res = FanOutResults()
+        err = Exception()
+        res["DFW"] = RegionResult("DFW", result=1)
+        res["ORD"] = RegionResult("ORD", error=err)
+        self.assertEqual(res.results, {"DFW": 1})
+        self.assertEqual(res.errors, {"ORD": err})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import unittest
+
+from mock import MagicMock as Mock
+
+import pyrax.exceptions as exc
+from pyrax.hedging import HedgePolicy
+from pyrax.stats import ClientStats
+
+
+class HedgePolicyTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(HedgePolicyTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.policy = HedgePolicy(budget=0.5, burst=2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.policy.close()
+
+    def slow(self, val="slow"):
+        def func():
+            self.release.wait(5)
+            return val
+        return func
+
+    def test_get_delay(self):
+        stats = ClientStats()
+        policy = HedgePolicy(percentile=50, min_samples=3, min_delay=0.01,
+                max_delay=1, default_delay=0.2)
+        self.assertEqual(policy.get_delay(stats, "GET", "/x"), 0.2)
+        for num in range(3):
+            stats.record("GET", "/x", 0.5, 200)
+        self.assertAlmostEqual(policy.get_delay(stats, "GET", "/x"), 0.5)
+        for num in range(10):
+            stats.record("GET", "/y", 10, 200)
+            stats.record("GET", "/z", 0.0001, 200)
+        self.assertEqual(policy.get_delay(stats, "GET", "/y"), 1)
+        self.assertEqual(policy.get_delay(stats, "GET", "/z"), 0.01)
+        policy.default_delay = None
+        self.assertIsNone(policy.get_delay(stats, "GET", "/other"))
+
+    def test_run_no_delay(self):
+        hedge = Mock()
+        self.assertEqual(self.policy.run(lambda: 1, hedge, None), 1)
+        self.assertFalse(hedge.called)
+        self.assertEqual(self.policy.snapshot()["calls"], 1)
+
+    def test_run_fast(self):
+        hedge = Mock()
+        self.assertEqual(self.policy.run(lambda: 1, hedge, 5), 1)
+        self.assertFalse(hedge.called)
+        self.assertEqual(self.policy.snapshot()["hedges"], 0)
+
+    def test_run_hedge_wins(self):
+        discard = Mock()
+        ret = self.policy.run(self.slow(), lambda: "fast", 0.01,
+                discard=discard)
+        self.assertEqual(ret, "fast")
+        self.assertEqual(self.policy.snapshot(), {"calls": 1, "hedges": 1,
+                "hedge_wins": 1})
+
+    def test_run_discards_loser(self):
+        discarded = threading.Event()
+        ret = self.policy.run(self.slow(), lambda: "fast", 0.01,
+                discard=lambda val: discarded.set())
+        self.assertEqual(ret, "fast")
+        self.release.set()
+        self.assertTrue(discarded.wait(5))
+
+    def test_run_primary_wins(self):
+        def hedge():
+            self.release.wait(5)
+            return "hedge"
+
+        done = threading.Event()
+
+        def primary():
+            done.wait(5)
+            return "primary"
+
+        timer = threading.Timer(0.05, done.set)
+        timer.start()
+        self.assertEqual(self.policy.run(primary, hedge, 0.01), "primary")
+        self.assertEqual(self.policy.snapshot()["hedge_wins"], 0)
+
+    def test_run_hedge_failure_ignored(self):
+        def hedge():
+            raise exc.HTTPServiceUnavailable(503)
+
+        timer = threading.Timer(0.05, self.release.set)
+        timer.start()
+        self.assertEqual(self.policy.run(self.slow(), hedge, 0.01), "slow")
+
+    def test_run_client_error_wins(self):
+        def hedge():
+            raise exc.NotFound(404)
+
+        self.assertRaises(exc.NotFound, self.policy.run, self.slow(), hedge,
+                0.01)
+
+    def test_run_both_fail(self):
+        first_err = exc.HTTPServiceUnavailable(503)
+
+        def primary():
+            self.release.wait(5)
+            raise first_err
+
+        def hedge():
+            self.release.set()
+            raise exc.HTTPServiceUnavailable(503)
+
+        try:
+            self.policy.run(primary, hedge, 0.01)
+        except exc.HTTPServiceUnavailable as e:
+            self.assertTrue(e is first_err)
+        else:
+            self.fail("No error raised")
+
+    def test_run_not_allowed(self):
+        hedge = Mock()
+        timer = threading.Timer(0.05, self.release.set)
+        timer.start()
+        ret = self.policy.run(self.slow(), hedge, 0.01, allow=lambda: False)
+        self.assertEqual(ret, "slow")
+        self.assertFalse(hedge.called)
+
+    def test_run_primary_not_queued(self):
+        self.policy = HedgePolicy(budget=1, burst=5, max_workers=1)
+        self.policy._get_pool().submit(self.slow())
+        self.policy._idle.acquire()
+        # The only worker is busy, but the primary runs at once, unhedged.
+        hedge = Mock()
+        self.assertEqual(self.policy.run(lambda: 1, hedge, 0.01), 1)
+        timer = threading.Timer(0.05, self.release.set)
+        timer.start()
+        self.assertEqual(self.policy.run(self.slow(), hedge, 0.01), "slow")
+        self.assertFalse(hedge.called)
+        self.assertEqual(self.policy.snapshot()["hedges"], 0)
+
+    def test_budget(self):
+        self.policy = HedgePolicy(budget=0.5, burst=1)
+        self.policy._credit = 0
+        hedge = Mock(return_value="hedge")
+        timer = threading.Timer(0.05, self.release.set)
+        timer.start()
+        # Half a hedge earned isn't enough for one.
+        self.assertEqual(self.policy.run(self.slow(), hedge, 0.01), "slow")
+        self.assertFalse(hedge.called)
+        self.release.clear()
+        self.assertEqual(self.policy.run(self.slow(), hedge, 0.01), "hedge")
+        self.assertEqual(self.policy.snapshot()["hedges"], 1)
+        self.assertEqual(self.policy._credit, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
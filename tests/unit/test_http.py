@@ -6,6 +6,7 @@ import json
 import logging
 import random
 import unittest
+import zlib
 
 from mock import patch
 from mock import MagicMock as Mock
@@ -103,6 +104,73 @@ class HttpTest(unittest.TestCase):
                 headers=headers, data=jbody)
         self.http.req_methods[mthd] = sav_method
 
+    def test_request_session(self):
+        mthd = random.choice(list(self.http.req_methods.keys()))
+        resp = fakes.FakeResponse()
+        sess = Mock()
+        getattr(sess, mthd.lower()).return_value = resp
+        uri = utils.random_unicode()
+        hk = utils.random_unicode()
+        hv = utils.random_unicode()
+        headers = {hk: hv}
+        self.http.request(mthd, uri, headers=headers, session=sess)
+        getattr(sess, mthd.lower()).assert_called_once_with(uri,
+                headers=headers)
+
+    def test_request_stream(self):
+        resp = fakes.FakeResponse()
+        resp.json = Mock()
+        sess = Mock()
+        sess.get.return_value = resp
+        uri = utils.random_unicode()
+        ret, body = self.http.request("GET", uri, session=sess, stream=True)
+        sess.get.assert_called_once_with(uri, headers={}, stream=True)
+        self.assertTrue(isinstance(body, pyrax.jsonstream.JSONStream))
+        self.assertTrue(body.resp is resp)
+        self.assertFalse(resp.json.called)
+
+    def test_request_stream_error(self):
+        resp = fakes.FakeResponse()
+        resp.status_code = 404
+        sess = Mock()
+        sess.get.return_value = resp
+        uri = utils.random_unicode()
+        self.assertRaises(exc.NotFound, self.http.request, "GET", uri,
+                session=sess, stream=True)
+
+    def test_gzip_compress(self):
+        data = b"abc" * 1000
+        compressed = self.http.gzip_compress(data)
+        self.assertTrue(len(compressed) < len(data))
+        self.assertEqual(zlib.decompress(compressed, 16 + zlib.MAX_WBITS),
+                data)
+
+    def test_response_bytes_saved(self):
+        resp = fakes.FakeResponse()
+        resp.content = b"x" * 50
+        resp.headers = {"Content-Encoding": "deflate", "Content-Length": "20"}
+        self.assertEqual(self.http.response_bytes_saved(resp), 30)
+        resp.headers = {"Content-Length": "20"}
+        self.assertEqual(self.http.response_bytes_saved(resp), 0)
+        resp.headers = {"Content-Encoding": "gzip"}
+        self.assertEqual(self.http.response_bytes_saved(resp), 0)
+
+    def test_create_session(self):
+        sess = self.http.create_session(pool_connections=3, pool_maxsize=7)
+        adapter = sess.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(sess.get_adapter("http://example.com") is adapter)
+        sess.close()
+
+    def test_create_session_defaults(self):
+        sess = self.http.create_session()
+        adapter = sess.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_connections,
+                self.http.DEFAULT_POOL_CONNECTIONS)
+        self.assertEqual(adapter._pool_maxsize, self.http.DEFAULT_POOL_MAXSIZE)
+        sess.close()
+
     def test_http_log_req(self):
         args = ("a", "b")
         kwargs = {"headers": {"c": "C"}}
@@ -2,11 +2,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import contextlib
+import copy
 import datetime
 import json
 import os
 import random
+import shutil
 import sys
+import tempfile
+import threading
+import time
 import unittest
 
 from six import StringIO
@@ -23,6 +29,23 @@ from pyrax.identity import rax_identity
 from pyrax import fakes
 
 
+@contextlib.contextmanager
+def local_zone(zone):
+    """Sets the local time zone to 'zone' while the block runs."""
+    saved = os.environ.get("TZ")
+    os.environ["TZ"] = zone
+    time.tzset()
+    try:
+        yield
+    finally:
+        if saved is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = saved
+        time.tzset()
+
+
+
 class DummyResponse(object):
     def read(self):
         pass
@@ -672,6 +695,263 @@ class IdentityTest(unittest.TestCase):
             ident.authenticate()
         pyrax.http.request = savrequest
 
+    def test_authenticate_increments_generation(self):
+        ident = self.rax_identity_class()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = fakes.fake_identity_response
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        self.assertEqual(ident.auth_generation, 0)
+        ident.authenticate()
+        self.assertEqual(ident.auth_generation, 1)
+        self.assertTrue(ident.token)
+        self.assertTrue(ident.services)
+        pyrax.http.request = savrequest
+
+    def test_reauthenticate(self):
+        ident = self.rax_identity_class()
+        ident.authenticate = Mock()
+        ident.auth_generation = 3
+        ret = ident.reauthenticate(3)
+        ident.authenticate.assert_called_once_with()
+        self.assertEqual(ret, 3)
+
+    def test_reauthenticate_no_generation(self):
+        ident = self.rax_identity_class()
+        ident.authenticate = Mock()
+        ident.reauthenticate()
+        ident.authenticate.assert_called_once_with()
+
+    def test_reauthenticate_already_done(self):
+        ident = self.rax_identity_class()
+        ident.authenticate = Mock()
+        ident.auth_generation = 4
+        ret = ident.reauthenticate(3)
+        self.assertFalse(ident.authenticate.called)
+        self.assertEqual(ret, 4)
+
+    def test_reauthenticate_concurrent(self):
+        ident = self.rax_identity_class()
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = fakes.fake_identity_response
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_post(*args, **kwargs):
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return fake_resp, fake_body
+
+        ident.method_post = Mock(side_effect=slow_post)
+        threads = [threading.Thread(target=ident.reauthenticate, args=(0,))
+                for i in range(8)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(ident.auth_generation, 1)
+
+    def test_renewal_delay(self):
+        ident = self.rax_identity_class()
+        ident.token = utils.random_unicode()
+        ident.expires = datetime.datetime.utcnow() + datetime.timedelta(
+                seconds=1000)
+        delay = ident._renewal_delay(300, 0)
+        self.assertTrue(695 < delay <= 700)
+        delay = ident._renewal_delay(300, 60)
+        self.assertTrue(635 < delay <= 700)
+
+    def test_renewal_delay_minimum(self):
+        ident = self.rax_identity_class()
+        ident.token = utils.random_unicode()
+        ident.expires = datetime.datetime.utcnow()
+        delay = ident._renewal_delay(300, 0)
+        self.assertEqual(delay, base_identity.MIN_RENEWAL_DELAY)
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset()")
+    def test_renewal_delay_local_zone(self):
+        ident = self.rax_identity_class()
+        ident.token = utils.random_unicode()
+        expires = datetime.datetime.utcnow() + datetime.timedelta(
+                seconds=1000)
+        ident.expires = ident._parse_api_time(expires.strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z"))
+        with local_zone("America/New_York"):
+            delay = ident._renewal_delay(300, 0)
+        self.assertTrue(690 < delay <= 700)
+        with local_zone("Asia/Tokyo"):
+            delay = ident._renewal_delay(300, 0)
+        self.assertTrue(690 < delay <= 700)
+
+    def test_renewal_delay_no_token(self):
+        ident = self.rax_identity_class()
+        self.assertIsNone(ident._renewal_delay(300, 0))
+
+    def test_renew_tokens(self):
+        ident = self.rax_identity_class()
+        ident.token = utils.random_unicode()
+        ident.expires = datetime.datetime.utcnow()
+        ident.auth_generation = 2
+        ident.reauthenticate = Mock()
+        stop = Mock()
+        stop.is_set.side_effect = [False, False, True]
+        stop.wait.return_value = False
+        ident._renew_tokens(stop, 300, 0)
+        ident.reauthenticate.assert_called_once_with(2)
+        stop.wait.assert_called_once_with(base_identity.MIN_RENEWAL_DELAY)
+
+    def test_renew_tokens_failure(self):
+        ident = self.rax_identity_class()
+        ident.token = utils.random_unicode()
+        ident.expires = datetime.datetime.utcnow()
+        ident.reauthenticate = Mock(side_effect=exc.AuthenticationFailed(""))
+        stop = Mock()
+        stop.is_set.side_effect = [False, False, True]
+        stop.wait.return_value = False
+        ident._renew_tokens(stop, 300, 0)
+        stop.wait.assert_called_with(base_identity.RENEWAL_RETRY_DELAY)
+
+    def test_renew_tokens_stopped(self):
+        ident = self.rax_identity_class()
+        ident.token = utils.random_unicode()
+        ident.expires = datetime.datetime.utcnow()
+        ident.reauthenticate = Mock()
+        stop = Mock()
+        stop.is_set.return_value = False
+        stop.wait.return_value = True
+        ident._renew_tokens(stop, 300, 0)
+        self.assertFalse(ident.reauthenticate.called)
+
+    def test_start_stop_token_renewal(self):
+        ident = self.rax_identity_class()
+        ident.start_token_renewal()
+        self.assertTrue(ident.renewing_token)
+        thread = ident._renewal_thread
+        self.assertTrue(thread.daemon)
+        ident.stop_token_renewal(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(ident.renewing_token)
+
+    def test_unauthenticate_stops_token_renewal(self):
+        ident = self.rax_identity_class()
+        ident.start_token_renewal()
+        thread = ident._renewal_thread
+        ident.unauthenticate()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+    def _cached_identity(self):
+        ident = self.rax_identity_class(username=self.username,
+                password=self.password)
+        ident.token_cache = pyrax.tokencache.TokenCache(self.tmpdir)
+        return ident
+
+    def test_authenticate_token_cache(self):
+        self.tmpdir = tempfile.mkdtemp()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = copy.deepcopy(fakes.fake_identity_response)
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        first = self._cached_identity()
+        first.authenticate()
+        self.assertEqual(pyrax.http.request.call_count, 1)
+        second = self._cached_identity()
+        second.authenticate()
+        # The second identity uses the cached token without a request.
+        self.assertEqual(pyrax.http.request.call_count, 1)
+        self.assertTrue(second.authenticated)
+        self.assertEqual(second.token, first.token)
+        self.assertEqual(sorted(second.services.keys()),
+                sorted(first.services.keys()))
+        pyrax.http.request = savrequest
+        shutil.rmtree(self.tmpdir)
+
+    def test_authenticate_token_cache_other_creds(self):
+        self.tmpdir = tempfile.mkdtemp()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = copy.deepcopy(fakes.fake_identity_response)
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        self._cached_identity().authenticate()
+        other = self._cached_identity()
+        other.password = "OTHERPASSWORD"
+        other.authenticate()
+        self.assertEqual(pyrax.http.request.call_count, 2)
+        pyrax.http.request = savrequest
+        shutil.rmtree(self.tmpdir)
+
+    def test_authenticate_token_cache_expiring(self):
+        self.tmpdir = tempfile.mkdtemp()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = copy.deepcopy(fakes.fake_identity_response)
+        soon = datetime.datetime.utcnow() + datetime.timedelta(seconds=10)
+        fake_body["access"]["token"]["expires"] = soon.strftime(
+                "%Y-%m-%dT%H:%M:%SZ")
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        self._cached_identity().authenticate()
+        self._cached_identity().authenticate()
+        self.assertEqual(pyrax.http.request.call_count, 2)
+        pyrax.http.request = savrequest
+        shutil.rmtree(self.tmpdir)
+
+    @unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset()")
+    def test_authenticate_token_cache_expired_local_zone(self):
+        self.tmpdir = tempfile.mkdtemp()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = copy.deepcopy(fakes.fake_identity_response)
+        past = datetime.datetime.utcnow() - datetime.timedelta(minutes=10)
+        fake_body["access"]["token"]["expires"] = past.strftime(
+                "%Y-%m-%dT%H:%M:%SZ")
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        with local_zone("America/New_York"):
+            self._cached_identity().authenticate()
+            self._cached_identity().authenticate()
+        self.assertEqual(pyrax.http.request.call_count, 2)
+        pyrax.http.request = savrequest
+        shutil.rmtree(self.tmpdir)
+
+    def test_authenticate_token_cache_invalid(self):
+        self.tmpdir = tempfile.mkdtemp()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = copy.deepcopy(fakes.fake_identity_response)
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        ident = self._cached_identity()
+        ident.authenticate()
+        ident.token_cache.put(ident._token_cache_key, {"bogus": True})
+        self._cached_identity().authenticate()
+        self.assertEqual(pyrax.http.request.call_count, 2)
+        pyrax.http.request = savrequest
+        shutil.rmtree(self.tmpdir)
+
+    def test_reauthenticate_discards_cached_token(self):
+        self.tmpdir = tempfile.mkdtemp()
+        savrequest = pyrax.http.request
+        fake_resp = fakes.FakeIdentityResponse()
+        fake_body = copy.deepcopy(fakes.fake_identity_response)
+        pyrax.http.request = Mock(return_value=(fake_resp, fake_body))
+        ident = self._cached_identity()
+        ident.authenticate()
+        ident.reauthenticate()
+        # The rejected token is not re-used from the cache.
+        self.assertEqual(pyrax.http.request.call_count, 2)
+        pyrax.http.request = savrequest
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_token_cache_setting(self):
+        ident = self.rax_identity_class()
+        self.assertIsNone(ident._get_token_cache())
+        with patch("pyrax.get_setting", return_value="/tmp/fake"):
+            cache = ident._get_token_cache()
+        self.assertEqual(cache.directory, "/tmp/fake")
+
     def test_authenticate_fail_creds(self):
         ident = self.rax_identity_class(username="BAD", password="BAD")
         savrequest = pyrax.http.request
@@ -888,7 +1168,8 @@ class IdentityTest(unittest.TestCase):
                 ident.method_post(uri, data=data, headers=headers,
                         std_headers=std_headers, admin=admin)
                 pyrax.http.request.assert_called_with("POST", uri, verify=True,
-                        body=data, headers=expected_headers)
+                        session=ident.session, body=data,
+                        headers=expected_headers)
                 self.assertEqual(out.getvalue(), "")
                 out.seek(0)
                 out.truncate()
@@ -905,8 +1186,8 @@ class IdentityTest(unittest.TestCase):
         pyrax.http.request = Mock()
         ident._call("POST", "tokens", False, {}, {}, False)
         pyrax.http.request.assert_called_with("POST",
-                "http://example.com/v2.0/tokens", verify=False, headers={},
-                raise_exception=False)
+                "http://example.com/v2.0/tokens", verify=False,
+                session=ident.session, headers={}, raise_exception=False)
 
     def test_call_with_slash(self):
         ident = self.base_identity_class()
@@ -916,8 +1197,22 @@ class IdentityTest(unittest.TestCase):
         pyrax.http.request = Mock()
         ident._call("POST", "tokens", False, {}, {}, False)
         pyrax.http.request.assert_called_with("POST",
-                "http://example.com/v2.0/tokens", verify=False, headers={},
-                raise_exception=False)
+                "http://example.com/v2.0/tokens", verify=False,
+                session=ident.session, headers={}, raise_exception=False)
+
+    def test_session(self):
+        ident = self.base_identity_class()
+        sess = ident.session
+        self.assertTrue(ident.session is sess)
+        ident.close()
+        self.assertIsNone(ident._session)
+
+    def test_close(self):
+        ident = self.base_identity_class()
+        sess = ident._session = Mock()
+        ident.close()
+        sess.close.assert_called_once_with()
+        self.assertIsNone(ident._session)
 
     def test_list_users(self):
         ident = self.rax_identity_class()
@@ -1302,7 +1597,7 @@ class IdentityTest(unittest.TestCase):
             ident.authenticate()
             valid = ident._has_valid_token()
             self.assertTrue(valid)
-            ident.expires = datetime.datetime.now() - datetime.timedelta(1)
+            ident.expires = datetime.datetime.utcnow() - datetime.timedelta(1)
             valid = ident._has_valid_token()
             self.assertFalse(valid)
             ident = self._get_clean_identity()
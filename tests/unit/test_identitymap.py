@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from mock import patch
+
+from pyrax.clouddatabases import CloudDatabaseFlavor
+import pyrax.identitymap
+from pyrax.identitymap import IdentityMap
+from pyrax.identitymap import key_of
+from pyrax.resource import BaseResource
+
+from pyrax import fakes
+
+
+class IdentityMapTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(IdentityMapTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.now = 1000.0
+        self.patcher = patch.object(pyrax.identitymap, "_now",
+                new=lambda: self.now)
+        self.patcher.start()
+        self.manager = fakes.FakeManager()
+        self.imap = IdentityMap(ttl=10, max_entries=3)
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def resource(self, loaded=False, **info):
+        return BaseResource(self.manager, info, loaded=loaded)
+
+    def test_key_of(self):
+        self.assertEqual(key_of(self.resource(id=42)), (BaseResource, "42"))
+        self.assertEqual(key_of(self.resource(id="abc")),
+                (BaseResource, "abc"))
+        self.assertIsNone(key_of(self.resource(name="x")))
+        self.assertIsNone(key_of(object()))
+
+    def test_get_fresh_complete_only(self):
+        imap = self.imap
+        listed = self.resource(id=1, name="a")
+        self.assertTrue(imap.add(listed) is listed)
+        self.assertIsNone(imap.get_fresh(BaseResource, 1))
+        fetched = self.resource(loaded=True, id=1, name="a", size=3)
+        self.assertTrue(imap.add(fetched, complete=True) is listed)
+        self.assertTrue(imap.get_fresh(BaseResource, 1) is listed)
+        self.assertTrue(imap.get_fresh(BaseResource, "1") is listed)
+        self.assertEqual(listed.size, 3)
+        self.assertTrue(listed.loaded)
+        self.assertEqual((imap.hits, imap.misses), (2, 1))
+
+    def test_add_updates_live_object(self):
+        imap = self.imap
+        first = self.resource(loaded=True, id=1, status="BUILD", size=3)
+        imap.add(first, complete=True)
+        listed = self.resource(id=1, status="ACTIVE")
+        self.assertTrue(imap.add(listed) is first)
+        self.assertEqual(first.status, "ACTIVE")
+        self.assertEqual(first.size, 3)
+        self.assertEqual(len(imap), 1)
+
+    def test_classes_kept_apart(self):
+        imap = self.imap
+        server = self.resource(loaded=True, id=1)
+        flavor = CloudDatabaseFlavor(self.manager, {"id": 1}, loaded=True)
+        self.assertTrue(imap.add(server, complete=True) is server)
+        self.assertTrue(imap.add(flavor, complete=True) is flavor)
+        self.assertTrue(imap.get_fresh(BaseResource, 1) is server)
+        self.assertTrue(imap.get_fresh(CloudDatabaseFlavor, 1) is flavor)
+        imap.invalidate(1)
+        self.assertEqual(len(imap), 0)
+
+    def test_add_without_id(self):
+        obj = self.resource(name="x")
+        self.assertTrue(self.imap.add(obj) is obj)
+        self.assertEqual(len(self.imap), 0)
+
+    def test_ttl(self):
+        imap = self.imap
+        obj = self.resource(loaded=True, id=1)
+        imap.add(obj, complete=True)
+        self.now += 9
+        self.assertTrue(imap.get_fresh(BaseResource, 1) is obj)
+        # Listings don't extend the life of fetched details.
+        imap.add(self.resource(id=1))
+        self.now += 2
+        self.assertIsNone(imap.get_fresh(BaseResource, 1))
+        self.assertEqual(len(imap), 0)
+        new = self.resource(id=1)
+        self.assertTrue(imap.add(new) is new)
+
+    def test_max_entries(self):
+        imap = self.imap
+        objs = [self.resource(loaded=True, id=num) for num in range(4)]
+        for obj in objs[:3]:
+            imap.add(obj, complete=True)
+        imap.get_fresh(BaseResource, 0)
+        imap.add(objs[3], complete=True)
+        self.assertEqual(len(imap), 3)
+        self.assertTrue(imap.get_fresh(BaseResource, 0) is objs[0])
+        self.assertIsNone(imap.get_fresh(BaseResource, 1))
+
+    def test_invalidate(self):
+        imap = self.imap
+        imap.add(self.resource(loaded=True, id=1), complete=True)
+        imap.add(self.resource(loaded=True, id=2), complete=True)
+        imap.invalidate(1)
+        self.assertIsNone(imap.get_fresh(BaseResource, 1))
+        self.assertIsNotNone(imap.get_fresh(BaseResource, 2))
+        imap.clear()
+        self.assertEqual(len(imap), 0)
+
+    def test_snapshot(self):
+        imap = self.imap
+        self.assertEqual(imap.snapshot(), {"entries": 0, "hits": 0,
+                "misses": 0, "hit_rate": 0.0})
+        imap.add(self.resource(loaded=True, id=1), complete=True)
+        imap.get_fresh(BaseResource, 1)
+        imap.get_fresh(BaseResource, 2)
+        self.assertEqual(imap.snapshot(), {"entries": 1, "hits": 1,
+                "misses": 1, "hit_rate": 0.5})
+        imap.reset_stats()
+        self.assertEqual((imap.hits, imap.misses), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -158,7 +158,8 @@ class ImageTest(unittest.TestCase):
                 member_status=member_status, owner=owner, tag=tag,
                 status=status, size_min=size_min, size_max=size_max,
                 sort_key=sort_key, sort_dir=sort_dir, return_raw=return_raw)
-        mgr._list.assert_called_once_with(expected, return_raw=return_raw)
+        mgr._list.assert_called_once_with(expected, return_raw=return_raw,
+                fields=None, as_dicts=False, as_columns=False)
         utils.dict_to_qs = sav
 
     def test_imgmgr_list_all(self):
@@ -177,6 +178,38 @@ class ImageTest(unittest.TestCase):
                 return_raw=True)
         mgr.api.method_get.assert_called_once_with(next_link)
 
+    def test_imgmgr_list_all_fields(self):
+        clt = self.client
+        mgr = clt._manager
+        next_link = "/images?marker=00000000-0000-0000-0000-0000000000"
+        fake_body = {"images": [{"id": "1", "name": "fake1"}],
+                "next": "/v2%s" % next_link}
+        mgr.list = Mock(return_value=(None, fake_body))
+        fake_last_body = {"images": [{"id": "2", "status": "active"}],
+                "next": ""}
+        mgr.api.method_get = Mock(return_value=(None, fake_last_body))
+        ret = mgr.list_all(fields=("id", "name"))
+        self.assertEqual(ret, [("1", "fake1"), ("2", None)])
+        mgr.api.method_get.assert_called_once_with(next_link)
+
+    def test_imgmgr_findall(self):
+        clt = self.client
+        mgr = clt._manager
+        mgr.resource_class = pyrax.image.Image
+        next_link = "/images?marker=1"
+        fake_body = {"images": [{"id": "1", "name": "a", "size": 1,
+                "status": "active"}],
+                "next": "/v2%s" % next_link}
+        mgr.list = Mock(return_value=(None, fake_body))
+        fake_last_body = {"images": [{"id": "2", "name": "a", "size": 2,
+                "status": "active"}]}
+        mgr.api.method_get = Mock(return_value=(None, fake_last_body))
+        ret = mgr.findall(name="a", status="active", size=2)
+        self.assertEqual([img.id for img in ret], ["2"])
+        mgr.list.assert_called_once_with(return_raw=True, name="a",
+                status="active")
+        mgr.api.method_get.assert_called_once_with(next_link)
+
     def test_imgmgr_update(self):
         clt = self.client
         mgr = clt._manager
@@ -405,7 +438,8 @@ class ImageTest(unittest.TestCase):
         mgr.list.assert_called_once_with(limit=limit, marker=marker, name=name,
                 visibility=visibility, member_status=member_status,
                 owner=owner, tag=tag, status=status, size_min=size_min,
-                size_max=size_max, sort_key=sort_key, sort_dir=sort_dir)
+                size_max=size_max, sort_key=sort_key, sort_dir=sort_dir,
+                fields=None, as_dicts=False, as_columns=False)
 
     def test_clt_list_all(self):
         clt = self.client
@@ -414,7 +448,8 @@ class ImageTest(unittest.TestCase):
         clt.list_all()
         mgr.list_all.assert_called_once_with(name=None, visibility=None,
                 member_status=None, owner=None, tag=None, status=None,
-                size_min=None, size_max=None, sort_key=None, sort_dir=None)
+                size_min=None, size_max=None, sort_key=None, sort_dir=None,
+                fields=None, as_dicts=False, as_columns=False)
 
     def test_clt_update(self):
         clt = self.client
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import json
+import unittest
+import warnings
+
+from mock import patch
+
+import pyrax
+import pyrax.jsoncodec as jsoncodec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodecTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(JSONCodecTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.payload = {"metrics": [{"timestamp": 1400000000000 + num,
+                "average": num / 3.0, "name": "café"}
+                for num in range(20)]}
+
+    def tearDown(self):
+        pass
+
+    def use(self, name):
+        return patch.object(pyrax, "get_setting", return_value=name)
+
+    def test_default(self):
+        with self.use(None):
+            codec = jsoncodec.get_codec()
+            self.assertEqual(codec.name, "stdlib")
+            self.assertEqual(jsoncodec.dumps(self.payload),
+                    json.dumps(self.payload))
+            self.assertEqual(jsoncodec.loads(b'{"a": [1]}'), {"a": [1]})
+            self.assertEqual(jsoncodec.loads('{"a": [1]}'), {"a": [1]})
+            self.assertRaises(ValueError, jsoncodec.loads, b"Oops")
+
+    @unittest.skipIf(orjson is None, "requires orjson")
+    def test_orjson(self):
+        with self.use("orjson"):
+            codec = jsoncodec.get_codec()
+            self.assertEqual(codec.name, "orjson")
+            encoded = jsoncodec.dumps(self.payload)
+            self.assertEqual(jsoncodec.loads(encoded), self.payload)
+            self.assertRaises(ValueError, jsoncodec.loads, b"Oops")
+            # orjson can't encode non-string keys; stdlib takes over.
+            self.assertEqual(json.loads(jsoncodec.dumps({1: "a"})),
+                    {"1": "a"})
+
+    def test_unavailable(self):
+        with self.use("nosuchcodec"):
+            with patch.object(pyrax, "_logger"):
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always")
+                    self.assertEqual(jsoncodec.get_codec().name, "stdlib")
+                    self.assertEqual(jsoncodec.get_codec().name, "stdlib")
+        self.assertEqual(len(caught), 1)
+
+    def test_not_installed(self):
+        with self.use("ujson"):
+            with patch("importlib.import_module", side_effect=ImportError):
+                with patch.object(pyrax, "_logger"):
+                    with warnings.catch_warnings(record=True):
+                        warnings.simplefilter("always")
+                        self.assertEqual(jsoncodec.get_codec().name,
+                                "stdlib")
+
+    def test_stdlib_errors_raised(self):
+        with self.use("stdlib"):
+            self.assertRaises(TypeError, jsoncodec.dumps, object())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import json
+import unittest
+
+from mock import MagicMock as Mock
+
+from pyrax.jsonstream import JSONStream
+from pyrax.jsonstream import iter_items
+
+
+def chunked(text, size):
+    data = text.encode("utf-8")
+    return [data[pos:pos + size] for pos in range(0, len(data), size)]
+
+
+class JSONStreamTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(JSONStreamTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.items = [{"id": num, "name": "café %s" % num,
+                "size": num * 1000.5, "tags": ["a", None, True]}
+                for num in range(50)] + [12345, "text", [1, [2]]]
+
+    def tearDown(self):
+        pass
+
+    def test_list(self):
+        text = json.dumps(self.items)
+        for size in (1, 3, 7, 4096):
+            ret = list(iter_items(chunked(text, size)))
+            self.assertEqual(ret, self.items)
+
+    def test_keyed(self):
+        text = json.dumps({"before": {"x": [1, 2]}, "widgets": self.items,
+                "after": 1})
+        ret = list(iter_items(chunked(text, 5), key="widgets"))
+        self.assertEqual(ret, self.items)
+
+    def test_keyed_values(self):
+        text = json.dumps({"widgets": {"values": [1, 2]}})
+        ret = list(iter_items(chunked(text, 5), key="widgets"))
+        self.assertEqual(ret, [1, 2])
+
+    def test_missing_key(self):
+        text = json.dumps({"other": [1, 2]})
+        self.assertEqual(list(iter_items(chunked(text, 5), key="widgets")),
+                [])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_items([b"[ ]"])), [])
+        self.assertEqual(list(iter_items([b"{}"], key="widgets")), [])
+
+    def test_lazy(self):
+        text = json.dumps(self.items)
+        chunks = iter(chunked(text, 10))
+        gen = iter_items(chunks)
+        self.assertEqual(next(gen), self.items[0])
+        # Only as much as the first element needed has been read.
+        self.assertTrue(len(list(chunks)) > 100)
+
+    def test_malformed(self):
+        self.assertRaises(ValueError, list, iter_items([b"[1, 2"]))
+        self.assertRaises(ValueError, list, iter_items([b"[1 2]"]))
+        self.assertRaises(ValueError, list, iter_items([b'"the"']))
+        self.assertRaises(ValueError, list, iter_items([b'{"a": 1}'],
+                key="a"))
+
+    def test_json_stream(self):
+        resp = Mock(encoding=None)
+        resp.iter_content.return_value = chunked(json.dumps({"widgets":
+                self.items}), 16)
+        stream = JSONStream(resp, chunk_size=16)
+        self.assertEqual(list(stream.items(key="widgets")), self.items)
+        resp.iter_content.assert_called_once_with(16)
+        resp.close.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,8 +7,10 @@ import unittest
 
 from mock import MagicMock as Mock
 
+from pyrax.clouddatabases import CloudDatabaseFlavor
 import pyrax.exceptions as exc
 from pyrax import manager
+from pyrax import resource
 import pyrax.utils as utils
 
 from pyrax import fakes
@@ -40,7 +42,64 @@ class ManagerTest(unittest.TestCase):
                 other_keys=other_keys)
         exp_uri = "/test?limit=%s&marker=%s" % (limit, marker)
         mgr._list.assert_called_once_with(exp_uri, return_raw=return_raw,
-                other_keys=other_keys)
+                other_keys=other_keys, fields=None, as_dicts=False,
+                as_columns=False)
+
+    def test_list_stream(self):
+        mgr = self.manager
+        mgr._list_stream = Mock()
+        mgr.uri_base = "test"
+        ret = mgr.list(limit=5, stream=True)
+        mgr._list_stream.assert_called_once_with("/test?limit=5",
+                fields=None, as_dicts=False)
+        self.assertTrue(ret is mgr._list_stream.return_value)
+
+    def test_list_stream_columns(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        stream = Mock()
+        stream.items.return_value = iter([{"a": 1, "b": 2}, {}, {"a": 3}])
+        mgr.api.method_get = Mock(return_value=(None, stream))
+        ret = mgr.list(stream=True, fields=["a", "b"], as_columns=True)
+        self.assertEqual(ret, {"a": [1, 3], "b": [2, None]})
+
+    def test_under_list_stream_fields(self):
+        mgr = self.manager
+        mgr.resource_class = fakes.FakeEntity
+        stream = Mock()
+        stream.items.return_value = iter([{"a": 1, "b": 2}, {}, {"a": 3}])
+        mgr.api.method_get = Mock(return_value=(None, stream))
+        ret = mgr._list_stream("/test", fields=["b", "a"])
+        self.assertFalse(mgr.api.method_get.called)
+        self.assertEqual(list(ret), [(2, 1), (None, 3)])
+        stream.items.return_value = iter([{"a": 1, "b": 2}])
+        ret = mgr._list_stream("/test", fields="a", as_dicts=True)
+        self.assertEqual(list(ret), [{"a": 1}])
+
+    def test_under_list_stream(self):
+        mgr = self.manager
+        mgr.resource_class = fakes.FakeEntity
+        mgr.plural_response_key = "things"
+        stream = Mock()
+        stream.items.return_value = iter([{"a": 1}, {}, {"a": 2}])
+        mgr.api.method_get = Mock(return_value=(None, stream))
+        ret = mgr._list_stream("/test")
+        self.assertFalse(mgr.api.method_get.called)
+        ret = list(ret)
+        mgr.api.method_get.assert_called_once_with("/test", stream=True)
+        stream.items.assert_called_once_with(key="things")
+        self.assertEqual(len(ret), 2)
+
+    def test_under_list_stream_body(self):
+        mgr = self.manager
+        mgr.resource_class = fakes.FakeEntity
+        body = {"x": 1}
+        stream = Mock()
+        stream.items.return_value = iter([])
+        mgr.api.method_post = Mock(return_value=(None, stream))
+        list(mgr._list_stream("/test", body=body))
+        mgr.api.method_post.assert_called_once_with("/test", body=body,
+                stream=True)
 
     def test_under_list_return_raw(self):
         mgr = self.manager
@@ -64,7 +123,8 @@ class ManagerTest(unittest.TestCase):
                 other_keys=other_keys)
         expected_uri = "/test?limit=%s&marker=%s" % (limit, marker)
         mgr._list.assert_called_once_with(expected_uri, return_raw=return_raw,
-                other_keys=other_keys)
+                other_keys=other_keys, fields=None, as_dicts=False,
+                as_columns=False)
 
     def test_head(self):
         mgr = self.manager
@@ -150,6 +210,31 @@ class ManagerTest(unittest.TestCase):
         self.assertEqual(len(ret), 1)
         self.assertTrue(isinstance(ret[0], fakes.FakeEntity))
 
+    def test_under_list_fields(self):
+        mgr = self.manager
+        body = {"fakes": [{"id": 1, "status": "OK", "name": "a"}, {},
+                {"id": 2, "name": "b"}]}
+        mgr.api.method_get = Mock(return_value=(object(), body))
+        mgr.plural_response_key = "fakes"
+        mgr.resource_class = fakes.FakeEntity
+        ret = mgr._list(fake_url, fields=["id", "status"])
+        self.assertEqual(ret, [(1, "OK"), (2, None)])
+        ret = mgr._list(fake_url, fields=["id", "status"], as_dicts=True)
+        self.assertEqual(ret, [{"id": 1, "status": "OK"},
+                {"id": 2, "status": None}])
+        ret = mgr._list(fake_url, fields=["id", "status"], as_columns=True)
+        self.assertEqual(ret, {"id": [1, 2], "status": ["OK", None]})
+        ret = mgr._list(fake_url, fields="name")
+        self.assertEqual(ret, [("a",), ("b",)])
+
+    def test_under_list_fields_other_keys(self):
+        mgr = self.manager
+        body = {"fakes": [{"id": 1}], "next": "x"}
+        mgr.api.method_get = Mock(return_value=(object(), body))
+        mgr.plural_response_key = "fakes"
+        ret = mgr._list(fake_url, fields="id", other_keys="next")
+        self.assertEqual(ret, ([(1,)], ["x"]))
+
     def test_under_create_return_none(self):
         mgr = self.manager
         mgr.run_hooks = Mock()
@@ -214,6 +299,103 @@ class ManagerTest(unittest.TestCase):
         mgr.api.method_post.assert_called_once_with("/testing/%s/action" %
                 item.id, body={"fake": {}})
 
+    def test_identity_map_get(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        mgr.resource_class = resource.BaseResource
+        mgr.response_key = "thing"
+        imap = mgr.enable_identity_map(ttl=30)
+        self.assertTrue(mgr.identity_map is imap)
+        self.assertEqual(imap.ttl, 30)
+        body = {"thing": {"id": 1, "name": "a"}}
+        mgr.api.method_get = Mock(return_value=(None, body))
+        first = mgr.get(1)
+        second = mgr.get("1")
+        self.assertTrue(first is second)
+        self.assertEqual(mgr.api.method_get.call_count, 1)
+        self.assertEqual((imap.hits, imap.misses), (1, 1))
+        # An object reloading itself is always fetched.
+        body["thing"]["name"] = "b"
+        first.reload()
+        self.assertEqual(mgr.api.method_get.call_count, 2)
+        self.assertEqual(first.name, "b")
+
+    def test_identity_map_list(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        mgr.resource_class = resource.BaseResource
+        mgr.response_key = "thing"
+        mgr.plural_response_key = "things"
+        mgr.enable_identity_map()
+        list_body = {"things": [{"id": 1, "status": "BUILD"}, {"id": 2}]}
+        mgr.api.method_get = Mock(return_value=(None, list_body))
+        listed = mgr._list("/test")
+        again = mgr._list("/test")
+        self.assertTrue(listed[0] is again[0])
+        self.assertTrue(listed[1] is again[1])
+        get_body = {"thing": {"id": 1, "status": "BUILD", "size": 3}}
+        mgr.api.method_get = Mock(return_value=(None, get_body))
+        # Touching a missing detail loads it once, for the live object.
+        self.assertEqual(listed[0].size, 3)
+        list_body["things"][0]["status"] = "ACTIVE"
+        mgr.api.method_get = Mock(return_value=(None, list_body))
+        again = mgr._list("/test")
+        self.assertTrue(again[0] is listed[0])
+        self.assertEqual(again[0].status, "ACTIVE")
+        self.assertEqual(again[0].size, 3)
+        self.assertTrue(mgr.get(1) is listed[0])
+        self.assertEqual(mgr.api.method_get.call_count, 1)
+
+    def test_identity_map_other_class(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        mgr.resource_class = resource.BaseResource
+        mgr.plural_response_key = "things"
+        mgr.enable_identity_map()
+        body = {"things": [{"id": 1}]}
+        mgr.api.method_get = Mock(return_value=(None, body))
+        thing = mgr._list("/test")[0]
+        flavor = mgr._list("/flavors", obj_class=CloudDatabaseFlavor)[0]
+        self.assertTrue(isinstance(flavor, CloudDatabaseFlavor))
+        self.assertFalse(flavor is thing)
+
+    def test_identity_map_invalidation(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        imap = mgr.enable_identity_map()
+        imap.invalidate = Mock()
+        imap.clear = Mock()
+        mgr.api.method_put = Mock(return_value=(None, None))
+        mgr.api.method_post = Mock(return_value=(None, None))
+        mgr.api.method_delete = Mock(return_value=(None, None))
+        mgr._update("/test/1?x=y", {})
+        imap.invalidate.assert_called_once_with("1")
+        mgr._delete("/test/2")
+        imap.invalidate.assert_called_with("2")
+        item = fakes.FakeEntity()
+        item.id = "4"
+        mgr.action(item, "reboot")
+        imap.invalidate.assert_called_with("4")
+        mgr._create("/test/3/nodes", {}, return_none=True)
+        imap.invalidate.assert_called_with("3")
+        self.assertEqual(imap.invalidate.call_count, 4)
+        mgr._create("/test", {}, return_none=True)
+        self.assertEqual(imap.invalidate.call_count, 4)
+        self.assertFalse(imap.clear.called)
+        mgr._update("/other/1", {})
+        imap.clear.assert_called_once_with()
+
+    def test_no_identity_map(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        mgr.resource_class = resource.BaseResource
+        mgr.response_key = "thing"
+        self.assertIsNone(mgr.identity_map)
+        body = {"thing": {"id": 1}}
+        mgr.api.method_get = Mock(return_value=(None, body))
+        self.assertFalse(mgr.get(1) is mgr.get(1))
+        mgr._forget("/test/1")
+
     def test_find_no_match(self):
         mgr = self.manager
         mgr.findall = Mock(return_value=[])
@@ -263,6 +445,74 @@ class ManagerTest(unittest.TestCase):
         self.assertFalse(o2 in ret)
         self.assertFalse(o3 in ret)
 
+    def test_findall_pushdown(self):
+        mgr = self.manager
+        mgr.filter_params = {"name": "name_filter"}
+        o1 = fakes.FakeEntity()
+        o1.name = "a"
+        o1.size = 1
+        o2 = fakes.FakeEntity()
+        o2.name = "a"
+        o2.size = 2
+        mgr.list = Mock(return_value=[o1, o2])
+        ret = mgr.findall(name="a", size=2)
+        self.assertEqual(ret, [o2])
+        mgr.list.assert_called_once_with(name_filter="a")
+
+    def test_findall_paged(self):
+        mgr = self.manager
+        mgr.page_size = 2
+        objs = [resource.BaseResource(mgr, {"id": num, "kind": num % 2})
+                for num in range(5)]
+        mgr.list = Mock(side_effect=[objs[:2], objs[2:4], objs[4:]])
+        ret = mgr.findall(kind=0)
+        self.assertEqual(ret, [objs[0], objs[2], objs[4]])
+        self.assertEqual(mgr.list.call_count, 3)
+        mgr.list.assert_any_call(limit=2, marker=None, stream=True)
+        mgr.list.assert_any_call(limit=2, marker=1, stream=True)
+        mgr.list.assert_called_with(limit=2, marker=3, stream=True)
+
+    def test_findall_paged_marker_ignored(self):
+        mgr = self.manager
+        mgr.page_size = 2
+        objs = [resource.BaseResource(mgr, {"id": num}) for num in range(2)]
+        mgr.list = Mock(return_value=objs)
+        ret = mgr.findall(id=1)
+        self.assertEqual(ret, [objs[1], objs[1]])
+        self.assertEqual(mgr.list.call_count, 2)
+
+    def test_index(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        objs = [resource.BaseResource(mgr, {"id": num, "kind": num % 2})
+                for num in range(4)]
+        odd = resource.BaseResource(mgr, {"id": 9, "kind": ["x"]})
+        mgr.list = Mock(return_value=objs + [odd])
+        index = mgr.create_index("kind")
+        self.assertEqual(index.lookup(1), [objs[1], objs[3], odd])
+        self.assertIsNone(index.lookup(["x"]))
+        mgr.list.reset_mock()
+        self.assertEqual(mgr.findall(kind=0, id=2), [objs[2]])
+        self.assertEqual(mgr.findall(kind=5), [])
+        self.assertFalse(mgr.list.called)
+        # An unhashable value falls back to the listing.
+        self.assertEqual(mgr.findall(kind=["x"]), [odd])
+        self.assertTrue(mgr.list.called)
+        mgr.create_index("id")
+        mgr.drop_index("kind")
+        self.assertEqual(list(mgr._indexes), ["id"])
+        mgr.drop_index()
+        self.assertIsNone(mgr._indexes)
+
+    def test_index_dropped_on_change(self):
+        mgr = self.manager
+        mgr.uri_base = "test"
+        mgr.list = Mock(return_value=[])
+        mgr.api.method_delete = Mock(return_value=(None, None))
+        mgr.create_index("name")
+        mgr._delete("/test/1")
+        self.assertIsNone(mgr._indexes)
+
     def test_add_hook(self):
         mgr = self.manager
         tfunc = Mock()
@@ -4,6 +4,8 @@ from __future__ import absolute_import, unicode_literals
 
 import json
 import os
+import subprocess
+import sys
 import unittest
 import warnings
 
@@ -418,14 +420,143 @@ class PyraxInitTest(unittest.TestCase):
         self.assertTrue(ret.endswith(test_agent))
         self.assertTrue(ret.startswith(pyrax.USER_AGENT))
 
+    @unittest.skipIf(sys.version_info < (3, 7), "needs module __getattr__")
+    def test_import_is_lazy(self):
+        # Guards import time: importing pyrax must not import novaclient or
+        # any of the service modules.
+        code = ("import sys, pyrax; print(' '.join(sorted(name for name in "
+                "sys.modules if name.startswith('novaclient') or name in "
+                "('pyrax.object_storage', 'pyrax.clouddns', "
+                "'pyrax.cloudmonitoring', 'pyrax.autoscale', 'pyrax.image', "
+                "'pyrax.queueing'))))")
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.strip(), b"")
+
+    def test_lazy_attribute(self):
+        from pyrax.object_storage import StorageClient
+        self.assertIs(pyrax.StorageClient, StorageClient)
+        self.assertTrue("QueueClient" in dir(pyrax))
+        self.assertRaises(AttributeError, getattr, pyrax, "NoSuchClient")
+
+    def test_lazy_exceptions(self):
+        from novaclient import exceptions as nova_exc
+        self.assertIs(exc.ServerNotFound, nova_exc.NotFound)
+        self.assertIs(exc.ServerClientException, nova_exc.ClientException)
+        self.assertRaises(AttributeError, getattr, exc, "NoSuchException")
+
+    def test_client_class_for_service(self):
+        from pyrax.clouddns import CloudDNSClient
+        self.assertIs(pyrax.client_class_for_service("dns"), CloudDNSClient)
+        self.assertIsNone(pyrax.client_class_for_service("nothing"))
+        compute = pyrax.client_class_for_service("compute")
+        self.assertTrue(compute.__module__.startswith("novaclient"))
+
     def test_connect_to_services(self):
         pyrax.connect_to_services()
+        # The clients are only created when first used.
+        self.assertFalse(pyrax.connect_to_cloudservers.called)
+        pyrax.cloudservers.list
+        pyrax.cloudfiles.list_containers
+        pyrax.cloud_loadbalancers.list
+        pyrax.cloud_databases.list
         pyrax.connect_to_cloudservers.assert_called_once_with(region=None)
         pyrax.connect_to_cloudfiles.assert_called_once_with(region=None)
         pyrax.connect_to_cloud_loadbalancers.assert_called_once_with(
                 region=None)
         pyrax.connect_to_cloud_databases.assert_called_once_with(region=None)
 
+    def test_connect_to_services_unavailable(self):
+        def endpoint(context, svc, region=None, public=True):
+            return None if svc == "dns" else "http://example.com/"
+
+        pyrax._get_service_endpoint = Mock(side_effect=endpoint)
+        pyrax.connect_to_services()
+        self.assertIsNone(pyrax.cloud_dns)
+        self.assertIsNotNone(pyrax.cloudfiles)
+        self.assertFalse(pyrax.connect_to_cloudfiles.called)
+
+    def test_client_proxy_caches_client(self):
+        pyrax.identity = self.identity
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        proxy.list_containers()
+        proxy.list_containers()
+        pyrax.connect_to_cloudfiles.assert_called_once_with(region="DFW")
+        client = pyrax.connect_to_cloudfiles.return_value
+        self.assertEqual(client.list_containers.call_count, 2)
+
+    def test_client_proxy_per_identity(self):
+        pyrax.identity = self.identity
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        proxy.list_containers()
+        pyrax.identity = fakes.FakeIdentity()
+        proxy.list_containers()
+        self.assertEqual(pyrax.connect_to_cloudfiles.call_count, 2)
+
+    def test_client_proxy_reauth_same_catalog(self):
+        pyrax.identity = self.identity
+        self.identity.service_catalog = [{"name": "cloudFiles"}]
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        proxy.list_containers()
+        self.identity.auth_generation += 1
+        proxy.list_containers()
+        pyrax.connect_to_cloudfiles.assert_called_once_with(region="DFW")
+
+    def test_client_proxy_reauth_new_catalog(self):
+        pyrax.identity = self.identity
+        self.identity.service_catalog = [{"name": "cloudFiles"}]
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        proxy.list_containers()
+        self.identity.auth_generation += 1
+        self.identity.service_catalog = [{"name": "cloudFilesNew"}]
+        proxy.list_containers()
+        self.assertEqual(pyrax.connect_to_cloudfiles.call_count, 2)
+
+    def test_client_proxy_setattr(self):
+        pyrax.identity = self.identity
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        proxy.retry_policy = "fake"
+        client = pyrax.connect_to_cloudfiles.return_value
+        self.assertEqual(client.retry_policy, "fake")
+
+    def test_client_proxy_isinstance(self):
+        pyrax.identity = self.identity
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        self.assertTrue(isinstance(proxy, pyrax._ClientProxy))
+        # Checking the type doesn't create the client.
+        self.assertFalse(pyrax.connect_to_cloudfiles.called)
+
+    def test_client_proxy_unavailable(self):
+        pyrax.identity = self.identity
+        pyrax.connect_to_cloudfiles.return_value = None
+        proxy = pyrax._ClientProxy("connect_to_cloudfiles", region="DFW")
+        self.assertFalse(proxy)
+        self.assertRaises(exc.ServiceNotAvailable, getattr, proxy,
+                "list_containers")
+        self.assertTrue("connect_to_cloudfiles" in repr(proxy))
+
+    def test_start_token_renewal(self):
+        pyrax.identity = self.identity
+        self.identity.start_token_renewal = Mock()
+        with patch("pyrax.get_setting", return_value="120"):
+            pyrax._start_token_renewal()
+        self.identity.start_token_renewal.assert_called_once_with(margin=120.0)
+
+    def test_start_token_renewal_invalid(self):
+        pyrax.identity = self.identity
+        self.identity.start_token_renewal = Mock()
+        with patch("pyrax.get_setting", return_value="soon"):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                pyrax._start_token_renewal()
+        self.assertFalse(self.identity.start_token_renewal.called)
+        self.assertEqual(len(caught), 1)
+
+    def test_start_token_renewal_not_set(self):
+        pyrax.identity = self.identity
+        self.identity.start_token_renewal = Mock()
+        pyrax._start_token_renewal()
+        self.assertFalse(self.identity.start_token_renewal.called)
+
     @patch('pyrax._cs_client.Client', new=fakes.FakeCSClient)
     def test_connect_to_cloudservers(self):
         pyrax.cloudservers = None
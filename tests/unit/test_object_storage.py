@@ -34,6 +34,7 @@ from pyrax.object_storage import StorageObject
 from pyrax.object_storage import StorageObjectIterator
 from pyrax.object_storage import _validate_file_or_path
 from pyrax.object_storage import _valid_upload_key
+from pyrax.jsonstream import JSONStream
 import pyrax.exceptions as exc
 import pyrax.utils as utils
 
@@ -320,7 +321,8 @@ class ObjectStorageTest(unittest.TestCase):
                 full_listing=full_listing, return_raw=return_raw)
         cont.object_manager.list.assert_called_once_with(marker=marker,
                 limit=limit, prefix=prefix, delimiter=delimiter,
-                end_marker=end_marker, return_raw=return_raw)
+                end_marker=end_marker, return_raw=return_raw, stream=False,
+                fields=None, as_dicts=False, as_columns=False)
 
     def test_cont_list_full(self):
         cont = self.container
@@ -338,6 +340,16 @@ class ObjectStorageTest(unittest.TestCase):
         cont.manager.object_listing_iterator.assert_called_once_with(cont,
                 prefix=prefix)
 
+    def test_cont_list_full_fields(self):
+        cont = self.container
+        prefix = utils.random_unicode()
+        cont.object_manager.list_all = Mock()
+        ret = cont.list(prefix=prefix, full_listing=True, fields="name",
+                as_columns=True)
+        cont.object_manager.list_all.assert_called_once_with(prefix=prefix,
+                fields="name", as_dicts=False, as_columns=True)
+        self.assertTrue(ret is cont.object_manager.list_all.return_value)
+
     def test_cont_list_all(self):
         cont = self.container
         prefix = utils.random_unicode()
@@ -346,6 +358,18 @@ class ObjectStorageTest(unittest.TestCase):
         cont.manager.object_listing_iterator.assert_called_once_with(cont,
                 prefix=prefix)
 
+    def test_cont_list_all_fields(self):
+        cont = self.container
+        prefix = utils.random_unicode()
+        cont.manager.object_listing_iterator = Mock()
+        cont.object_manager.list_all = Mock()
+        ret = cont.list_all(prefix=prefix, fields=["name", "bytes"],
+                as_dicts=True)
+        self.assertFalse(cont.manager.object_listing_iterator.called)
+        cont.object_manager.list_all.assert_called_once_with(prefix=prefix,
+                fields=["name", "bytes"], as_dicts=True, as_columns=False)
+        self.assertTrue(ret is cont.object_manager.list_all.return_value)
+
     def test_cont_list_object_names_full(self):
         cont = self.container
         marker = utils.random_unicode()
@@ -1691,6 +1715,109 @@ class ObjectStorageTest(unittest.TestCase):
                 return_raw=return_raw)
         self.assertEqual(ret, fake_resp_body)
 
+    def test_sobj_mgr_list_stream(self):
+        cont = self.container
+        mgr = cont.object_manager
+        nm = utils.random_unicode()
+        stream = Mock()
+        stream.items.return_value = iter([{"name": nm}])
+        mgr.api.method_get = Mock(return_value=(None, stream))
+        ret = list(mgr.list(limit=3, stream=True))
+        mgr.api.method_get.assert_called_once_with("/%s?limit=3" %
+                mgr.uri_base, stream=True)
+        self.assertEqual(len(ret), 1)
+        self.assertTrue(isinstance(ret[0], StorageObject))
+        self.assertEqual(ret[0].name, nm)
+
+    def test_sobj_mgr_list_stream_fields(self):
+        cont = self.container
+        mgr = cont.object_manager
+        stream = Mock()
+        stream.items.return_value = iter([{"name": "a", "bytes": 1},
+                {"subdir": "b/"}])
+        mgr.api.method_get = Mock(return_value=(None, stream))
+        ret = mgr.list(stream=True, fields=("name", "bytes"))
+        self.assertFalse(mgr.api.method_get.called)
+        self.assertEqual(list(ret), [("a", 1), (None, None)])
+        stream.items.return_value = iter([{"name": "a", "bytes": 1}])
+        ret = mgr.list(stream=True, fields=("name", "bytes"), as_columns=True)
+        self.assertEqual(ret, {"name": ["a"], "bytes": [1]})
+
+    def test_sobj_mgr_list_fields(self):
+        cont = self.container
+        mgr = cont.object_manager
+        body = [{"name": "a", "hash": "x", "bytes": 1},
+                {"name": "b", "hash": "y", "bytes": 2}]
+        mgr.api.method_get = Mock(return_value=(None, body))
+        ret = mgr.list(prefix="p", fields=("name", "bytes"))
+        mgr.api.method_get.assert_called_once_with("/%s?prefix=p" %
+                mgr.uri_base)
+        self.assertEqual(ret, [("a", 1), ("b", 2)])
+        ret = mgr.list(fields=("name", "hash"), as_dicts=True)
+        self.assertEqual(ret, [{"name": "a", "hash": "x"},
+                {"name": "b", "hash": "y"}])
+        ret = mgr.list(fields=("name", "bytes"), as_columns=True)
+        self.assertEqual(ret, {"name": ["a", "b"], "bytes": [1, 2]})
+
+    def test_sobj_mgr_list_all(self):
+        cont = self.container
+        mgr = cont.object_manager
+        pages = [[{"name": "a", "bytes": 1}, {"subdir": "b/"}],
+                [{"name": "c", "bytes": 3}], []]
+        mgr.list = Mock(side_effect=pages)
+        ret = mgr.list_all(prefix="p", fields=("name", "bytes"),
+                as_columns=True)
+        self.assertEqual(ret, {"name": ["a", None, "c"],
+                "bytes": [1, None, 3]})
+        self.assertEqual(mgr.list.call_count, 3)
+        mgr.list.assert_any_call(marker=None, prefix="p", return_raw=True)
+        mgr.list.assert_any_call(marker="b/", prefix="p", return_raw=True)
+        mgr.list.assert_called_with(marker="c", prefix="p", return_raw=True)
+
+    def test_sobj_mgr_list_all_objects(self):
+        cont = self.container
+        mgr = cont.object_manager
+        mgr.list = Mock(side_effect=[[{"name": "a"}], []])
+        ret = mgr.list_all()
+        self.assertEqual(len(ret), 1)
+        self.assertTrue(isinstance(ret[0], StorageObject))
+        self.assertEqual(ret[0].name, "a")
+
+    def test_sobj_mgr_findall(self):
+        cont = self.container
+        mgr = cont.object_manager
+        mgr.page_size = 2
+        objs = [StorageObject(mgr, {"name": nm})
+                for nm in ("a", "a.txt", "a/b")]
+        mgr.list = Mock(side_effect=[objs[:2], objs[2:]])
+        ret = mgr.findall(name="a")
+        self.assertEqual(ret, [objs[0]])
+        mgr.list.assert_any_call(marker=None, limit=2, prefix="a",
+                stream=True)
+        mgr.list.assert_called_with(marker="a.txt", limit=2, prefix="a",
+                stream=True)
+
+    def test_cont_mgr_findall(self):
+        clt = self.client
+        mgr = clt._manager
+        mgr.page_size = 2
+        pages = [b'[{"name": "a"}, {"name": "ab"}]', b'[{"name": "ac"}]']
+        streams = []
+        for page in pages:
+            resp = Mock(encoding="utf-8")
+            resp.iter_content.return_value = [page]
+            streams.append((resp, JSONStream(resp)))
+        mgr.api.method_get = Mock(side_effect=streams)
+        ret = mgr.findall(name="ac")
+        self.assertEqual([cont.name for cont in ret], ["ac"])
+        calls = mgr.api.method_get.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0][1], {"stream": True})
+        uris = [call[0][0] for call in calls]
+        self.assertFalse("marker=" in uris[0])
+        self.assertTrue("marker=ab" in uris[1])
+        self.assertTrue("prefix=ac" in uris[1])
+
     def test_sobj_mgr_list_obj(self):
         cont = self.container
         mgr = cont.object_manager
@@ -2351,6 +2478,13 @@ class ObjectStorageTest(unittest.TestCase):
         clt._configure_cdn()
         self.assertEqual(clt.cdn_management_url, fake_ep.public_url)
 
+    def test_clt_path_template(self):
+        clt = self.client
+        self.assertEqual(clt._path_template("/cont/dir/obj.jpg"),
+                "/{container}/{object}")
+        self.assertEqual(clt._path_template("/cont"), "/{container}")
+        self.assertEqual(clt._path_template(""), "/")
+
     def test_clt_backwards_aliases(self):
         clt = self.client
         self.assertEqual(clt.list_containers, clt.list_container_names)
@@ -102,7 +102,33 @@ class QueuesTest(unittest.TestCase):
         ret = mgr.list(uri)
         self.assertEqual(ret, [])
 
-    def test_queue_get_message(self):
+    def test_base_list_stream_empty(self):
+        clt = self.client
+        mgr = clt._manager
+        resp = Mock(encoding="utf-8", status_code=204)
+        resp.iter_content.return_value = []
+        mgr.api.method_get = Mock(return_value=(resp,
+                pyrax.jsonstream.JSONStream(resp)))
+        self.assertEqual(list(mgr.list(stream=True)), [])
+
+    def test_queue_mgr_findall(self):
+        clt = self.client
+        mgr = QueueManager(clt, resource_class=Queue, response_key="queue",
+                plural_response_key="queues", uri_base="queues")
+        mgr.page_size = 1
+        resp = Mock(encoding="utf-8")
+        resp.iter_content.return_value = [b'{"queues": [{"name": "a"}]}']
+        empty = Mock(encoding="utf-8", status_code=204)
+        empty.iter_content.return_value = []
+        mgr.api.method_get = Mock(side_effect=[
+                (resp, pyrax.jsonstream.JSONStream(resp)),
+                (empty, pyrax.jsonstream.JSONStream(empty))])
+        ret = mgr.findall(name="a")
+        self.assertEqual([queue.name for queue in ret], ["a"])
+        mgr.api.method_get.assert_called_with("/queues?limit=1&marker=a",
+                stream=True)
+
+
         q = self.queue
         q._message_manager.get = Mock()
         msgid = utils.random_unicode()
@@ -763,6 +789,15 @@ class QueuesTest(unittest.TestCase):
         clt.release_claim(q, claim)
         q.release_claim.assert_called_once_with(claim)
 
+    def test_clt_path_template(self):
+        clt = self.client
+        self.assertEqual(clt._path_template("/queues/myqueue/messages"),
+                "/queues/{name}/messages")
+        self.assertEqual(clt._path_template(
+                "/queues/myqueue/claims/51db6f78c508f17ddc924357"),
+                "/queues/{name}/claims/{id}")
+        self.assertEqual(clt._path_template("/queues"), "/queues")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import unittest
+
+from mock import patch
+
+import pyrax.exceptions as exc
+from pyrax import ratelimit
+from pyrax.ratelimit import RateLimiter
+from pyrax.ratelimit import TokenBucket
+
+fake_limits = {"limits": {
+        "rate": [{
+            "uri": "*/domains*",
+            "regex": "^/v\\d+\\.\\d+/(\\d+|\\D+)/domains.*",
+            "limit": [
+                {"verb": "GET", "value": 5, "remaining": 5,
+                    "unit": "SECOND"},
+                {"verb": "POST", "value": 120, "remaining": 2,
+                    "unit": "MINUTE"},
+                ]}, {
+            "uri": "*/status*",
+            "regex": "^/v\\d+\\.\\d+/(\\d+|\\D+)/status.*",
+            "limit": [
+                {"verb": "GET", "value": 5, "unit": "SECOND"},
+                ]}],
+        "absolute": {"domains": 500}}}
+
+DOMAINS_URI = "https://dns.example.com/v1.0/12345/domains"
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.now += secs
+
+
+class RateLimitTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(RateLimitTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.patches = [patch.object(ratelimit, "_now", self.clock),
+                patch("time.sleep", self.clock.sleep)]
+        for ptch in self.patches:
+            ptch.start()
+
+    def tearDown(self):
+        for ptch in self.patches:
+            ptch.stop()
+
+    def test_bucket(self):
+        bkt = TokenBucket(rate=2, capacity=2)
+        self.assertEqual(bkt.wait_time(), 0)
+        bkt.take()
+        bkt.take()
+        self.assertEqual(bkt.wait_time(), 0.5)
+        self.clock.sleep(0.5)
+        self.assertEqual(bkt.wait_time(), 0)
+        self.clock.sleep(100)
+        bkt.wait_time()
+        self.assertEqual(bkt.tokens, 2)
+
+    def test_load_limits(self):
+        lim = RateLimiter(fake_limits, fraction=1.0)
+        self.assertEqual(len(lim._buckets), 3)
+        get_bkts = lim._matching("GET", DOMAINS_URI)
+        self.assertEqual(len(get_bkts), 1)
+        self.assertEqual(get_bkts[0].rate, 5)
+        post_bkts = lim._matching("POST", DOMAINS_URI)
+        self.assertEqual(post_bkts[0].tokens, 2)
+        self.assertEqual(lim._matching("DELETE", DOMAINS_URI), [])
+
+    def test_load_rate_list(self):
+        lim = RateLimiter(fake_limits["limits"]["rate"])
+        self.assertEqual(len(lim._buckets), 3)
+
+    def test_load_dns_rate_limits(self):
+        # The format returned by CloudDNSClient.get_rate_limits()
+        dns_limits = [{"uri": rl["uri"], "limits": rl["limit"]}
+                for rl in fake_limits["limits"]["rate"]]
+        lim = RateLimiter(dns_limits, fraction=1.0)
+        self.assertEqual(len(lim._buckets), 3)
+        self.assertEqual(len(lim._matching("GET", DOMAINS_URI)), 1)
+        self.assertEqual(len(lim._matching("GET",
+                "https://dns.example.com/v1.0/12345/status/1")), 1)
+        self.assertEqual(lim._matching("GET",
+                "https://dns.example.com/v1.0/12345/limits"), [])
+
+    def test_load_invalid_limits(self):
+        self.assertRaises(exc.InvalidRateLimits, RateLimiter,
+                [{"uri": "*", "regex": ".*"}])
+        self.assertRaises(exc.InvalidRateLimits, RateLimiter,
+                [{"regex": ".*", "limit": [{"verb": "GET"}]}])
+        self.assertRaises(exc.InvalidRateLimits, RateLimiter,
+                [{"regex": ".*", "limit": [{"verb": "GET", "value": 1,
+                "unit": "FORTNIGHT"}]}])
+        self.assertRaises(exc.InvalidRateLimits, RateLimiter, ["bogus"])
+        self.assertRaises(exc.InvalidRateLimits, RateLimiter,
+                {"limits": "bogus"})
+
+    def test_zero_limit(self):
+        lim = RateLimiter()
+        lim.add_limit("GET", ".*", 0)
+        self.assertRaises(exc.RateLimitExceeded, lim.acquire, "GET",
+                DOMAINS_URI, block=True)
+        self.assertEqual(self.clock.now, 1000.0)
+
+    def test_min_sleep(self):
+        lim = RateLimiter()
+        lim.add_limit("GET", ".*", 1000000, unit="SECOND")
+        bkt = lim._matching("GET", DOMAINS_URI)[0]
+        bkt.tokens = 1 - 1e-7
+        waited = lim.acquire("GET", DOMAINS_URI)
+        self.assertEqual(waited, ratelimit.MIN_SLEEP)
+
+    def test_load_no_rate_limits(self):
+        lim = RateLimiter({"limits": {"absolute": {}}})
+        self.assertEqual(lim._buckets, [])
+        self.assertEqual(lim.acquire("GET", DOMAINS_URI), 0)
+
+    def test_fraction(self):
+        lim = RateLimiter(fake_limits, fraction=0.5)
+        bkt = lim._matching("POST", DOMAINS_URI)[0]
+        self.assertEqual(bkt.capacity, 60)
+        self.assertEqual(bkt.rate, 1)
+        self.assertEqual(bkt.tokens, 1)
+
+    def test_acquire_blocking(self):
+        lim = RateLimiter(fake_limits, fraction=1.0)
+        waits = [lim.acquire("GET", DOMAINS_URI) for i in range(7)]
+        self.assertEqual(waits[:5], [0] * 5)
+        self.assertAlmostEqual(waits[5], 0.2)
+        self.assertAlmostEqual(waits[6], 0.2)
+        self.assertAlmostEqual(self.clock.now, 1000.4)
+
+    def test_acquire_fail_fast(self):
+        lim = RateLimiter(fake_limits, block=False, fraction=1.0)
+        lim.acquire("POST", DOMAINS_URI)
+        lim.acquire("POST", DOMAINS_URI)
+        self.assertRaises(exc.RateLimitExceeded, lim.acquire, "POST",
+                DOMAINS_URI)
+        # Blocking can be chosen per call.
+        self.assertAlmostEqual(lim.acquire("POST", DOMAINS_URI, block=True),
+                0.5)
+
+    def test_acquire_timeout(self):
+        lim = RateLimiter(fake_limits, fraction=1.0, timeout=0.1)
+        for i in range(5):
+            lim.acquire("GET", DOMAINS_URI)
+        self.assertRaises(exc.RateLimitExceeded, lim.acquire, "GET",
+                DOMAINS_URI)
+
+    def test_add_limit(self):
+        lim = RateLimiter()
+        lim.add_limit("get", "/things", 60)
+        self.assertEqual(len(lim._matching("GET", "http://x/v1/things/1")), 1)
+
+    def test_threads(self):
+        lim = RateLimiter(fake_limits, block=False, fraction=1.0)
+        results = []
+
+        def worker():
+            try:
+                lim.acquire("GET", DOMAINS_URI)
+                results.append(True)
+            except exc.RateLimitExceeded:
+                results.append(False)
+
+        threads = [threading.Thread(target=worker) for i in range(20)]
+        for thd in threads:
+            thd.start()
+        for thd in threads:
+            thd.join()
+        self.assertEqual(results.count(True), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -153,5 +153,116 @@ class ResourceTest(unittest.TestCase):
         self.assertNotEqual(orig_loaded, rsc.loaded)
 
 
+
+class CompactResource(resource.BaseResource):
+    COMPACT = True
+    HUMAN_ID = True
+    name = resource.LazyDetail("name")
+    status = resource.LazyDetail("status", "UNKNOWN")
+    flavor = None
+
+
+class CompactResourceTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(CompactResourceTest, self).__init__(*args, **kwargs)
+
+    def _create_dummy_resource(self, **kwargs):
+        mgr = fakes.FakeManager()
+        info = {"name": "test_resource",
+                "size": 42,
+                "flavor": "small",
+                "id": utils.random_unicode()}
+        info.update(kwargs)
+        return CompactResource(mgr, info)
+
+    def setUp(self):
+        self.resource = self._create_dummy_resource()
+
+    def tearDown(self):
+        self.resource = None
+
+    def test_details_not_copied(self):
+        rsc = self.resource
+        atts = vars(rsc)
+        self.assertFalse("name" in atts)
+        self.assertFalse("size" in atts)
+        self.assertFalse("id" in atts)
+        self.assertEqual(rsc.size, 42)
+        self.assertEqual(rsc.name, "test_resource")
+        self.assertEqual(vars(rsc)["size"], 42)
+        self.assertEqual(vars(rsc)["name"], "test_resource")
+
+    def test_hidden_details_copied(self):
+        rsc = self.resource
+        self.assertEqual(vars(rsc)["flavor"], "small")
+        self.assertEqual(rsc.flavor, "small")
+        self.assertIsNone(CompactResource.flavor)
+
+    def test_lazy_detail_default(self):
+        rsc = self.resource
+        self.assertEqual(rsc.status, "UNKNOWN")
+        self.assertFalse("status" in vars(rsc))
+        rsc = self._create_dummy_resource(status="ACTIVE")
+        self.assertEqual(rsc.status, "ACTIVE")
+
+    def test_lazy_detail_class(self):
+        self.assertTrue(isinstance(CompactResource.name, resource.LazyDetail))
+
+    def test_getattr_loads(self):
+        rsc = self.resource
+        fake = self._create_dummy_resource(size=43, disk=10)
+        rsc.manager.get = Mock(return_value=fake)
+        self.assertEqual(rsc.disk, 10)
+        self.assertEqual(rsc.size, 43)
+        self.assertEqual(rsc.manager.get.call_count, 1)
+        self.assertRaises(AttributeError, getattr, rsc, "xname")
+
+    def test_getattr_missing(self):
+        rsc = self.resource
+        rsc.get = Mock()
+        rsc.loaded = False
+        self.assertRaises(AttributeError, rsc.__getattr__, "xname")
+        rsc.get.assert_called_once_with()
+
+    def test_bytes_key(self):
+        rsc = self._create_dummy_resource(**{str("plain"): 1})
+        rsc._add_details({b"raw": 2})
+        self.assertEqual(rsc.plain, 1)
+        self.assertEqual(rsc.raw, 2)
+        self.assertTrue("raw=2" in repr(rsc))
+
+    def test_reload(self):
+        rsc = self.resource
+        self.assertEqual(rsc.size, 42)
+        self.assertEqual(rsc.name, "test_resource")
+        fake = self._create_dummy_resource(name="new", size=43, flavor="big",
+                status="OK")
+        rsc.manager.get = Mock(return_value=fake)
+        rsc.reload()
+        self.assertEqual(rsc.size, 43)
+        self.assertEqual(rsc.name, "new")
+        self.assertEqual(rsc.flavor, "big")
+        self.assertEqual(rsc.status, "OK")
+        self.assertEqual(rsc._info["size"], 43)
+        self.assertEqual(fake._info["size"], 43)
+
+    def test_repr(self):
+        rsc = self.resource
+        ret = repr(rsc)
+        self.assertTrue("name=test_resource" in ret)
+        self.assertTrue("size=42" in ret)
+        self.assertTrue("flavor=small" in ret)
+
+    def test_human_id(self):
+        self.assertEqual(self.resource.human_id, "test_resource")
+
+    def test_id_eq(self):
+        rsc = self.resource
+        fake = self._create_dummy_resource(id=rsc.id)
+        self.assertEqual(fake, rsc)
+        other = self._create_dummy_resource()
+        self.assertNotEqual(other, rsc)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import email.utils
+import time
+import unittest
+import warnings
+
+import requests
+import six
+
+from mock import patch
+
+import pyrax
+import pyrax.exceptions as exc
+from pyrax.retry import RetryPolicy
+from pyrax.retry import body_rewinder
+from pyrax.retry import get_default_policy
+
+
+class RetryTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(RetryTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=3, backoff=1, max_backoff=10,
+                jitter=False)
+
+    def tearDown(self):
+        pass
+
+    def test_throttle_retried_for_any_method(self):
+        err = exc.TooManyRequests(429)
+        for mthd in ("GET", "POST", "PATCH"):
+            self.assertTrue(self.policy.should_retry(mthd, 0, err))
+
+    def test_server_error_idempotent_only(self):
+        err = exc.ClientException(502)
+        self.assertTrue(self.policy.should_retry("GET", 0, err))
+        self.assertTrue(self.policy.should_retry("put", 0, err))
+        self.assertFalse(self.policy.should_retry("POST", 0, err))
+
+    def test_not_retryable_status(self):
+        err = exc.NotFound(404)
+        self.assertFalse(self.policy.should_retry("GET", 0, err))
+
+    def test_413_needs_retry_after(self):
+        err = exc.OverLimit(413)
+        self.assertFalse(self.policy.should_retry("PUT", 0, err))
+        err = exc.OverLimit(413, retry_after="2")
+        self.assertTrue(self.policy.should_retry("PUT", 0, err))
+
+    def test_max_retries(self):
+        err = exc.HTTPServiceUnavailable(503)
+        self.assertTrue(self.policy.should_retry("GET", 2, err))
+        self.assertFalse(self.policy.should_retry("GET", 3, err))
+
+    def test_retry_after_too_long(self):
+        err = exc.HTTPServiceUnavailable(503, retry_after="3600")
+        self.assertFalse(self.policy.should_retry("GET", 0, err))
+
+    def test_connection_errors(self):
+        err = requests.exceptions.ConnectionError()
+        self.assertTrue(self.policy.should_retry("GET", 0, err))
+        self.assertFalse(self.policy.should_retry("POST", 0, err))
+        err = requests.exceptions.ConnectTimeout()
+        self.assertTrue(self.policy.should_retry("POST", 0, err))
+        self.assertFalse(self.policy.should_retry("GET", 0, ValueError()))
+
+    def test_get_delay_backoff(self):
+        self.assertEqual(self.policy.get_delay(0), 1)
+        self.assertEqual(self.policy.get_delay(2), 4)
+        self.assertEqual(self.policy.get_delay(8), 10)
+
+    def test_get_delay_jitter(self):
+        self.policy.jitter = True
+        for attempt in range(6):
+            delay = self.policy.get_delay(attempt)
+            self.assertTrue(0 <= delay <= min(10, 2 ** attempt))
+
+    def test_get_delay_retry_after_seconds(self):
+        err = exc.TooManyRequests(429, retry_after="3")
+        self.assertEqual(self.policy.get_delay(0, err), 3.0)
+
+    def test_get_delay_retry_after_date(self):
+        when = email.utils.formatdate(time.time() + 5, usegmt=True)
+        err = exc.TooManyRequests(429, retry_after=when)
+        delay = self.policy.get_delay(0, err)
+        self.assertTrue(3 <= delay <= 5)
+
+    def test_get_delay_retry_after_garbage(self):
+        err = exc.TooManyRequests(429, retry_after="soon")
+        self.assertEqual(self.policy.get_delay(1, err), 2)
+
+    def test_default_policy_disabled(self):
+        with patch.object(pyrax, "get_setting", return_value=None):
+            self.assertIsNone(get_default_policy())
+
+    def test_default_policy(self):
+        vals = {"max_retries": "4", "retry_backoff": "0.25"}
+        with patch.object(pyrax, "get_setting", side_effect=vals.get):
+            policy = get_default_policy()
+        self.assertEqual(policy.max_retries, 4)
+        self.assertEqual(policy.backoff, 0.25)
+
+    def test_default_policy_cached(self):
+        vals = {"max_retries": "3", "retry_backoff": None}
+        with patch.object(pyrax, "get_setting", side_effect=vals.get):
+            policy = get_default_policy()
+            self.assertTrue(get_default_policy() is policy)
+            vals["max_retries"] = "5"
+            changed = get_default_policy()
+        self.assertEqual(changed.max_retries, 5)
+
+    def test_default_policy_invalid(self):
+        vals = {"max_retries": "lots", "retry_backoff": None}
+        with patch.object(pyrax, "get_setting", side_effect=vals.get):
+            with patch.object(pyrax, "_logger") as mock_log:
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always")
+                    self.assertIsNone(get_default_policy())
+                    self.assertIsNone(get_default_policy())
+        self.assertEqual(len(caught), 1)
+        self.assertEqual(mock_log.warning.call_count, 1)
+
+    def test_body_rewinder(self):
+        self.assertIsNotNone(body_rewinder(None))
+        self.assertIsNotNone(body_rewinder(b"abc"))
+        self.assertIsNotNone(body_rewinder("abc"))
+        self.assertIsNone(body_rewinder(iter([b"abc"])))
+        data = six.BytesIO(b"abc")
+        data.seek(1)
+        rewind = body_rewinder(data)
+        data.read()
+        rewind()
+        self.assertEqual(data.read(), b"bc")
+
+
+if __name__ == "__main__":
+    unittest.main()
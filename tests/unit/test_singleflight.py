@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+import unittest
+
+from pyrax.singleflight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(SingleFlightTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.flights = SingleFlight(copy_result=list)
+        self.release = threading.Event()
+        self.calls = 0
+
+    def tearDown(self):
+        self.release.set()
+
+    def slow_call(self, result=None, error=None):
+        self.calls += 1
+        self.release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    def run_threads(self, num, *args):
+        results = []
+        errors = []
+
+        def target():
+            try:
+                results.append(self.flights.do("key", self.slow_call, *args))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=target) for i in range(num)]
+        for thread in threads:
+            thread.start()
+        # Wait for all but the leader to be waiting.
+        for i in range(500):
+            if self.flights.shared == num - 1:
+                break
+            time.sleep(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+
+    def test_coalesced(self):
+        result = [1, 2]
+        results, errors = self.run_threads(5, result)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [result] * 5)
+        # Only the leader gets the original; the waiters get copies.
+        self.assertEqual(len([ret for ret in results if ret is result]), 1)
+        self.assertEqual(len(self.flights), 0)
+
+    def test_error_propagated(self):
+        err = ValueError("nope")
+        results, errors = self.run_threads(4, None, err)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+        # The waiters each raise their own copy, caused by the original.
+        self.assertEqual(len([e for e in errors if e is err]), 1)
+        for e in errors:
+            self.assertTrue(isinstance(e, ValueError))
+            self.assertEqual(e.args, err.args)
+            if e is not err:
+                self.assertTrue(e.__cause__ is err)
+        self.assertEqual(len(self.flights), 0)
+        self.assertEqual(self.flights.shared, 3)
+        self.flights.reset_stats()
+        self.assertEqual(self.flights.shared, 0)
+
+    def test_sequential_not_coalesced(self):
+        self.release.set()
+        self.flights.do("key", self.slow_call, 1)
+        self.flights.do("key", self.slow_call, 2)
+        self.assertEqual(self.calls, 2)
+
+    def test_none_result(self):
+        self.release.set()
+        self.assertIsNone(self.flights.do("key", self.slow_call))
+
+
+if __name__ == "__main__":
+    unittest.main()
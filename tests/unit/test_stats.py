@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from mock import patch
+
+import pyrax.stats as stats
+from pyrax.stats import ClientStats
+from pyrax.stats import LatencyHistogram
+from pyrax.stats import path_template
+
+
+class StatsTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(StatsTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.stats = ClientStats()
+
+    def tearDown(self):
+        pass
+
+    def test_path_template(self):
+        self.assertEqual(path_template("/servers/1234/action"),
+                "/servers/{id}/action")
+        self.assertEqual(path_template(
+                "/domains/abc-12/records/8f14e45f-ceea-467a"),
+                "/domains/{id}/records/{id}")
+        self.assertEqual(path_template("/os-keypairs/"), "/os-keypairs/")
+        self.assertEqual(path_template(""), "")
+
+    def test_path_template_members(self):
+        members = {"queues": "{name}"}
+        self.assertEqual(path_template("/queues/myqueue/messages", members),
+                "/queues/{name}/messages")
+        self.assertEqual(path_template("/queues/queues/claims", members),
+                "/queues/{name}/claims")
+        self.assertEqual(path_template("/queues", members), "/queues")
+        self.assertEqual(path_template("/queues/", members), "/queues/")
+
+    def test_histogram_empty(self):
+        hist = LatencyHistogram()
+        summary = hist.summary()
+        self.assertEqual(summary["count"], 0)
+        self.assertIsNone(summary["mean"])
+        self.assertIsNone(summary["p99"])
+
+    def test_histogram_percentiles(self):
+        hist = LatencyHistogram()
+        for num in range(1, 101):
+            hist.record(num / 1000.0)
+        self.assertEqual(hist.count, 100)
+        self.assertEqual(hist.min, 0.001)
+        self.assertEqual(hist.max, 0.1)
+        for pct in (50, 95, 99):
+            val = hist.percentile(pct)
+            exact = pct / 1000.0
+            self.assertTrue(exact <= val <= exact * stats.BUCKET_GROWTH,
+                    (pct, val))
+        self.assertEqual(hist.percentile(100), 0.1)
+
+    def test_histogram_extremes(self):
+        hist = LatencyHistogram()
+        hist.record(0)
+        hist.record(1e9)
+        self.assertEqual(hist.counts[0], 1)
+        self.assertEqual(hist.counts[-1], 1)
+        self.assertEqual(len(hist.counts), stats.NUM_BUCKETS)
+
+    def test_record(self):
+        self.stats.record("GET", "/servers/{id}", 0.5, 200, bytes_in=10,
+                bytes_out=3)
+        self.stats.record("GET", "/servers/{id}", 0.25, 404, bytes_in=5)
+        self.stats.record_retry("GET", "/servers/{id}")
+        self.stats.record("POST", "/servers", 1, "ConnectionError")
+        snap = self.stats.snapshot()
+        self.assertEqual(snap["calls"], 3)
+        self.assertEqual(snap["bytes_in"], 15)
+        self.assertEqual(snap["bytes_out"], 3)
+        self.assertEqual(snap["retries"], 1)
+        ep = snap["endpoints"]["GET /servers/{id}"]
+        self.assertEqual(ep["statuses"], {200: 1, 404: 1})
+        self.assertEqual(ep["latency"]["count"], 2)
+        self.assertEqual(ep["latency"]["mean"], 0.375)
+        self.assertEqual(snap["endpoints"]["POST /servers"]["statuses"],
+                {"ConnectionError": 1})
+
+    def test_reset(self):
+        self.stats.record("GET", "/servers", 0.5, 200)
+        self.stats.reset()
+        self.assertEqual(self.stats.snapshot()["endpoints"], {})
+
+    def test_max_endpoints(self):
+        with patch.object(stats, "MAX_ENDPOINTS", 2):
+            for num in range(5):
+                self.stats.record("GET", "/%s" % num, 0.1, 200)
+        endpoints = self.stats.snapshot()["endpoints"]
+        self.assertEqual(sorted(endpoints), ["GET /0", "GET /1",
+                "GET {other}"])
+        self.assertEqual(endpoints["GET {other}"]["latency"]["count"], 3)
+
+    def test_global_stats(self):
+        stats.global_stats.record("GET", "/x", 0.1, 200)
+        self.assertTrue("GET /x" in stats.get_stats()["endpoints"])
+        stats.reset_stats()
+        self.assertEqual(stats.get_stats()["calls"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from mock import patch
+
+import pyrax.tokencache as tokencache
+from pyrax.tokencache import TokenCache
+
+
+class TokenCacheTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TokenCacheTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmpdir, "tokens")
+        self.cache = TokenCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache_key(self):
+        creds = {"auth": {"passwordCredentials": {"username": "me",
+                "password": "secret"}}}
+        key = tokencache.cache_key("http://example.com", creds)
+        self.assertEqual(key, tokencache.cache_key("http://example.com",
+                creds))
+        self.assertFalse("secret" in key)
+        other = {"auth": {"passwordCredentials": {"username": "me",
+                "password": "changed"}}}
+        self.assertNotEqual(key, tokencache.cache_key("http://example.com",
+                other))
+        self.assertNotEqual(key, tokencache.cache_key("http://example.org",
+                creds))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_put_get(self):
+        body = {"access": {"token": {"id": "abc"}}}
+        self.cache.put("key", body)
+        self.assertEqual(self.cache.get("key"), body)
+
+    def test_put_replaces(self):
+        self.cache.put("key", {"a": 1})
+        self.cache.put("key", {"a": 2})
+        self.assertEqual(self.cache.get("key"), {"a": 2})
+        leftovers = [nm for nm in os.listdir(self.directory)
+                if nm.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    @unittest.skipIf(os.name != "posix", "POSIX permissions only")
+    def test_permissions(self):
+        self.cache.put("key", {"a": 1})
+        dir_mode = stat.S_IMODE(os.stat(self.directory).st_mode)
+        file_mode = stat.S_IMODE(os.stat(self.cache._path("key")).st_mode)
+        self.assertEqual(dir_mode & 0o077, 0)
+        self.assertEqual(file_mode & 0o077, 0)
+
+    @unittest.skipIf(os.name != "posix", "POSIX permissions only")
+    def test_permissions_existing_directory(self):
+        os.mkdir(self.directory)
+        os.chmod(self.directory, 0o755)
+        self.cache.put("key", {"a": 1})
+        dir_mode = stat.S_IMODE(os.stat(self.directory).st_mode)
+        self.assertEqual(dir_mode, 0o700)
+        self.assertEqual(self.cache.get("key"), {"a": 1})
+
+    @unittest.skipIf(os.name != "posix", "POSIX permissions only")
+    def test_directory_of_other_user(self):
+        os.mkdir(self.directory)
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            self.cache.put("key", {"a": 1})
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_get_corrupt(self):
+        self.cache.put("key", {"a": 1})
+        with open(self.cache._path("key"), "w") as cache_file:
+            cache_file.write("{not json")
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_put_unserializable(self):
+        self.cache.put("key", {"a": object()})
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_delete(self):
+        self.cache.put("key", {"a": 1})
+        self.cache.delete("key")
+        self.assertIsNone(self.cache.get("key"))
+        # Deleting a missing entry is not an error.
+        self.cache.delete("key")
+
+    def test_get_cache(self):
+        cache = tokencache.get_cache(self.directory)
+        self.assertIs(cache, tokencache.get_cache(self.directory))
+        self.assertEqual(cache.directory, self.directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
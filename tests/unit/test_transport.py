@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import io
+import json
+import socket
+import threading
+import time
+import unittest
+import zlib
+
+from mock import patch
+from mock import MagicMock as Mock
+import requests
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+import pyrax
+import pyrax.exceptions as exc
+import pyrax.http
+import pyrax.transport as transport
+from pyrax.jsonstream import JSONStream
+
+# Some other tests replace pyrax.http.request with a mock.
+http_request = pyrax.http.request
+
+try:
+    transport._import_httpx()
+    HAS_HTTPX = True
+except exc.HttpxModuleNotInstalled:
+    HAS_HTTPX = False
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers the calls made by the conformance tests."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunk = self.rfile.read(size)
+                self.rfile.readline()
+                if not size:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status, obj, headers=None):
+        headers = dict(headers or {}, **{"Content-Type": "application/json"})
+        self._send(status, json.dumps(obj).encode("utf-8"), headers)
+
+    def _handle(self):
+        body = self._read_body()
+        path = self.path.split("?")[0]
+        if path == "/json":
+            self._send_json(200, {"method": self.command,
+                    "query": self.path.partition("?")[2],
+                    "agent": self.headers.get("User-Agent"),
+                    "custom": self.headers.get("X-Custom")})
+        elif path == "/echo":
+            self._send_json(201, {"method": self.command,
+                    "body": body.decode("utf-8"),
+                    "content_type": self.headers.get("Content-Type")})
+        elif path == "/empty":
+            self._send(204)
+        elif path == "/missing":
+            self._send_json(404, {"itemNotFound": {"message": "Not here",
+                    "code": 404}})
+        elif path == "/gzip":
+            compressor = zlib.compressobj(6, zlib.DEFLATED,
+                    16 + zlib.MAX_WBITS)
+            raw = json.dumps({"compressed": True,
+                    "padding": "x" * 1000}).encode("utf-8")
+            self._send(200, compressor.compress(raw) + compressor.flush(),
+                    {"Content-Type": "application/json",
+                    "Content-Encoding": "gzip"})
+        elif path == "/listing":
+            self._send_json(200, {"items": [{"id": num}
+                    for num in range(500)]})
+        elif path == "/loop":
+            self._send(302, headers={"Location": "/loop"})
+        elif path == "/baddecode":
+            self._send(200, b"not gzipped", {"Content-Encoding": "gzip"})
+        elif path == "/slow":
+            time.sleep(0.5)
+            self._send_json(200, {})
+        else:
+            self._send(400)
+
+    do_GET = do_HEAD = do_PUT = do_POST = do_PATCH = do_DELETE = _handle
+
+
+
+class StandInServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+
+class TransportConformance(object):
+    """
+    The behavior expected of every transport, run against the same local
+    stand-in server. Subclasses set 'transport_name'.
+    """
+    transport_name = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInServer(("127.0.0.1", 0), StandInHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever)
+        cls.server_thread.daemon = True
+        cls.server_thread.start()
+        cls.base = "http://127.0.0.1:%s" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.transport = transport.create_transport(self.transport_name,
+                pool_maxsize=4)
+
+    def tearDown(self):
+        self.transport.close()
+
+    def call(self, method, path, **kwargs):
+        kwargs.setdefault("headers", {})
+        return http_request(method, self.base + path,
+                session=self.transport, **kwargs)
+
+    def test_get_json(self):
+        resp, body = self.call("GET", "/json?limit=5",
+                headers={"X-Custom": "abc", "User-Agent": "pyrax-test"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers.get("content-type"),
+                "application/json")
+        self.assertEqual(body, {"method": "GET", "query": "limit=5",
+                "agent": "pyrax-test", "custom": "abc"})
+
+    def test_head(self):
+        resp, body = self.call("HEAD", "/json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(body)
+
+    def test_none_headers_not_sent(self):
+        resp, body = self.call("GET", "/json", headers={"X-Custom": None})
+        self.assertIsNone(body["custom"])
+
+    def test_post_body(self):
+        resp, body = self.call("POST", "/echo", body={"name": "test"})
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(json.loads(body["body"]), {"name": "test"})
+        self.assertEqual(body["content_type"], "application/json")
+        self.assertEqual(json.loads(resp.request.body), {"name": "test"})
+
+    def test_put_data(self):
+        resp, body = self.call("PUT", "/echo", data=b"raw bytes",
+                headers={"Content-Type": "text/plain"})
+        self.assertEqual(body["body"], "raw bytes")
+        self.assertEqual(body["content_type"], "text/plain")
+
+    def test_put_generator(self):
+        chunks = (chunk for chunk in [b"abc", b"def"])
+        resp, body = self.call("PUT", "/echo", data=chunks)
+        self.assertEqual(body["body"], "abcdef")
+
+    def test_put_file(self):
+        resp, body = self.call("PUT", "/echo", data=io.BytesIO(b"x" * 1000))
+        self.assertEqual(body["body"], "x" * 1000)
+
+    def test_delete_empty(self):
+        resp, body = self.call("DELETE", "/empty")
+        self.assertEqual(resp.status_code, 204)
+        self.assertFalse(body)
+
+    def test_error_status(self):
+        try:
+            self.call("GET", "/missing")
+        except exc.NotFound as e:
+            self.assertEqual(e.message, "Not here")
+        else:
+            self.fail("NotFound not raised")
+
+    def test_error_not_raised(self):
+        resp, body = self.call("GET", "/missing", raise_exception=False)
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.reason, "Not Found")
+
+    def test_gzip(self):
+        resp, body = self.call("GET", "/gzip")
+        self.assertEqual(body["compressed"], True)
+        self.assertTrue(pyrax.http.response_bytes_saved(resp) > 0)
+
+    def test_raw_content(self):
+        resp, body = self.call("GET", "/json", raw_content=True)
+        self.assertEqual(json.loads(body.decode("utf-8"))["method"], "GET")
+
+    def test_stream(self):
+        resp, body = self.call("GET", "/listing", stream=True)
+        self.assertTrue(isinstance(body, JSONStream))
+        items = list(body.items("items"))
+        self.assertEqual(len(items), 500)
+        self.assertEqual(items[-1], {"id": 499})
+
+    def test_timeout(self):
+        self.assertRaises(requests.exceptions.Timeout, self.call, "GET",
+                "/slow", timeout=0.1)
+        self.assertRaises(requests.exceptions.Timeout, self.call, "GET",
+                "/slow", timeout=(5, 0.1))
+
+    def test_too_many_redirects(self):
+        self.assertRaises(requests.exceptions.TooManyRedirects, self.call,
+                "GET", "/loop")
+
+    def test_decoding_error(self):
+        self.assertRaises(requests.exceptions.ContentDecodingError,
+                self.call, "GET", "/baddecode")
+
+    def test_connection_refused(self):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        self.assertRaises(requests.exceptions.ConnectionError,
+                http_request, "GET", "http://127.0.0.1:%s/" % port,
+                session=self.transport)
+
+    def test_concurrent(self):
+        results = []
+
+        def call():
+            results.append(self.call("GET", "/json")[1]["method"])
+
+        threads = [threading.Thread(target=call) for num in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(results, ["GET"] * 20)
+
+
+
+class RequestsTransportTest(TransportConformance, unittest.TestCase):
+    transport_name = "requests"
+
+    def test_is_session(self):
+        self.assertTrue(isinstance(self.transport, requests.Session))
+
+
+
+@unittest.skipIf(not HAS_HTTPX, "httpx[http2] is not installed")
+class HTTP2TransportTest(TransportConformance, unittest.TestCase):
+    transport_name = "http2"
+
+    def test_type(self):
+        self.assertTrue(isinstance(self.transport, transport.HTTP2Transport))
+        self.assertEqual(self.transport.pool_maxsize, 4)
+
+    def test_requests_error(self):
+        httpx = transport.httpx
+        errors = requests.exceptions
+        for error, expected in (
+                (httpx.ConnectTimeout("x"), errors.ConnectTimeout),
+                (httpx.PoolTimeout("x"), errors.ConnectTimeout),
+                (httpx.ReadTimeout("x"), errors.ReadTimeout),
+                (httpx.ConnectError("x"), errors.ConnectionError),
+                (httpx.RemoteProtocolError("x"), errors.ConnectionError),
+                (httpx.UnsupportedProtocol("x"), errors.InvalidSchema),
+                (httpx.TooManyRedirects("x"), errors.TooManyRedirects),
+                (httpx.DecodingError("x"), errors.ContentDecodingError),
+                (httpx.InvalidURL("x"), errors.InvalidURL),
+                (httpx.StreamConsumed(), errors.StreamConsumedError),
+                ):
+            ret = transport._requests_error(error)
+            self.assertTrue(isinstance(ret, expected), (error, ret))
+
+    def test_clients_by_verify(self):
+        client = self.transport._get_client(True)
+        self.assertTrue(client is self.transport._get_client(True))
+        self.assertFalse(client is self.transport._get_client(False))
+        self.transport.close()
+        self.assertEqual(self.transport._clients, {})
+
+
+
+class TransportRegistryTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TransportRegistryTest, self).__init__(*args, **kwargs)
+
+    def test_create_default(self):
+        sess = transport.create_transport(pool_maxsize=3)
+        self.assertTrue(isinstance(sess, requests.Session))
+        self.assertEqual(sess.get_adapter("https://x")._pool_maxsize, 3)
+        sess.close()
+
+    def test_create_unknown(self):
+        self.assertRaises(exc.InvalidTransport, transport.create_transport,
+                "carrier-pigeon")
+
+    def test_register(self):
+        factory = Mock()
+        with patch.dict(transport._transports):
+            transport.register_transport("fake", factory)
+            self.assertTrue("fake" in transport.available_transports())
+            transport.create_transport("fake", pool_maxsize=2)
+        factory.assert_called_once_with(pool_connections=None, pool_maxsize=2)
+        self.assertFalse("fake" in transport.available_transports())
+
+    def test_httpx_not_installed(self):
+        with patch.object(transport, "httpx", None):
+            with patch.dict("sys.modules", {"httpx": None}):
+                self.assertRaises(exc.HttpxModuleNotInstalled,
+                        transport.HTTP2Transport)
+
+    def test_base_transport(self):
+        base = transport.Transport()
+        self.assertRaises(NotImplementedError, base.get, "http://x")
+        base.request = Mock()
+        for verb in ("head", "get", "post", "put", "delete", "patch"):
+            getattr(base, verb)("http://x", headers={})
+            base.request.assert_called_with(verb.upper(), "http://x",
+                    headers={})
+        base.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
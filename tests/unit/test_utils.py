@@ -133,6 +133,31 @@ class UtilsTest(unittest.TestCase):
         ret = utils.coerce_to_list(val)
         self.assertEqual(ret, val)
 
+    def test_iter_rows(self):
+        items = iter([{"a": 1, "b": 2, "c": 3}, None, {"b": 4}])
+        ret = utils.iter_rows(items, ["b", "a"])
+        self.assertEqual(next(ret), (2, 1))
+        self.assertEqual(list(ret), [(4, None)])
+
+    def test_iter_rows_dicts(self):
+        items = [{"a": 1, "b": 2, "c": 3}, {"b": 4}]
+        ret = list(utils.iter_rows(items, ["a", "b"], as_dicts=True))
+        self.assertEqual(ret, [{"a": 1, "b": 2}, {"a": None, "b": 4}])
+
+    def test_project(self):
+        items = [{"a": 1, "b": 2, "c": 3}, {}, {"b": 4}]
+        self.assertEqual(utils.project(items, "b"), [(2,), (4,)])
+        self.assertEqual(utils.project(items, ["a", "b"], as_dicts=True),
+                [{"a": 1, "b": 2}, {"a": None, "b": 4}])
+        self.assertEqual(utils.project(items, ["a", "b"], as_columns=True),
+                {"a": [1, None], "b": [2, 4]})
+        self.assertEqual(utils.project([], ["a"], as_columns=True),
+                {"a": []})
+
+    def test_to_columns(self):
+        ret = utils.to_columns([(1, 2), (3, 4)], ["a", "b"])
+        self.assertEqual(ret, {"a": [1, 3], "b": [2, 4]})
+
     def test_folder_size_no_ignore(self):
         with utils.SelfDeletingTempDirectory() as tmpdir:
             # write 5 files of 100 bytes each